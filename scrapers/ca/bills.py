@@ -1,16 +1,20 @@
 import os
 import re
+import sys
 import pytz
 import operator
 import itertools
 import datetime
-from lxml import etree, html
+import resource
+from lxml import html
 from utils import LXMLMixin
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import configure_mappers, sessionmaker, selectinload
 from sqlalchemy import create_engine
+from openstates import settings
 from openstates.scrape import Scraper, Bill, VoteEvent
-from .models import CABill
+from .models import CABill, CABillAnalysis, CABillVersion, CAVoteSummary
 from .actions import CACategorizer
+from .cache import VersionCache
 
 SPONSOR_TYPES = {
     "LEAD_AUTHOR": "author",
@@ -22,6 +26,40 @@ MYSQL_HOST = os.environ.get("MYSQL_HOST", "localhost")
 MYSQL_USER = os.environ.get("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD", "")
 
+# In bulk mode, bills are loaded this many at a time along with everything
+# scrape_bill_type touches, one SELECT ... IN per relationship.
+BULK_CHUNK_SIZE = 500
+
+
+def bulk_load_options():
+    # the backrefs (CABillVersion.authors, CAVoteSummary.votes) only exist
+    # once the mappers have been configured
+    configure_mappers()
+    return (
+        selectinload(CABill.versions).selectinload(CABillVersion.authors),
+        selectinload(CABill.actions),
+        selectinload(CABill.votes).selectinload(CAVoteSummary.votes),
+        selectinload(CABill.votes).selectinload(CAVoteSummary.motion),
+        selectinload(CABill.votes).selectinload(CAVoteSummary.location),
+        # the analysis PDFs themselves are never used, only their metadata
+        selectinload(CABill.analyses).defer(CABillAnalysis.source_doc),
+    )
+
+
+def memory_usage():
+    """Describe this process's resident set size, e.g. "rss 120MB (peak 310MB)"."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak //= 1024 * 1024 if sys.platform == "darwin" else 1024
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except OSError:
+        # no /proc outside Linux, only the peak is available
+        return "peak {}MB".format(peak)
+    current = rss_pages * resource.getpagesize() // (1024 * 1024)
+    return "rss {}MB (peak {}MB)".format(current, peak)
+
 
 def clean_title(s):
     # replace smart quote characters
@@ -202,6 +240,11 @@ class CABillScraper(Scraper, LXMLMixin):
     _tz = pytz.timezone("US/Pacific")
 
     def __init__(self, *args, **kwargs):
+        # default path of the version cache, which scrape() opens
+        self.version_cache_path = kwargs.pop(
+            "version_cache",
+            os.path.join(settings.CACHE_DIR, "ca_bill_versions.sqlite3"),
+        )
         super().__init__(*args, **kwargs)
 
         host = kwargs.pop("host", MYSQL_HOST)
@@ -244,12 +287,28 @@ class CABillScraper(Scraper, LXMLMixin):
                 raise KeyError
             return committee_abbr_to_name[other_chamber][slugify(abbr)]
 
-    def scrape(self, chamber=None, session=None):
+    def scrape(
+        self,
+        chamber=None,
+        session=None,
+        bulk=False,
+        chunk_size=None,
+        version_cache=None,
+    ):
         if session is None:
             session = self.jurisdiction.legislative_sessions[-1]["identifier"]
             self.info("no session specified, using %s", session)
         chambers = [chamber] if chamber is not None else ["upper", "lower"]
 
+        # "bulk" preloads related rows for chunks of bills instead of
+        # lazily querying them bill by bill
+        if isinstance(bulk, str):
+            bulk = bulk.lower() not in ["false", "0"]
+        # "chunk_size" bounds memory use by scraping that many bills per
+        # database session
+        if chunk_size:
+            chunk_size = int(chunk_size)
+
         bill_types = {
             "lower": {
                 "AB": "bill",
@@ -268,12 +327,82 @@ class CABillScraper(Scraper, LXMLMixin):
             },
         }
 
-        for chamber in chambers:
-            for abbr, type_ in bill_types[chamber].items():
-                try:
-                    yield from self.scrape_bill_type(chamber, session, type_, abbr)
-                except (StopIteration, RuntimeError):
-                    continue
+        # "version_cache" is the path of the cache of fields extracted
+        # from version XML
+        self.version_cache = VersionCache(version_cache or self.version_cache_path)
+        try:
+            for chamber in chambers:
+                for abbr, type_ in bill_types[chamber].items():
+                    try:
+                        yield from self.scrape_bill_type(
+                            chamber,
+                            session,
+                            type_,
+                            abbr,
+                            bulk=bulk,
+                            chunk_size=chunk_size,
+                        )
+                    except (StopIteration, RuntimeError):
+                        continue
+        finally:
+            self.version_cache.close()
+
+        self.info(memory_usage())
+        self.info(
+            "version cache: %d hits, %d misses",
+            self.version_cache.hits,
+            self.version_cache.misses,
+        )
+
+    def bill_query(self, session, type_abbr):
+        return (
+            self.session.query(CABill)
+            .filter_by(session_year=session)
+            .filter_by(measure_type=type_abbr)
+        )
+
+    def iter_bills(self, session, type_abbr, bulk=False, chunk_size=None):
+        """
+        Yield the CABills of a type for a session.
+
+        If bulk or chunk_size is set, bills are read chunk_size at a time
+        (BULK_CHUNK_SIZE by default) and each chunk gets a fresh session, so
+        the identity map never holds more than one chunk's worth of rows.
+        """
+        if not (bulk or chunk_size):
+            yield from self.bill_query(session, type_abbr)
+            return
+
+        chunk_size = chunk_size or BULK_CHUNK_SIZE
+        bill_ids = [
+            bill_id
+            for (bill_id,) in self.bill_query(session, type_abbr)
+            .with_entities(CABill.bill_id)
+            .order_by(CABill.bill_id)
+        ]
+        options = bulk_load_options() if bulk else ()
+        num_chunks = -(-len(bill_ids) // chunk_size)
+        for chunk_num, start in enumerate(range(0, len(bill_ids), chunk_size), 1):
+            chunk = bill_ids[start : start + chunk_size]
+            yield from (
+                self.bill_query(session, type_abbr)
+                .filter(CABill.bill_id.in_(chunk))
+                .options(*options)
+                .order_by(CABill.bill_id)
+            )
+            # everything for this chunk has been used, start the next
+            # one with an empty identity map
+            self.session.close()
+            self.session = self.Session()
+            self.info(
+                "%s %s chunk %d/%d: %d bills, %s",
+                session,
+                type_abbr,
+                chunk_num,
+                num_chunks,
+                len(chunk),
+                memory_usage(),
+            )
 
     def scrape_bill_type(
         self,
@@ -282,12 +411,10 @@ class CABillScraper(Scraper, LXMLMixin):
         bill_type,
         type_abbr,
         committee_abbr_regex=get_committee_name_regex(),
+        bulk=False,
+        chunk_size=None,
     ):
-        bills = (
-            self.session.query(CABill)
-            .filter_by(session_year=session)
-            .filter_by(measure_type=type_abbr)
-        )
+        bills = self.iter_bills(session, type_abbr, bulk, chunk_size)
 
         archive_year = int(session[0:4])
         not_archive_year = archive_year >= 2009
@@ -325,17 +452,8 @@ class CABillScraper(Scraper, LXMLMixin):
 
             # Get digest test (aka "summary") from latest version.
             if bill.versions and not_archive_year:
-                version = bill.versions[-1]
-                nsmap = version.xml.nsmap
-                xpath = "//caml:DigestText/xhtml:p"
-                els = version.xml.xpath(xpath, namespaces=nsmap)
-                chunks = []
-                for el in els:
-                    t = etree_text_content(el)
-                    t = re.sub(r"\s+", " ", t)
-                    t = re.sub(r"\)(\S)", lambda m: ") %s" % m.group(1), t)
-                    chunks.append(t)
-                summary = "\n\n".join(chunks)
+                extracted = self.version_cache.extract(bill.versions[-1], "digest")
+                summary = extracted["digest"]
 
             for version in bill.versions:
                 if not version.bill_xml:
@@ -363,19 +481,23 @@ class CABillScraper(Scraper, LXMLMixin):
                     date=version_date.date(),
                 )
 
+                extracted = self.version_cache.extract(version, "title", "short_title")
+                version_title = extracted["title"]
+                version_short_title = extracted["short_title"]
+
                 # CA is inconsistent in that some bills have a short title
                 # that is longer, more descriptive than title.
                 if bill.measure_type in ("AB", "SB"):
-                    impact_clause = clean_title(version.title)
-                    title = clean_title(version.short_title)
+                    impact_clause = clean_title(version_title)
+                    title = clean_title(version_short_title)
                 else:
                     impact_clause = None
-                    if len(version.title) < len(
-                        version.short_title
-                    ) and not version.title.lower().startswith("an act"):
-                        title = clean_title(version.short_title)
+                    if len(version_title) < len(
+                        version_short_title
+                    ) and not version_title.lower().startswith("an act"):
+                        title = clean_title(version_short_title)
                     else:
-                        title = clean_title(version.title)
+                        title = clean_title(version_title)
 
                 if title:
                     all_titles.add(title)
@@ -752,9 +874,13 @@ class CABillScraper(Scraper, LXMLMixin):
                     on_duplicate="ignore",
                 )
 
-            yield fsbill
-            self.session.expire_all()
-
+            # the parsed XML trees are by far the largest thing hanging off
+            # the bill, and everything needed from them has been extracted
+            for version in bill.versions:
+                version.drop_xml()
 
-def etree_text_content(el):
-    return html.fromstring(etree.tostring(el)).text_content()
+            yield fsbill
+            # in bulk mode, expiring would throw away the preloaded
+            # relationships of the rest of the chunk
+            if not bulk:
+                self.session.expire_all()
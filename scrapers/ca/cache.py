@@ -0,0 +1,67 @@
+"""
+On-disk cache of the fields the bill scraper extracts from version XML.
+
+Parsing bill_xml is the bulk of the CPU time in a CA bill scrape, but a
+given version's text rarely changes once it's been posted. Entries are
+keyed on bill_version_id and only used if the SHA-1 of the bill_xml they
+were extracted from still matches, so an amended version is re-parsed
+even if trans_update wasn't bumped.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+
+
+class VersionCache:
+    def __init__(self, path, commit_every=500):
+        self.path = path
+        self.commit_every = commit_every
+        self.hits = self.misses = 0
+        self._pending = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            "bill_version_id TEXT PRIMARY KEY, sha1 TEXT, data TEXT)"
+        )
+
+    def extract(self, version, *fields):
+        """
+        Return a dict of the requested CABillVersion properties (title,
+        short_title, digest), taken from the cache if the version's
+        bill_xml is unchanged and parsed out of it otherwise.
+        """
+        sha1 = hashlib.sha1(version.bill_xml.encode("utf-8")).hexdigest()
+        row = self.db.execute(
+            "SELECT data FROM versions WHERE bill_version_id = ? AND sha1 = ?",
+            (version.bill_version_id, sha1),
+        ).fetchone()
+        data = json.loads(row[0]) if row else {}
+
+        missing = [field for field in fields if field not in data]
+        if not missing:
+            self.hits += 1
+            return data
+
+        self.misses += 1
+        for field in missing:
+            data[field] = getattr(version, field)
+        self.db.execute(
+            "REPLACE INTO versions (bill_version_id, sha1, data) VALUES (?, ?, ?)",
+            (version.bill_version_id, sha1, json.dumps(data)),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+        return data
+
+    def commit(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.db.close()
@@ -5,15 +5,23 @@ The workflow is:
  - Drop & recreate the local capublic database.
  - Inspect the site with regex and determine which files have been updated, if any.
  - For each such file, unzip it & call import.
+
+With --incremental, an existing capublic database is kept and only the
+pubinfo_daily_*.zip files posted since the last applied one (as recorded
+in the manifest table) are loaded on top of it.
 """
 import os
 import re
 import glob
+import shutil
+import zipfile
 import os.path
-import subprocess
 import logging
 import lxml.html
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
 from datetime import datetime
 from os.path import join, split
 from functools import partial
@@ -27,8 +35,29 @@ MYSQL_HOST = os.environ.get("MYSQL_HOST", "localhost")
 MYSQL_USER = os.environ.get("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD", "")
 
+# Number of bill_version_tbl rows sent to MySQL per multi-row REPLACE.
+# Each row carries a full bill XML document, so keep this well below
+# what would exceed max_allowed_packet.
+BILL_VERSION_BATCH_SIZE = int(os.environ.get("CA_BILL_VERSION_BATCH_SIZE", 100))
+
+# Download tuning for the (multi-GB) pubinfo zips.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_ATTEMPTS = 5
+
+# The only zip members the loader ever reads: table dumps, the LOB files
+# they point to, and the schema/load scripts from pubinfo_load.zip.
+EXTRACT_SUFFIXES = (".dat", ".lob", ".sql")
+
+# Number of tables loaded concurrently, each on its own connection.
+LOAD_WORKERS = int(os.environ.get("CA_LOAD_WORKERS", min(4, os.cpu_count() or 1)))
+
 BASE_URL = "https://downloads.leginfo.legislature.ca.gov/"
 
+# Bookkeeping table (not part of the upstream schema) recording which
+# zip files have been loaded into capublic, and the listing timestamp
+# they had when they were.
+MANIFEST_TABLE = "pubinfo_manifest_tbl"
+
 
 # ----------------------------------------------------------------------------
 # Logging config
@@ -75,6 +104,69 @@ def db_drop():
     logger.info("...done.")
 
 
+def manifest_create():
+    """Create the manifest table if it isn't there yet."""
+    connection = MySQLdb.connect(
+        host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, db="capublic"
+    )
+    connection.autocommit(True)
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS %s (
+            FILENAME VARCHAR(100) NOT NULL,
+            FILE_DATE DATETIME NOT NULL,
+            APPLIED_AT DATETIME NOT NULL,
+            PRIMARY KEY (FILENAME, FILE_DATE)
+        )
+        """
+        % MANIFEST_TABLE
+    )
+    cursor.close()
+    connection.close()
+
+
+def manifest_last_applied():
+    """
+    Return the listing timestamp of the newest file recorded in the
+    manifest, or None if there is no capublic database or nothing has
+    been recorded in it yet.
+    """
+    try:
+        connection = MySQLdb.connect(
+            host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, db="capublic"
+        )
+    except MySQLdb._exceptions.OperationalError:
+        return None
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT MAX(FILE_DATE) FROM %s" % MANIFEST_TABLE)
+        (last_applied,) = cursor.fetchone()
+    except MySQLdb._exceptions.ProgrammingError:
+        # The manifest table doesn't exist.
+        last_applied = None
+    cursor.close()
+    connection.close()
+    return last_applied
+
+
+def manifest_record(filename, date):
+    """Record that `filename`, listed at `date`, has been loaded."""
+    connection = MySQLdb.connect(
+        host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, db="capublic"
+    )
+    connection.autocommit(True)
+    cursor = connection.cursor()
+    cursor.execute(
+        "REPLACE INTO %s (FILENAME, FILE_DATE, APPLIED_AT) VALUES (%%s, %%s, %%s)"
+        % MANIFEST_TABLE,
+        [filename, date, datetime.now()],
+    )
+    cursor.close()
+    connection.close()
+
+
 # ---------------------------------------------------------------------------
 # Functions for updating the data.
 DatRow = namedtuple(
@@ -122,12 +214,58 @@ def encode_or_none(value):
     return value.encode() if value else None
 
 
-def load_bill_versions(connection):
+def read_bill_versions(filename="BILL_VERSION_TBL.dat"):
+    """
+    Yield cleaned DatRows from a BILL_VERSION_TBL.dat file, with the
+    bill_xml column swapped from the path of the .lob file to its text.
+    """
+    with open(filename) as f:
+        for row in f:
+            # The files are supposedly already in utf-8, but with
+            # copious bogus characters.
+            row = clean_text(row)
+            row = dat_row_2_tuple(row)
+            with open(row.bill_xml) as lob:
+                text = clean_text(lob.read())
+            yield row._replace(bill_xml=text)
+
+
+def _replace_bill_versions(cursor, sql, batch):
     """
-    Given a data folder, read its BILL_VERSION_TBL.dat file in python,
-    construct individual REPLACE statements and execute them one at
-    a time. This method is slower that letting mysql do the import,
+    Write a batch of rows with a single multi-row REPLACE, falling back
+    to one statement per row if MySQL rejects the batch so that a single
+    bad row doesn't take the rest of the batch down with it.
+
+    Returns the number of rows that couldn't be written.
+    """
+    params = [[encode_or_none(column) for column in row] for row in batch]
+    try:
+        cursor.executemany(sql, params)
+        return 0
+    except MySQLdb.Error as e:
+        logger.warning(
+            "batch of %d bill versions failed (%s), retrying row by row"
+            % (len(batch), e)
+        )
+
+    failed = 0
+    for row, values in zip(batch, params):
+        try:
+            cursor.execute(sql, values)
+        except MySQLdb.Error as e:
+            logger.error("could not load %s: %s" % (row.bill_version_id, e))
+            failed += 1
+    return failed
+
+
+def load_bill_versions(connection, batch_size=BILL_VERSION_BATCH_SIZE):
+    """
+    Given a data folder, read its BILL_VERSION_TBL.dat file in python
+    and REPLACE the rows into bill_version_tbl `batch_size` rows at a
+    time. This method is slower that letting mysql do the import,
     but doesn't fail mysteriously.
+
+    A batch_size of 1 gives the old one-statement-per-row behavior.
     """
 
     sql = """
@@ -155,29 +293,84 @@ def load_bill_versions(connection):
         """
     sql = sql % ", ".join(["%s"] * 18)
 
-    cursor = connection.cursor()
-    with open("BILL_VERSION_TBL.dat") as f:
-        for row in f:
-            # The files are supposedly already in utf-8, but with
-            # copious bogus characters.
-            row = clean_text(row)
-            row = dat_row_2_tuple(row)
-            with open(row.bill_xml) as f:
-                text = f.read()
-                text = clean_text(text)
-                row = row._replace(bill_xml=text)
-                cursor.execute(sql, [encode_or_none(column) for column in row])
+    batch_size = max(1, batch_size)
+    loaded = failed = 0
+    batch = []
 
+    cursor = connection.cursor()
+    for row in read_bill_versions():
+        batch.append(row)
+        if len(batch) >= batch_size:
+            failed += _replace_bill_versions(cursor, sql, batch)
+            loaded += len(batch)
+            batch = []
+    if batch:
+        failed += _replace_bill_versions(cursor, sql, batch)
+        loaded += len(batch)
     cursor.close()
 
+    logger.info("loaded %d bill versions (%d failed)" % (loaded - failed, failed))
+    return loaded - failed
+
+
+def _load_table(folder, filename, sql_name, batch_size, connections, opened):
+    """
+    Load a single .dat file using the calling thread's connection,
+    opening one (and adding it to `opened`) if this worker hasn't got
+    one yet.
+
+    Returns (sql_filename, rows loaded, seconds taken).
+    """
+    connection = getattr(connections, "connection", None)
+    if connection is None:
+        connection = MySQLdb.connect(
+            host=MYSQL_HOST,
+            user=MYSQL_USER,
+            passwd=MYSQL_PASSWORD,
+            db="capublic",
+            local_infile=1,
+        )
+        connection.autocommit(True)
+        connections.connection = connection
+        opened.append(connection)
+
+    # The corresponding sql file is in data/ca/dbadmin
+    _, filename = split(filename)
+    sql_filename = join("../pubinfo_load", sql_name(filename).lower())
+    with open(sql_filename) as f:
+
+        # Swap out windows paths.
+        script = f.read().replace(r"c:\\pubinfo\\", folder)
+
+    _, sql_filename = split(sql_filename)
+    logger.info("loading " + sql_filename)
+    start = monotonic()
+    if sql_filename == "bill_version_tbl.sql":
+        logger.info("inserting xml files (slow)")
+        rows = load_bill_versions(connection, batch_size)
+    else:
+        cursor = connection.cursor()
+        rows = cursor.execute(script)
+        cursor.close()
+    elapsed = monotonic() - start
+
+    logger.info("loaded %s: %s rows in %.1fs" % (sql_filename, rows, elapsed))
+    return sql_filename, rows, elapsed
 
-def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
+
+def load(
+    folder,
+    sql_name=partial(re.compile(r"\.dat$").sub, ".sql"),
+    batch_size=BILL_VERSION_BATCH_SIZE,
+    workers=LOAD_WORKERS,
+):
     """
     Import into mysql any .dat files located in `folder`.
 
     First get a list of filenames like *.dat, then for each, execute
     the corresponding .sql file after swapping out windows paths for
-    `folder`.
+    `folder`. Tables are independent of each other, so up to `workers`
+    of them are loaded at once, each worker on its own connection.
 
     This function doesn't bother to delete the imported data files
     afterwards; they'll be overwritten within a week, and leaving them
@@ -187,40 +380,31 @@ def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
     logger.info("Loading data from %s..." % folder)
     os.chdir(folder)
 
-    connection = MySQLdb.connect(
-        host=MYSQL_HOST,
-        user=MYSQL_USER,
-        passwd=MYSQL_PASSWORD,
-        db="capublic",
-        local_infile=1,
-    )
-    connection.autocommit(True)
-
-    filenames = glob.glob("*.dat")
-
-    for filename in filenames:
-
-        # The corresponding sql file is in data/ca/dbadmin
-        _, filename = split(filename)
-        sql_filename = join("../pubinfo_load", sql_name(filename).lower())
-        with open(sql_filename) as f:
-
-            # Swap out windows paths.
-            script = f.read().replace(r"c:\\pubinfo\\", folder)
-
-        _, sql_filename = split(sql_filename)
-        logger.info("loading " + sql_filename)
-        if sql_filename == "bill_version_tbl.sql":
-            logger.info("inserting xml files (slow)")
-            load_bill_versions(connection)
-        else:
-            cursor = connection.cursor()
-            cursor.execute(script)
-            cursor.close()
+    # Start the biggest files first so that a large table picked up late
+    # doesn't leave the other workers idle at the end.
+    filenames = sorted(glob.glob("*.dat"), key=os.path.getsize, reverse=True)
 
-    connection.close()
-    os.chdir("..")
-    logging.info("...Done loading from %s" % folder)
+    connections = threading.local()
+    opened = []
+    start = monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(
+                pool.map(
+                    lambda filename: _load_table(
+                        folder, filename, sql_name, batch_size, connections, opened
+                    ),
+                    filenames,
+                )
+            )
+    finally:
+        for connection in opened:
+            connection.close()
+        os.chdir("..")
+
+    for sql_filename, rows, elapsed in sorted(results, key=lambda r: -r[2]):
+        logger.info("  %-40s %10s rows %8.1fs" % (sql_filename, rows, elapsed))
+    logging.info("...Done loading from %s in %.1fs" % (folder, monotonic() - start))
 
 
 def db_create():
@@ -274,21 +458,85 @@ def get_contents():
     return resp
 
 
-def _check_call(*args):
-    logging.info("calling " + " ".join(args))
-    subprocess.check_call(args)
+def download(filename, chunk_size=DOWNLOAD_CHUNK_SIZE, attempts=DOWNLOAD_ATTEMPTS):
+    """
+    Stream BASE_URL + filename to disk in chunks.
+
+    The body is written to `filename`.part and only renamed once it's
+    complete. If an attempt is interrupted, the next one picks up where
+    it stopped using a Range request, provided the server honors it.
+    """
+    partial_filename = filename + ".part"
+    url = BASE_URL + filename
+
+    # The daily filenames are reused every week, so whatever an earlier
+    # run left behind may be a different file.
+    if os.path.exists(partial_filename):
+        os.remove(partial_filename)
+
+    for attempt in range(1, attempts + 1):
+        offset = (
+            os.path.getsize(partial_filename) if os.path.exists(partial_filename) else 0
+        )
+        headers = {"Range": "bytes=%d-" % offset} if offset else {}
+        logger.info(
+            "downloading %s (attempt %d, from byte %d)" % (url, attempt, offset)
+        )
+        try:
+            with requests.get(
+                url, headers=headers, stream=True, verify=False, timeout=60
+            ) as resp:
+                if resp.status_code == 416:
+                    # We already have the whole thing.
+                    break
+                resp.raise_for_status()
+                # A 200 means the server ignored the Range header and is
+                # sending everything again.
+                mode = "ab" if resp.status_code == 206 else "wb"
+                with open(partial_filename, mode) as f:
+                    for chunk in resp.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+            break
+        except requests.exceptions.RequestException as e:
+            if attempt == attempts:
+                raise
+            logger.warning("download of %s interrupted: %s" % (url, e))
+
+    os.replace(partial_filename, filename)
+    return filename
+
+
+def extract(filename, dirname, suffixes=EXTRACT_SUFFIXES):
+    """
+    Extract the members of `filename` ending in one of `suffixes` into
+    `dirname`, replacing anything already there.
+    """
+    shutil.rmtree(dirname, ignore_errors=True)
+    with zipfile.ZipFile(filename) as zf:
+        members = [
+            info
+            for info in zf.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(suffixes)
+        ]
+        logger.info(
+            "extracting %d of %d files from %s"
+            % (len(members), len(zf.infolist()), filename)
+        )
+        for info in members:
+            zf.extract(info, dirname)
 
 
 def get_zip(filename):
     dirname = filename.replace(".zip", "")
-    _check_call("wget", "--no-check-certificate", BASE_URL + filename)
-    _check_call("rm", "-rf", dirname)
-    _check_call("unzip", filename, "-d", dirname)
-    _check_call("rm", "-rf", filename)
+    download(filename)
+    try:
+        extract(filename, dirname)
+    finally:
+        os.remove(filename)
     return dirname
 
 
-def get_data(contents, year):
+def get_data(contents, year, batch_size=BILL_VERSION_BATCH_SIZE, workers=LOAD_WORKERS):
     newest_file = "2000"
     newest_file_date = datetime(2000, 1, 1)
     files_to_get = []
@@ -304,18 +552,82 @@ def get_data(contents, year):
                 newest_file_date = date
         files_to_get.append(newest_file)
 
+    manifest_create()
     for file in files_to_get:
         dirname = get_zip(file)
-        load(dirname)
+        load(dirname, batch_size=batch_size, workers=workers)
+        manifest_record(file, contents.get(file, datetime.now()))
+
+
+def get_daily_updates(contents, since):
+    """
+    Return the (filename, date) pairs of the daily files listed in
+    `contents` that were posted after `since`, oldest first, so they can
+    be applied in the order they were published.
+    """
+    return sorted(
+        (
+            (filename, date)
+            for filename, date in contents.items()
+            if filename.startswith("pubinfo_daily_") and date > since
+        ),
+        key=lambda pair: pair[1],
+    )
+
+
+def update_data(
+    contents, since, batch_size=BILL_VERSION_BATCH_SIZE, workers=LOAD_WORKERS
+):
+    """Apply the dailies posted after `since` to the existing database."""
+    updates = get_daily_updates(contents, since)
+    if not updates:
+        logger.info("capublic is up to date as of %s" % since)
+        return
+
+    # load() needs the table scripts from pubinfo_load, which won't be
+    # around if this is a fresh checkout pointed at an existing database.
+    if not os.path.isdir("pubinfo_load"):
+        get_zip("pubinfo_load.zip")
+
+    for filename, date in updates:
+        logger.info("applying %s (posted %s)" % (filename, date))
+        dirname = get_zip(filename)
+        load(dirname, batch_size=batch_size, workers=workers)
+        manifest_record(filename, date)
 
 
 if __name__ == "__main__":
     my_parser = argparse.ArgumentParser()
     my_parser.add_argument("--year", action="store", type=int)
+    my_parser.add_argument(
+        "--batch-size",
+        action="store",
+        type=int,
+        default=BILL_VERSION_BATCH_SIZE,
+        help="bill_version_tbl rows per REPLACE statement",
+    )
+    my_parser.add_argument(
+        "--workers",
+        action="store",
+        type=int,
+        default=LOAD_WORKERS,
+        help="number of tables to load concurrently",
+    )
+    my_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only apply dailies newer than the last load, "
+        "if capublic has been loaded before",
+    )
     args = my_parser.parse_args()
     year = args.year
 
-    db_drop()
-    db_create()
-    contents = get_contents()
-    get_data(contents, year)
+    last_applied = manifest_last_applied() if args.incremental else None
+    if last_applied and not year:
+        contents = get_contents()
+        update_data(contents, last_applied, args.batch_size, args.workers)
+    else:
+        db_drop()
+        db_create()
+        contents = get_contents()
+        get_data(contents, year, args.batch_size, args.workers)
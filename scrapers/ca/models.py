@@ -12,7 +12,9 @@ from sqlalchemy.sql import and_
 from sqlalchemy.orm import backref, relation, foreign
 from sqlalchemy.ext.declarative import declarative_base
 
-from lxml import etree
+import re
+
+from lxml import etree, html
 
 Base = declarative_base()
 
@@ -97,6 +99,10 @@ class CABillVersion(Base):
             )
         return self._xml
 
+    def drop_xml(self):
+        """Free the parsed tree; it'll be re-parsed if accessed again."""
+        self.__dict__.pop("_xml", None)
+
     @property
     def title(self):
         text = self.xml.xpath("string(//*[local-name() = 'Title'])") or ""
@@ -107,6 +113,20 @@ class CABillVersion(Base):
         text = self.xml.xpath("string(//*[local-name() = 'Subject'])") or ""
         return text.strip()
 
+    @property
+    def digest(self):
+        """The legislative counsel's digest, paragraphs separated by blank lines."""
+        nsmap = self.xml.nsmap
+        xpath = "//caml:DigestText/xhtml:p"
+        els = self.xml.xpath(xpath, namespaces=nsmap)
+        chunks = []
+        for el in els:
+            t = etree_text_content(el)
+            t = re.sub(r"\s+", " ", t)
+            t = re.sub(r"\)(\S)", lambda m: ") %s" % m.group(1), t)
+            chunks.append(t)
+        return "\n\n".join(chunks)
+
 
 class CABillVersionAuthor(Base):
     __tablename__ = "bill_version_authors_tbl"
@@ -325,3 +345,7 @@ class CACommitteeHearing(Base):
     trans_update_date = Column(DateTime, primary_key=True)
 
     bill = relation(CABill, backref=backref("committee_hearings"))
+
+
+def etree_text_content(el):
+    return html.fromstring(etree.tostring(el)).text_content()
@@ -0,0 +1,116 @@
+import logging
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from ca import bills
+from ca.bills import CABillScraper
+from ca.models import Base, CABill, CABillVersion
+
+
+@compiles(mysql.LONGBLOB, "sqlite")
+def compile_longblob(type_, compiler, **kw):
+    return "BLOB"
+
+
+def make_scraper(bills):
+    """A CABillScraper reading from an in-memory capublic with these bills."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    for n, versions in enumerate(bills, 1):
+        bill_id = "20230AB{:04d}".format(n)
+        session.add(
+            CABill(
+                bill_id=bill_id,
+                session_year="20232024",
+                session_num="0",
+                measure_type="AB",
+                measure_num=n,
+            )
+        )
+        for v in range(versions):
+            session.add(
+                CABillVersion(
+                    bill_version_id="{}{}".format(bill_id, v),
+                    bill_id=bill_id,
+                    version_num=v,
+                    bill_xml="<Bill/>",
+                )
+            )
+    session.commit()
+    session.close()
+
+    # skip __init__, which connects to MySQL
+    scraper = CABillScraper.__new__(CABillScraper)
+    scraper.Session = Session
+    scraper.session = Session()
+    scraper.info = logging.getLogger("test").info
+    return scraper, engine
+
+
+def count_selects(engine):
+    selects = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    return selects
+
+
+class TestIterBills(unittest.TestCase):
+    def test_bulk_preloads_related_rows(self):
+        scraper, engine = make_scraper([2, 1, 3, 0] * 5)
+        selects = count_selects(engine)
+        versions = []
+        for bill in scraper.iter_bills("20232024", "AB", bulk=True):
+            versions.append([v.version_num for v in bill.versions])
+            bill.actions, bill.votes, bill.analyses
+        self.assertEqual(versions, [[1, 0], [0], [2, 1, 0], []] * 5)
+        # the bill ids, the bills, and one query per relationship, rather
+        # than a few per bill
+        self.assertLess(len(selects), 10)
+
+    def test_chunks_get_fresh_sessions(self):
+        scraper, _ = make_scraper([1] * 7)
+        sessions = []
+        bill_ids = []
+        for bill in scraper.iter_bills("20232024", "AB", chunk_size=3):
+            bill_ids.append(bill.bill_id)
+            sessions.append(scraper.session)
+        self.assertEqual(bill_ids, ["20230AB{:04d}".format(n) for n in range(1, 8)])
+        # a session per chunk of three
+        self.assertEqual(len(set(map(id, sessions))), 3)
+        self.assertEqual(sessions[0], sessions[2])
+        self.assertNotEqual(sessions[2], sessions[3])
+
+
+class TestMemoryUsage(unittest.TestCase):
+    def usage(self, platform, maxrss, statm=True):
+        rusage = mock.Mock(ru_maxrss=maxrss)
+        opener = mock.mock_open(read_data="50000 25600 1000 1 0 2000 0")
+        if not statm:
+            opener.side_effect = FileNotFoundError("/proc/self/statm")
+        with mock.patch.object(bills.sys, "platform", platform), mock.patch.object(
+            bills.resource, "getrusage", return_value=rusage
+        ), mock.patch.object(
+            bills.resource, "getpagesize", return_value=4096
+        ), mock.patch(
+            "builtins.open", opener
+        ):
+            return bills.memory_usage()
+
+    def test_linux(self):
+        self.assertEqual(self.usage("linux", 300 * 1024), "rss 100MB (peak 300MB)")
+
+    def test_macos_without_proc(self):
+        self.assertEqual(
+            self.usage("darwin", 300 * 1024 * 1024, statm=False), "peak 300MB"
+        )
@@ -0,0 +1,319 @@
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from datetime import datetime
+from unittest import mock
+
+import requests
+
+try:
+    from ca import download
+except ImportError:  # MySQLdb isn't installed
+    download = None
+
+CONTENTS = {
+    "pubinfo_2023.zip": datetime(2024, 1, 2, 3, 0),
+    "pubinfo_daily_Wed.zip": datetime(2024, 3, 6, 4, 10),
+    "pubinfo_daily_Mon.zip": datetime(2024, 3, 4, 4, 10),
+    "pubinfo_daily_Tue.zip": datetime(2024, 3, 5, 4, 10),
+    "pubinfo_load.zip": datetime(2024, 3, 6, 4, 0),
+}
+
+
+@unittest.skipIf(download is None, "MySQLdb isn't installed")
+class TestIncrementalUpdate(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(dir.name)
+        self.addCleanup(os.chdir, cwd)
+        os.mkdir("pubinfo_load")
+
+        self.applied = []
+        for name, side_effect in (
+            ("get_zip", lambda filename: filename.replace(".zip", "")),
+            ("load", lambda dirname, **kwargs: self.applied.append(dirname)),
+            ("manifest_record", None),
+        ):
+            patcher = mock.patch.object(download, name, side_effect=side_effect)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_dailies_since_are_oldest_first(self):
+        self.assertEqual(
+            download.get_daily_updates(CONTENTS, datetime(2024, 3, 4, 4, 10)),
+            [
+                ("pubinfo_daily_Tue.zip", datetime(2024, 3, 5, 4, 10)),
+                ("pubinfo_daily_Wed.zip", datetime(2024, 3, 6, 4, 10)),
+            ],
+        )
+
+    def test_each_daily_is_recorded_once_loaded(self):
+        download.update_data(CONTENTS, datetime(2024, 3, 4, 4, 10))
+        self.assertEqual(self.applied, ["pubinfo_daily_Tue", "pubinfo_daily_Wed"])
+        self.assertEqual(
+            self.manifest_record.call_args_list,
+            [
+                mock.call("pubinfo_daily_Tue.zip", datetime(2024, 3, 5, 4, 10)),
+                mock.call("pubinfo_daily_Wed.zip", datetime(2024, 3, 6, 4, 10)),
+            ],
+        )
+
+    def test_up_to_date(self):
+        download.update_data(CONTENTS, datetime(2024, 3, 6, 4, 10))
+        self.assertEqual(self.applied, [])
+        self.get_zip.assert_not_called()
+        self.manifest_record.assert_not_called()
+
+
+class FakeCursor:
+    """Rejects any statement that includes a row whose id starts with "bad"."""
+
+    def __init__(self):
+        self.batches = []
+        self.rows = []
+
+    def _check(self, values):
+        if values[0].startswith(b"bad"):
+            raise download.MySQLdb.Error("Incorrect string value")
+
+    def executemany(self, sql, params):
+        for values in params:
+            self._check(values)
+        self.batches.append([values[0] for values in params])
+
+    def execute(self, sql, values):
+        self._check(values)
+        self.rows.append(values[0])
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+def bill_version(bill_version_id):
+    return download.DatRow(bill_version_id, *["x"] * 17)
+
+
+@unittest.skipIf(download is None, "MySQLdb isn't installed")
+class TestBillVersionBatches(unittest.TestCase):
+    def load(self, ids, batch_size):
+        cursor = FakeCursor()
+        with mock.patch.object(
+            download,
+            "read_bill_versions",
+            return_value=iter([bill_version(id) for id in ids]),
+        ):
+            loaded = download.load_bill_versions(FakeConnection(cursor), batch_size)
+        return loaded, cursor
+
+    def test_rows_are_sent_in_batches(self):
+        loaded, cursor = self.load(["1", "2", "3", "4", "5"], batch_size=2)
+        self.assertEqual(loaded, 5)
+        self.assertEqual(cursor.batches, [[b"1", b"2"], [b"3", b"4"], [b"5"]])
+        self.assertEqual(cursor.rows, [])
+
+    def test_bad_batch_is_retried_row_by_row(self):
+        with self.assertLogs("openstates.ca-update") as logs:
+            loaded, cursor = self.load(["1", "2", "bad3", "4", "5"], batch_size=2)
+        self.assertEqual(loaded, 4)
+        # only the batch with the bad row falls back
+        self.assertEqual(cursor.batches, [[b"1", b"2"], [b"5"]])
+        self.assertEqual(cursor.rows, [b"4"])
+        self.assertIn("could not load bad3", "\n".join(logs.output))
+
+
+class ThreadConnection:
+    """Records which thread runs each statement, and whether it's closed."""
+
+    def __init__(self, executed):
+        self.executed = executed
+        self.threads = set()
+        self.closed = False
+
+    def autocommit(self, on):
+        pass
+
+    def cursor(self):
+        return self
+
+    def execute(self, script):
+        self.threads.add(threading.get_ident())
+        self.executed.append(script)
+        return 10
+
+    def close(self):
+        self.closed = True
+
+
+@unittest.skipIf(download is None, "MySQLdb isn't installed")
+class TestLoad(unittest.TestCase):
+    TABLES = ["bill_tbl", "bill_history_tbl", "law_section_tbl", "location_code_tbl"]
+
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(dir.name)
+        self.addCleanup(os.chdir, cwd)
+
+        os.mkdir("pubinfo_load")
+        os.mkdir("pubinfo_daily_Mon")
+        for table in self.TABLES + ["bill_version_tbl"]:
+            with open(os.path.join("pubinfo_load", table + ".sql"), "w") as f:
+                f.write("LOAD DATA LOCAL INFILE 'c:\\\\pubinfo\\\\%s.dat'" % table)
+            with open(
+                os.path.join("pubinfo_daily_Mon", table.upper() + ".dat"), "w"
+            ) as f:
+                f.write("row\n")
+
+        self.executed = []
+        self.connections = []
+
+        def connect(**kwargs):
+            self.connections.append(ThreadConnection(self.executed))
+            return self.connections[-1]
+
+        for target, name, side_effect in (
+            (download.MySQLdb, "connect", connect),
+            (download, "load_bill_versions", lambda connection, batch_size: 5),
+        ):
+            patcher = mock.patch.object(target, name, side_effect=side_effect)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_every_table_is_loaded(self):
+        cwd = os.getcwd()
+        download.load("pubinfo_daily_Mon", workers=2)
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(
+            sorted(self.executed),
+            sorted(
+                "LOAD DATA LOCAL INFILE 'pubinfo_daily_Mon%s.dat'" % table
+                for table in self.TABLES
+            ),
+        )
+        (connection, batch_size), _ = self.load_bill_versions.call_args
+        self.assertIn(connection, self.connections)
+
+    def test_each_worker_has_its_own_connection(self):
+        download.load("pubinfo_daily_Mon", workers=2)
+        self.assertLessEqual(len(self.connections), 2)
+        for connection in self.connections:
+            self.assertLessEqual(len(connection.threads), 1)
+        threads = [t for connection in self.connections for t in connection.threads]
+        self.assertEqual(len(threads), len(set(threads)))
+
+    def test_connections_are_closed(self):
+        download.load("pubinfo_daily_Mon", workers=3)
+        self.assertTrue(self.connections)
+        self.assertTrue(all(connection.closed for connection in self.connections))
+
+
+class FakeResponse:
+    """Streams chunks, then raises `error` (if given) as a dropped download would."""
+
+    def __init__(self, status_code, chunks, error=None):
+        self.status_code = status_code
+        self.chunks = chunks
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code))
+
+    def iter_content(self, chunk_size):
+        yield from self.chunks
+        if self.error:
+            raise self.error
+
+
+@unittest.skipIf(download is None, "MySQLdb isn't installed")
+class TestDownload(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        cwd = os.getcwd()
+        os.chdir(dir.name)
+        self.addCleanup(os.chdir, cwd)
+
+    def download(self, *responses):
+        responses = list(responses)
+        with mock.patch.object(
+            download.requests, "get", side_effect=lambda *a, **kw: responses.pop(0)
+        ) as get, self.assertLogs("openstates.ca-update"):
+            download.download("pubinfo_daily_Mon.zip")
+        with open("pubinfo_daily_Mon.zip", "rb") as f:
+            content = f.read()
+        self.assertFalse(os.path.exists("pubinfo_daily_Mon.zip.part"))
+        return content, [call.kwargs["headers"] for call in get.call_args_list]
+
+    def test_interrupted_download_resumes(self):
+        dropped = requests.exceptions.ConnectionError("connection reset")
+        content, headers = self.download(
+            FakeResponse(200, [b"abc", b"def"], error=dropped),
+            FakeResponse(206, [b"ghi"]),
+        )
+        self.assertEqual(content, b"abcdefghi")
+        self.assertEqual(headers, [{}, {"Range": "bytes=6-"}])
+
+    def test_range_ignored_starts_over(self):
+        dropped = requests.exceptions.ConnectionError("connection reset")
+        content, headers = self.download(
+            FakeResponse(200, [b"abc"], error=dropped),
+            FakeResponse(200, [b"abc", b"def"]),
+        )
+        self.assertEqual(content, b"abcdef")
+        self.assertEqual(headers, [{}, {"Range": "bytes=3-"}])
+
+    def test_leftover_part_file_is_discarded(self):
+        with open("pubinfo_daily_Mon.zip.part", "wb") as f:
+            f.write(b"last week's file")
+        content, headers = self.download(FakeResponse(200, [b"abc"]))
+        self.assertEqual(content, b"abc")
+        self.assertEqual(headers, [{}])
+
+
+@unittest.skipIf(download is None, "MySQLdb isn't installed")
+class TestExtract(unittest.TestCase):
+    def test_only_loader_files_are_extracted(self):
+        with tempfile.TemporaryDirectory() as dir:
+            filename = os.path.join(dir, "pubinfo_daily_Mon.zip")
+            with zipfile.ZipFile(filename, "w") as zf:
+                for name in (
+                    "BILL_TBL.dat",
+                    "BILL_VERSION_TBL_1.lob",
+                    "bill_tbl.SQL",
+                    "readme.txt",
+                    "pdf/AB1.pdf",
+                ):
+                    zf.writestr(name, "x")
+                zf.writestr("nested.dat/", "")
+
+            dirname = os.path.join(dir, "pubinfo_daily_Mon")
+            os.mkdir(dirname)
+            with open(os.path.join(dirname, "OLD_TBL.dat"), "w") as f:
+                f.write("from last week")
+
+            with self.assertLogs("openstates.ca-update"):
+                download.extract(filename, dirname)
+            self.assertEqual(
+                sorted(os.listdir(dirname)),
+                ["BILL_TBL.dat", "BILL_VERSION_TBL_1.lob", "bill_tbl.SQL"],
+            )
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from ca.cache import VersionCache
+from ca.models import CABillVersion
+
+BILL_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<caml:MeasureDoc xmlns:caml="http://lc.ca.gov/legalservices/schemas/caml.1#"
+    xmlns:xhtml="http://www.w3.org/1999/xhtml">
+  <caml:Description>
+    <caml:Title>An act to add Section {n} to the Education Code.</caml:Title>
+    <caml:Subject>School libraries</caml:Subject>
+    <caml:DigestText>
+      <xhtml:p>Existing law requires {n}  libraries.</xhtml:p>
+    </caml:DigestText>
+  </caml:Description>
+</caml:MeasureDoc>
+"""
+
+
+class TestVersionCache(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        self.path = os.path.join(dir.name, "versions.sqlite3")
+
+    def cache(self):
+        cache = VersionCache(self.path)
+        self.addCleanup(cache.close)
+        return cache
+
+    def version(self, n=1):
+        return CABillVersion(
+            bill_version_id="20230AB199", bill_xml=BILL_XML.format(n=n)
+        )
+
+    def test_unchanged_version_is_not_parsed_again(self):
+        fields = ("title", "short_title", "digest")
+        cache = VersionCache(self.path)
+        expected = cache.extract(self.version(), *fields)
+        self.assertEqual(
+            expected,
+            {
+                "title": "An act to add Section 1 to the Education Code.",
+                "short_title": "School libraries",
+                "digest": "Existing law requires 1 libraries.",
+            },
+        )
+        cache.close()
+
+        cache = self.cache()
+        version = self.version()
+        self.assertEqual(cache.extract(version, *fields), expected)
+        self.assertNotIn("_xml", version.__dict__)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_amended_version_is_parsed(self):
+        cache = self.cache()
+        cache.extract(self.version(1), "title")
+        data = cache.extract(self.version(2), "title")
+        self.assertEqual(
+            data["title"], "An act to add Section 2 to the Education Code."
+        )
+        self.assertEqual(cache.misses, 2)
+
+    def test_missing_field_is_added(self):
+        cache = self.cache()
+        cache.extract(self.version(), "title")
+        data = cache.extract(self.version(), "title", "short_title")
+        self.assertEqual(data["short_title"], "School libraries")
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.extract(self.version(), "short_title"), data)
+        self.assertEqual(cache.hits, 1)
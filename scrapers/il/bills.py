@@ -6,7 +6,8 @@ import pytz
 import scrapelib
 import lxml.html
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
+
+from utils.pdf import PDFTextPool, close_cache, get_cache
 
 
 BASE_URL = "https://ilga.gov"
@@ -294,6 +295,9 @@ def chamber_slug(chamber):
 class IlBillScraper(Scraper):
     LEGISLATION_URL = f"{BASE_URL}/Legislation/"
     localize = pytz.timezone("America/Chicago").localize
+    # roll call PDFs parse the same with PyMuPDF as with pdftotext
+    # (tests/test_roll_call_pdfs.py)
+    pdf_extractor = "pymupdf"
 
     def get_bill_urls(self, chamber, session, doc_type):
         params = session_details[session]["params"]
@@ -334,38 +338,44 @@ class IlBillScraper(Scraper):
         else:
             bill_type_list = DOC_TYPES
 
-        # Sessions that run from 1997 - 2002. Last few sessiosn before bills were PDFs
-        if session in ["90th", "91st", "92nd"]:
-            yield from self.scrape_archive_bills(session)
-        else:
-            urls = {}
-            # Identify all bill URLs first for easier debugging
-            for chamber in chamber_list:
-                for doc_type in [
-                    chamber_slug(chamber) + doc_type for doc_type in bill_type_list
-                ]:
-                    if chamber not in urls:
-                        urls[chamber] = {doc_type: []}
-                    if doc_type not in urls[chamber]:
-                        urls[chamber][doc_type] = []
-
-                    for url in self.get_bill_urls(chamber, session_id, doc_type):
-                        urls[chamber][doc_type].append(url)
-
-            # Scrape all individual bills from URLs
-            for chamber in urls.keys():
-                for chamber_doc_type in urls[chamber].keys():
-                    for bill_url in urls[chamber][chamber_doc_type]:
+        # extracts roll call PDF text
+        self.pdf_pool = PDFTextPool(extractor=self.pdf_extractor)
+        try:
+            # Sessions that run from 1997 - 2002. Last few sessiosn before bills were PDFs
+            if session in ["90th", "91st", "92nd"]:
+                yield from self.scrape_archive_bills(session)
+            else:
+                urls = {}
+                # Identify all bill URLs first for easier debugging
+                for chamber in chamber_list:
+                    for doc_type in [
+                        chamber_slug(chamber) + doc_type for doc_type in bill_type_list
+                    ]:
+                        if chamber not in urls:
+                            urls[chamber] = {doc_type: []}
+                        if doc_type not in urls[chamber]:
+                            urls[chamber][doc_type] = []
+
+                        for url in self.get_bill_urls(chamber, session_id, doc_type):
+                            urls[chamber][doc_type].append(url)
+
+                # Scrape all individual bills from URLs
+                for chamber in urls.keys():
+                    for chamber_doc_type in urls[chamber].keys():
+                        for bill_url in urls[chamber][chamber_doc_type]:
+                            yield from self.scrape_bill(
+                                chamber, session_id, chamber_doc_type, bill_url
+                            )
+
+                # special non-chamber cases, if no bill type abbreviation is specified
+                if not bill_type_abbrv or bill_type_abbrv == "AM":
+                    for bill_url in self.get_bill_urls(chamber, session_id, "AM"):
                         yield from self.scrape_bill(
-                            chamber, session_id, chamber_doc_type, bill_url
+                            chamber, session_id, "AM", bill_url, "appointment"
                         )
-
-            # special non-chamber cases, if no bill type abbreviation is specified
-            if not bill_type_abbrv or bill_type_abbrv == "AM":
-                for bill_url in self.get_bill_urls(chamber, session_id, "AM"):
-                    yield from self.scrape_bill(
-                        chamber, session_id, "AM", bill_url, "appointment"
-                    )
+        finally:
+            self.pdf_pool.close()
+            close_cache()
 
     def scrape_archive_bills(self, session):
         session_abr = session[0:2]
@@ -677,6 +687,7 @@ class IlBillScraper(Scraper):
         doc = lxml.html.fromstring(html)
         doc.make_links_absolute(votes_url)
 
+        ballots = []
         for link in doc.xpath('//a[contains(@href, "votehistory")]'):
             if link.get("href") in DUPE_VOTES:
                 continue
@@ -722,29 +733,32 @@ class IlBillScraper(Scraper):
             else:
                 raise AssertionError("Date '{}' does not follow a format".format(date))
 
+            ballots.append((actor, date, motion.strip(), link.get("href")))
+
+        # unchanged PDFs come from the cache, and the rest are extracted on
+        # the pool while the next ones download
+        texts = get_cache().fetch_all(
+            self, [ballot[-1] for ballot in ballots], self.pdf_pool, headers=headers
+        )
+        for (actor, date, motion, href), (_, text) in zip(ballots, texts):
+            if isinstance(text, scrapelib.HTTPError):
+                assert "404" in text.args[0], "File not found: {}".format(text)
+                self.warning("404 error for vote; skipping vote")
+                continue
+            # split like pdftotext's bytes were, which leaves form feeds
+            # at the start of lines
+            pdflines = [
+                line.decode("utf-8") for line in text.encode("utf-8").splitlines()
+            ]
             # manual fix for bad bill. TODO: better error catching here
             vote = self.scrape_pdf_for_votes(
-                session, actor, date, motion.strip(), link.get("href")
+                session, actor, date, motion, href, pdflines
             )
             if vote:
                 vote.set_bill(bill)
                 yield vote
 
-    def fetch_pdf_lines(self, href):
-        # download the file
-        try:
-            fname, resp = self.urlretrieve(href, headers=headers)
-            pdflines = [
-                line.decode("utf-8") for line in convert_pdf(fname, "text").splitlines()
-            ]
-            os.remove(fname)
-            return pdflines
-        except scrapelib.HTTPError as e:
-            assert "404" in e.args[0], "File not found: {}".format(e)
-            self.warning("404 error for vote; skipping vote")
-            return False
-
-    def scrape_pdf_for_votes(self, session, actor, date, motion, href):
+    def scrape_pdf_for_votes(self, session, actor, date, motion, href, pdflines):
         warned = False
         # vote indicator, a few spaces, a name, newline or multiple spaces
         # VOTE_RE = re.compile('(Y|N|E|NV|A|P|-)\s{2,5}(\w.+?)(?:\n|\s{2})')
@@ -760,8 +774,6 @@ class IlBillScraper(Scraper):
             "LOST": "fail",
         }
 
-        pdflines = self.fetch_pdf_lines(href)
-
         if not pdflines:
             return False
 
@@ -0,0 +1,81 @@
+import datetime
+import re
+import unittest
+
+import fitz
+
+from il.bills import IlBillScraper
+from utils.pdf import pdf_text
+
+# how pdftotext -layout lays out a House roll call
+ROLL_CALL = """\
+                         STATE OF ILLINOIS
+                      103RD GENERAL ASSEMBLY
+                          HOUSE ROLL CALL
+                           HOUSE BILL 1
+                       SCHOOL CODE-TECHNICAL
+                          THIRD READING
+                              PASSED
+
+                           MAR 15, 2024
+
+     7 YEAS              2 NAYS              1 PRESENT
+
+E   Acevedo        Y   Davis,Monique   Y   Jefferson        Y   Reboletti
+Y   Arroyo         Y   Davis,William   N   Kosel            P   Reis
+Y   Bassi          N   DeLuca          Y   Mr. Speaker
+"""
+
+
+def make_pdf(text):
+    """
+    A PDF of text, set in a proportional font: each run of words a single
+    space apart is placed at its column, as in the PDFs the House posts.
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    for y, line in enumerate(text.splitlines()):
+        for chunk in re.finditer(r"\S+(?: \S+)*", line):
+            page.insert_text(
+                (36 + chunk.start() * 6, 72 + y * 14),
+                chunk.group(),
+                fontsize=10,
+                fontname="helv",
+            )
+    return doc.tobytes()
+
+
+class TestVotePDFs(unittest.TestCase):
+    def scrape(self, text):
+        pdflines = [line.decode("utf-8") for line in text.encode("utf-8").splitlines()]
+        return IlBillScraper(None, None).scrape_pdf_for_votes(
+            "103rd",
+            "lower",
+            datetime.date(2024, 3, 15),
+            "Third Reading",
+            "https://ilga.gov/legislation/votehistory/103/house/10300HB0001_03152024_001000T.pdf",
+            pdflines,
+        )
+
+    def test_roll_call(self):
+        layout = self.scrape(ROLL_CALL)
+        vote = self.scrape(pdf_text(make_pdf(ROLL_CALL), extractor="pymupdf"))
+        self.assertEqual(vote.result, "pass")
+        self.assertEqual(
+            {(v["option"], v["voter_name"]) for v in vote.votes},
+            {
+                ("excused", "Acevedo"),
+                ("yes", "Arroyo"),
+                ("yes", "Bassi"),
+                ("yes", "Davis, Monique"),
+                ("yes", "Davis, William"),
+                ("no", "DeLuca"),
+                ("yes", "Jefferson"),
+                ("no", "Kosel"),
+                ("yes", "Welch"),
+                ("yes", "Reboletti"),
+                ("other", "Reis"),
+            },
+        )
+        self.assertEqual(vote.votes, layout.votes)
+        self.assertEqual(vote.counts, layout.counts)
@@ -1,9 +1,12 @@
+import math
 import os
 import re
-import time
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse, parse_qs, urlencode
 import functools
 import requests
+import scrapelib
+
+from utils.apiclient import ConcurrentPager
 
 """
 API key must be passed as a header. You need the following headers to get JSON:
@@ -17,33 +20,33 @@ https://addons.mozilla.org/en-US/firefox/addon/modify-headers/
 settings = dict(SCRAPELIB_TIMEOUT=300)
 
 
-class BadApiResponse(Exception):
-    """Raised if the service returns a service code higher than 400,
-    other than 429. Makes the response object available as exc.resp
+class BadApiResponse(scrapelib.HTTPError):
+    """Raised if the service still returns a status of 400 or higher once
+    retries are used up. Callers catch it as scrapelib.HTTPError, as they
+    did when these requests went through scrapelib. Makes the response
+    object available as exc.resp
     """
 
     def __init__(self, resp, *args):
-        super(BadApiResponse, self).__init__(self, *args)
+        super(BadApiResponse, self).__init__(resp, *args)
         self.resp = resp
 
 
 def check_response(method):
-    """Decorated functions will run, and if they come back
-    with a 429 and retry-after header, will wait and try again.
+    """
+    Decorated functions return a response, which has already been retried
+    as the client's RetryPolicy allows; an error status still left raises
+    BadApiResponse, otherwise the response's JSON is returned.
     """
 
     @functools.wraps(method)
     def wrapped(self, *args, **kwargs):
-        resp = method(self, *args, **kwargs)
-        status = resp.status_code
-        if 400 < status:
-            if resp.status_code == 429:
-                self.handle_429(resp, *args, **kwargs)
-                return method(self, *args, **kwargs).json()
-            msg_args = (resp, resp.text, resp.headers)
+        response = method(self, *args, **kwargs)
+        if response.status_code >= 400:
+            msg_args = (response, response.text, response.headers)
             msg = "Bad api response: %r %r %r" % msg_args
-            raise BadApiResponse(resp, msg)
-        return resp.json()
+            raise BadApiResponse(response, msg)
+        return response.json()
 
     return wrapped
 
@@ -77,13 +80,26 @@ class ApiClient(object):
         document="{doc_link}",
     )
 
-    def __init__(self, scraper):
+    def __init__(self, scraper, workers=None):
         self.scraper = scraper
         self.apikey = os.environ["INDIANA_API_KEY"]
+        # number of requests to have in flight at once when paging
+        if workers is None:
+            workers = int(os.environ.get("INDIANA_API_WORKERS", 4))
+        # The API answers rate limiting with a 429 and a Retry-After header,
+        # which the pager honors; it also retries timeouts and server errors
+        # a bounded number of times, rather than scrapelib's long waits.
+        self.pager = ConcurrentPager(workers, scraper.logger)
         self.user_agent = os.getenv("USER_AGENT", "openstates")
         # On 2025-06-12 IN TLS certificate expired, so we need to use verify=False
         # If this is fixed in the future, this can be changed to True here and in __init__
         self.verify = False
+        # Deliberately not the scraper's scrapelib session: it isn't safe to
+        # share between the pager's threads, and the pager does its own
+        # retrying. So these requests skip scrapelib's throttle, retries,
+        # cache and request logging.
+        self.session = requests.Session()
+        self.session.verify = self.verify
 
     def get_session_no(self, session):
         session_no = ""
@@ -123,7 +139,7 @@ class ApiClient(object):
         headers["Accept"] = "application/json"
         headers["User-Agent"] = self.user_agent
         self.scraper.info("Api GET next page: %r, %r" % (url, headers))
-        return self.scraper.get(url, headers=headers)
+        return self.pager.get(self.session, url, headers=headers)
 
     @check_response
     def get_relurl(self, url):
@@ -133,7 +149,7 @@ class ApiClient(object):
         headers["User-Agent"] = self.user_agent
         url = urljoin(self.root, url)
         self.scraper.info("Api GET: %r, %r" % (url, headers))
-        return self.scraper.get(url, headers=headers)
+        return self.pager.get(self.session, url, headers=headers)
 
     # fetch an API url where we expect a redirect
     # return the new redirect URL (do not fetch it yet)
@@ -165,7 +181,6 @@ class ApiClient(object):
         self, resource_name, requests_args=None, requests_kwargs=None, **url_format_args
     ):
         """Resource is a self.resources dict key."""
-        num_bad_packets_allowed = 10
         url = self.make_url(resource_name, **url_format_args)
 
         # Add in the api key.
@@ -179,17 +194,49 @@ class ApiClient(object):
 
         args = (url, requests_args, requests_kwargs)
         self.scraper.info("Api GET: %r, %r, %r" % args)
-        resp = None
-        tries = 0
-        while resp is None and tries < num_bad_packets_allowed:
-            resp = self.scraper.get(
-                url, *requests_args, verify=self.verify, **requests_kwargs
-            )
-        return resp
+        return self.pager.get(self.session, url, *requests_args, **requests_kwargs)
 
     def unpaginate(self, result):
         for data in result["items"]:
             yield data
+        if "nextLink" not in result or not result["items"]:
+            return
+
+        page_urls = self._page_urls(result)
+        if page_urls is None:
+            yield from self._unpaginate_sequentially(result)
+            return
+
+        # the first page told us how many pages there are, so fetch
+        # the rest of them concurrently
+        for result in self.pager.map(self.get_relurl, page_urls):
+            if not result["items"]:
+                return
+            for data in result["items"]:
+                yield data
+
+    @staticmethod
+    def _page_urls(result):
+        """
+        Work out the urls of every page after the first from its nextLink
+        and itemCount, or return None if they're not there to go on.
+        """
+        # pagination is broken somehow
+        url = result["nextLink"].replace("per_page=50", "")
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        if "itemCount" not in result or len(query.get("page", ())) != 1:
+            return None
+
+        pages = math.ceil(result["itemCount"] / len(result["items"]))
+        start = int(query["page"][0])
+        urls = []
+        for page in range(start, pages + 1):
+            query["page"] = [str(page)]
+            urls.append(parsed._replace(query=urlencode(query, doseq=True)).geturl())
+        return urls
+
+    def _unpaginate_sequentially(self, result):
         while True:
             if "nextLink" in result:
                 url = result["nextLink"]
@@ -203,19 +250,3 @@ class ApiClient(object):
                     yield data
             else:
                 return
-
-    def handle_429(self, resp, *args, **kwargs):
-        """According to the docs:
-
-        "If the rate limit is exceeded, we will respond with a HTTP 429 Too Many
-        Requests response code and a body that details the reason for the rate
-        limiter kicking in. Further, the response will have a Retry-After
-        header that tells you for how many seconds to sleep before retrying.
-        You should anticipate this in your API client for the smoothest user
-        experience."
-        """
-        seconds = int(resp.headers["retry-after"])
-        self.scraper.info(
-            "Got a 429: Sleeping %s seconds per retry-after header." % seconds
-        )
-        time.sleep(seconds)
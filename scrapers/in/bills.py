@@ -333,22 +333,27 @@ class INBillScraper(Scraper):
         #     {"billName": "HB1389", "displayName": "HB 1389", "link": "/2025/bills/hb1389/", "type": "bill"}
         # ]
 
-        for b in all_pages:
+        def get_bill(b):
+            try:
+                return b, client.get("bill", session=session, bill_link=b["link"])
+            except scrapelib.HTTPError as e:
+                return b, e
+
+        # bill details are fetched a few at a time ahead of the loop
+        for b, bill_json in client.pager.map(get_bill, all_pages):
             bill_id = b["billName"]
             disp_bill_id = correct_bill_identifier(b["displayName"], b["type"])
             bill_link = b["link"]
 
             api_source = urljoin(api_base_url, bill_link)
 
-            try:
-                bill_json = client.get("bill", session=session, bill_link=bill_link)
-                # vehicle bill
-                if not bill_json:
-                    self.logger.warning("Vehicle Bill: {}".format(bill_id))
-                    continue
-            except scrapelib.HTTPError:
+            if isinstance(bill_json, scrapelib.HTTPError):
                 self.logger.warning("Bill could not be accessed. Skipping.")
                 continue
+            # vehicle bill
+            if not bill_json:
+                self.logger.warning("Vehicle Bill: {}".format(bill_id))
+                continue
 
             title = bill_json["description"]
             # Check if the title is "NoneNone" (indicating a placeholder) and set it to None
@@ -514,3 +519,5 @@ class INBillScraper(Scraper):
             )
 
             yield bill
+
+        client.pager.log_stats()
@@ -0,0 +1,93 @@
+import importlib
+import logging
+import os
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+apiclient = importlib.import_module("in.apiclient")
+
+PER_PAGE = 10
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status_code = 200
+        self.headers = {}
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def page(number, total):
+    """A page of `total` numbered bills, the way the API links them."""
+    first = (number - 1) * PER_PAGE + 1
+    result = {
+        "items": list(range(first, min(first + PER_PAGE, total + 1))),
+        "itemCount": total,
+    }
+    if first + PER_PAGE <= total:
+        result["nextLink"] = "/2025/bills?page={}&per_page=50".format(number + 1)
+    return result
+
+
+class FakeSession:
+    """Serves pages of `total` bills by their page parameter."""
+
+    def __init__(self, total):
+        self.total = total
+        self.pages = []
+
+    def get(self, url, **kwargs):
+        number = int(parse_qs(urlparse(url).query)["page"][0])
+        self.pages.append(number)
+        return FakeResponse(page(number, self.total))
+
+
+class FakeScraper:
+    logger = logging.getLogger("in-test")
+
+    def info(self, message):
+        pass
+
+
+class TestPageUrls(unittest.TestCase):
+    def page_numbers(self, total):
+        urls = apiclient.ApiClient._page_urls(page(1, total))
+        return [int(parse_qs(urlparse(url).query)["page"][0]) for url in urls]
+
+    def test_last_page_is_short(self):
+        self.assertEqual(self.page_numbers(25), [2, 3])
+
+    def test_total_fills_the_last_page(self):
+        self.assertEqual(self.page_numbers(20), [2])
+
+    def test_total_one_past_a_page(self):
+        self.assertEqual(self.page_numbers(11), [2])
+
+    def test_falls_back_without_an_item_count(self):
+        result = page(1, 25)
+        del result["itemCount"]
+        self.assertIsNone(apiclient.ApiClient._page_urls(result))
+
+
+class TestUnpaginate(unittest.TestCase):
+    def unpaginate(self, total):
+        with mock.patch.dict(os.environ, {"INDIANA_API_KEY": "key"}):
+            client = apiclient.ApiClient(FakeScraper(), workers=2)
+        client.session = FakeSession(total)
+        items = list(client.unpaginate(page(1, total)))
+        return items, sorted(client.session.pages)
+
+    def test_last_page_is_short(self):
+        self.assertEqual(self.unpaginate(25), (list(range(1, 26)), [2, 3]))
+
+    def test_total_fills_the_last_page(self):
+        self.assertEqual(self.unpaginate(20), (list(range(1, 21)), [2]))
+
+    def test_single_page(self):
+        self.assertEqual(self.unpaginate(10), (list(range(1, 11)), []))
+
+    def test_empty_result(self):
+        self.assertEqual(self.unpaginate(0), ([], []))
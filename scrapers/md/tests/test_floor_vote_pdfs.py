@@ -0,0 +1,98 @@
+import re
+import unittest
+from unittest import mock
+
+import fitz
+
+from md.votes import MDVoteScraper
+from utils.pdf import pdf_text
+
+URL = "https://mgaleg.maryland.gov/2024RS/votes/Senate/0412.pdf"
+
+# how pdftotext -layout lays out a Senate vote
+VOTE = """\
+                              Maryland General Assembly
+                                2024 Regular Session
+                           Legislative Date: Mar 15, 2024
+                             Calendar Date: Mar 15, 2024
+                                 Senate of Maryland
+                                        SB 1
+                       Public Safety - Firearms - Definitions
+                                Third Reading Passed
+
+      5 Yeas      2 Nays      0 Not Voting      1 Excused      1 Absent
+
+Voting Yea - 5
+Mr. President            Beidle                Carozza             Jackson, M.
+Van Hollen*
+Voting Nay - 2
+Hershey                  Ready
+Not Voting - 0
+Excused from Voting - 1
+Kagan
+Excused (Absent) - 1
+West
+* Indicates Vote Change
+"""
+
+
+def make_pdf(text):
+    """
+    A PDF of text, set in a proportional font: each run of words a single
+    space apart is placed at its column, as in the PDFs the Senate posts.
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    for y, line in enumerate(text.splitlines()):
+        for chunk in re.finditer(r"\S+(?: \S+)*", line):
+            page.insert_text(
+                (36 + chunk.start() * 6, 72 + y * 14),
+                chunk.group(),
+                fontsize=10,
+                fontname="helv",
+            )
+    return doc.tobytes()
+
+
+class FakeCache:
+    def __init__(self, text):
+        self.text_ = text
+        self.extractors = []
+
+    def text(self, scraper, url, extractor=None):
+        self.extractors.append(extractor)
+        if self.text_ is None:
+            return pdf_text(make_pdf(VOTE), extractor=extractor)
+        return self.text_
+
+
+class TestVotePDFs(unittest.TestCase):
+    def scrape(self, text=None):
+        cache = FakeCache(text)
+        with mock.patch("md.votes.get_cache", return_value=cache):
+            vote = MDVoteScraper(None, None).scrape_vote(URL, "2024")
+        return vote, cache.extractors
+
+    def test_vote(self):
+        layout, _ = self.scrape(VOTE)
+        vote, extractors = self.scrape()
+        self.assertEqual(extractors, ["pymupdf"])
+        self.assertIn('"identifier": "SB 1"', vote.bill)
+        self.assertEqual(vote.motion_text, "Third Reading Passed")
+        self.assertEqual(vote.start_date, "2024-03-15")
+        self.assertEqual(
+            [(v["option"], v["voter_name"]) for v in vote.votes],
+            [
+                ("yes", "Mr. President"),
+                ("yes", "Beidle"),
+                ("yes", "Carozza"),
+                ("yes", "Jackson, M."),
+                ("yes", "Van Hollen"),
+                ("no", "Hershey"),
+                ("no", "Ready"),
+                ("excused", "Kagan"),
+                ("absent", "West"),
+            ],
+        )
+        self.assertEqual(vote.votes, layout.votes)
+        self.assertEqual(vote.counts, layout.counts)
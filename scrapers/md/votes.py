@@ -2,16 +2,23 @@ import re
 import datetime
 from collections import defaultdict
 from utils import LXMLMixin
+from utils.pdf import close_cache, get_cache
 from utils.votes import check_counts
 from openstates.scrape import Scraper, VoteEvent
-from openstates.utils import convert_pdf
 
 
 class MDVoteScraper(Scraper, LXMLMixin):
+    # vote PDFs parse the same with PyMuPDF as with pdftotext
+    # (tests/test_floor_vote_pdfs.py)
+    pdf_extractor = "pymupdf"
+
     def scrape(self, chamber=None, session=None):
         chambers = [chamber] if chamber is not None else ["upper", "lower"]
-        for chamber in chambers:
-            yield from self.scrape_chamber(chamber, session)
+        try:
+            for chamber in chambers:
+                yield from self.scrape_chamber(chamber, session)
+        finally:
+            close_cache()
 
     def scrape_chamber(self, chamber, session):
         chamber_name = "senate" if chamber == "upper" else "house"
@@ -33,8 +40,7 @@ class MDVoteScraper(Scraper, LXMLMixin):
                     seen_urls.add(vote_url)
 
     def scrape_vote(self, url, session):
-        fname, _ = self.urlretrieve(url)
-        text = convert_pdf(fname, type="text").decode()
+        text = get_cache().text(self, url, extractor=self.pdf_extractor)
         lines = text.splitlines()
 
         chamber = "upper" if "senate" in url else "lower"
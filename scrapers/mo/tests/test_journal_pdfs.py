@@ -0,0 +1,105 @@
+import re
+import unittest
+from unittest import mock
+
+import fitz
+import lxml.html
+
+from mo.votes import MOVoteScraper
+from utils.pdf import pdf_text
+
+URL = "https://www.senate.mo.gov/24info/Journals/RDay3203142024.pdf"
+
+# how pdftotext -layout lays out a page of the Senate journal (with hyphens
+# for its em dashes, which _clean_line makes hyphens anyway and the built-in
+# font below can't show)
+JOURNAL = """\
+                              Journal of the Senate
+                             SECOND REGULAR SESSION
+
+                       THIRTY-SECOND DAY-THURSDAY, MARCH 14, 2024
+
+     On motion of Senator O'Laughlin, SB 727 was read the 3rd time and passed by the following vote:
+
+YEAS-Senators
+Arthur           Bean             Brattin          Brown (16)-4
+NAYS-Senators
+Eigel            Moon-2
+Absent-Senators-None
+Absent with leave-Senators
+Hough-1
+Vacancies-None
+
+     The President declared the bill passed.
+"""
+
+
+def make_pdf(text):
+    """
+    A PDF of text, set in a proportional font: each run of words a single
+    space apart is placed at its column, as in the journals the Senate posts.
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    for y, line in enumerate(text.splitlines()):
+        for chunk in re.finditer(r"\S+(?: \S+)*", line):
+            page.insert_text(
+                (36 + chunk.start() * 5, 72 + y * 14),
+                chunk.group(),
+                fontsize=9,
+                fontname="helv",
+            )
+    return doc.tobytes()
+
+
+class FakeCache:
+    def __init__(self, text):
+        self.text_ = text
+        self.extractors = []
+
+    def text(self, scraper, url, extractor=None):
+        self.extractors.append(extractor)
+        if self.text_ is None:
+            return pdf_text(make_pdf(JOURNAL), extractor=extractor)
+        return self.text_
+
+
+class TestJournalPDFs(unittest.TestCase):
+    def scrape(self, text=None):
+        cache = FakeCache(text)
+        journals = lxml.html.fromstring(
+            f'<table><tr><td><a href="{URL}">March 14</a></td></tr></table>'
+        )
+        scraper = MOVoteScraper(None, None)
+        with mock.patch("mo.votes.get_cache", return_value=cache), mock.patch.object(
+            scraper, "lxmlize", return_value=journals
+        ):
+            votes = list(scraper._scrape_upper_chamber("2024"))
+        return votes, cache.extractors
+
+    def test_votes(self):
+        layout, _ = self.scrape(JOURNAL)
+        votes, extractors = self.scrape()
+        self.assertEqual(extractors, ["pymupdf"])
+        self.assertEqual(len(votes), 1)
+        self.assertIn('"identifier": "SB 727"', votes[0].bill)
+        self.assertEqual(
+            [(c["option"], c["value"]) for c in votes[0].counts],
+            [("yes", 4), ("no", 2), ("other", 1)],
+        )
+        self.assertEqual(
+            [(v["option"], v["voter_name"]) for v in votes[0].votes],
+            [
+                ("yes", "Arthur"),
+                ("yes", "Bean"),
+                ("yes", "Brattin"),
+                ("yes", "Brown"),
+                ("yes", "(16)"),
+                ("no", "Eigel"),
+                ("no", "Moon"),
+                ("other", "Hough"),
+            ],
+        )
+        self.assertEqual(votes[0].votes, layout[0].votes)
+        self.assertEqual(votes[0].counts, layout[0].counts)
+        self.assertEqual(votes[0].motion_text, layout[0].motion_text)
@@ -1,12 +1,11 @@
-import os
 import re
 import pytz
 import collections
 import datetime as dt
 
 from utils import LXMLMixin
+from utils.pdf import close_cache, get_cache
 
-from openstates.utils import convert_pdf
 from openstates.scrape import Scraper, VoteEvent
 
 motion_re = r"(?i)On motion of .*, .*"
@@ -20,6 +19,10 @@ TIMEZONE = pytz.timezone("America/Chicago")
 
 
 class MOVoteScraper(Scraper, LXMLMixin):
+    # journal PDFs parse the same with PyMuPDF as with pdftotext
+    # (tests/test_journal_pdfs.py)
+    pdf_extractor = "pymupdf"
+
     def _clean_line(self, obj):
         patterns = {"\xe2\x80\x94": "-", "—": "-"}
 
@@ -29,10 +32,7 @@ class MOVoteScraper(Scraper, LXMLMixin):
         return obj
 
     def _get_pdf(self, url):
-        (path, response) = self.urlretrieve(url)
-        data = convert_pdf(path, type="text")
-        os.remove(path)
-        return data
+        return get_cache().text(self, url, extractor=self.pdf_extractor)
 
     def _scrape_upper_chamber(self, session):
         if int(session[:4]) >= 2016:
@@ -64,7 +64,7 @@ class MOVoteScraper(Scraper, LXMLMixin):
         journs = page.xpath("//table")[0].xpath(".//a")
         for a in journs:
             pdf_url = a.attrib["href"]
-            data = self._get_pdf(pdf_url).decode()
+            data = self._get_pdf(pdf_url)
             lines = data.split("\n")
 
             in_vote = False
@@ -193,10 +193,13 @@ class MOVoteScraper(Scraper, LXMLMixin):
     #  the agenda of the day.
 
     def scrape(self, chamber=None, session=None):
-        if chamber in ["upper", None]:
-            yield from self._scrape_upper_chamber(session)
-        if chamber in ["lower", None]:
-            yield from self._scrape_lower_chamber(session)
+        try:
+            if chamber in ["upper", None]:
+                yield from self._scrape_upper_chamber(session)
+            if chamber in ["lower", None]:
+                yield from self._scrape_lower_chamber(session)
+        finally:
+            close_cache()
 
 
 def is_vote_end(line):
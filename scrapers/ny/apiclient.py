@@ -1,42 +1,41 @@
 import string
 import os
-import time
 import functools
 from collections import defaultdict
 
-# from OpenSSL.SSL import SysCallError
+import requests
+import scrapelib
 
+from utils.apiclient import ConcurrentPager
 
-class BadAPIResponse(Exception):
+
+class BadAPIResponse(scrapelib.HTTPError):
     """
-    Raised if the service returns a service code higher than 400,
-    other than 429. Makes the response object available as exc.resp.
+    Raised if the service still returns a status of 400 or higher once
+    retries are used up. Callers catch it as scrapelib.HTTPError, as they
+    did when these requests went through scrapelib. Makes the response
+    object available as exc.resp.
     """
 
     def __init__(self, resp, *args):
-        super(BadAPIResponse, self).__init__(self, *args)
+        super(BadAPIResponse, self).__init__(resp, *args)
         self.resp = resp
 
 
 def check_response(method):
     """
-    Decorated functions will run, and if they come back with a 429
-    and retry-after header, will wait and try again.
+    Decorated functions return a response, which has already been retried
+    as the client's RetryPolicy allows; an error status still left raises
+    BadAPIResponse, otherwise the response's JSON is returned.
     """
 
     @functools.wraps(method)
     def wrapped(self, *args, **kwargs):
         response = method(self, *args, **kwargs)
-        status = response.status_code
-
-        if status >= 400:
-            if response.status_code == 429:
-                self.handle_429(response, *args, **kwargs)
-                return method(self, *args, **kwargs).json()
+        if response.status_code >= 400:
             msg_args = (response, response.text, response.headers)
             msg = "Bad api response: %r %r %r" % msg_args
             raise BadAPIResponse(response, msg)
-
         return response.json()
 
     return wrapped
@@ -90,15 +89,31 @@ class OpenLegislationAPIClient(object):
 
         return url
 
-    def __init__(self, scraper):
+    def __init__(self, scraper, workers=None):
         self.scraper = scraper
         self.api_key = os.environ["NEW_YORK_API_KEY"]
+        # number of requests to have in flight at once when paging
+        if workers is None:
+            workers = int(os.environ.get("NEW_YORK_API_WORKERS", 4))
+        # According to the docs: 'If the rate limit is exceeded, we will
+        # respond with a HTTP 429 Too Many Requests response code ... the
+        # response will have a Retry-After header that tells you for how many
+        # seconds to sleep before retrying.' The pager honors that, and
+        # retries timeouts and server errors a bounded number of times.
+        self.pager = ConcurrentPager(workers, scraper.logger)
+        # Deliberately not the scraper's scrapelib session: it isn't safe to
+        # share between the pager's threads, and the pager does its own
+        # retrying. So these requests skip scrapelib's throttle, retries,
+        # cache and request logging.
+        self.session = requests.Session()
+        self.session.headers.update(scraper.headers)
+        if os.environ.get("HTTP_PROXY"):
+            self.session.verify = False
 
     @check_response
     def get(
         self, resource_name, requests_args=None, requests_kwargs=None, **url_format_args
     ):
-        num_bad_packets_allowed = 10
         url = self._build_url(resource_name, **url_format_args)
 
         requests_args = requests_args or ()
@@ -106,54 +121,37 @@ class OpenLegislationAPIClient(object):
         headers = requests_kwargs.get("headers", {})
         headers["Accept"] = "application/json"
         requests_kwargs["headers"] = headers
-        if os.environ.get("HTTP_PROXY"):
-            requests_kwargs["verify"] = False
 
         args = (url, requests_args, requests_kwargs)
         self.scraper.info("API GET: %r, %r, %r" % args)
-        response = None
-        tries = 0
-        while response is None and tries < num_bad_packets_allowed:
-            response = self.scraper.get(url, *requests_args, **requests_kwargs)
-            # except SysCallError as e:
-            #     err, string = e.args
-            #     if err != 104:
-            #         raise
-            #     tries += 1
-            #     if tries >= num_bad_packets_allowed:
-            #         print(err, string)
-            #         raise RuntimeError("Received too many bad packets from API.")
-
-        return response
-
-    def unpaginate(self, result):
-        for data in result["items"]:
-            yield data
-        while True:
-            if "nextLink" in result:
-                url = result["nextLink"]
-                self.scraper.info("API GET next page: {}".format(url))
-                result = self.get_relurl(url)
-                if not result["items"]:
-                    return
-                for data in result["items"]:
-                    yield data
-            else:
-                return
+        return self.pager.get(self.session, url, *requests_args, **requests_kwargs)
 
-    def handle_429(self, resp, *args, **kwargs):
+    def unpaginate(self, resource_name, limit=1000, **url_format_args):
         """
-        According to the docs:
-
-        'If the rate limit is exceeded, we will respond with a HTTP 429 Too Many
-        Requests response code and a body that details the reason for the rate
-        limiter kicking in. Further, the response will have a Retry-After
-        header that tells you for how many seconds to sleep before retrying.
-        You should anticipate this in your API client for the smoothest user
-        experience.'
+        Yield every item of a paged listing.
+
+        The first page gives the total, after which the remaining pages are
+        requested concurrently.
         """
-        seconds = int(resp.headers["retry-after"])
-        self.scraper.info(
-            "Got a 429: Sleeping %s seconds per retry-after header." % seconds
-        )
-        time.sleep(seconds)
+        # 1000 is the current maximum returned record limit for all Open
+        # Legislature API calls that use the parameter.
+        # Offsets start at 1.
+        response = self.get(resource_name, limit=limit, offset=1, **url_format_args)
+        if (
+            response["responseType"] == "empty list"
+            or response["offsetStart"] > response["offsetEnd"]
+        ):
+            return
+        total = response["total"]
+        self.scraper.info(f"{total} results for {resource_name}")
+        yield from response["result"]["items"]
+
+        def get_page(offset):
+            return self.get(
+                resource_name, limit=limit, offset=offset, **url_format_args
+            )
+
+        for response in self.pager.map(get_page, range(1 + limit, total + 1, limit)):
+            if response["responseType"] == "empty list":
+                return
+            yield from response["result"]["items"]
@@ -2,9 +2,9 @@ import re
 import datetime
 import lxml.html
 import pytz
-from collections import defaultdict
 
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.checkpoints import load_checkpoints, save_checkpoints
 
 from .apiclient import OpenLegislationAPIClient
 from .actions import Categorizer
@@ -176,81 +176,60 @@ class NYBillScraper(Scraper):
 
         return vote
 
-    def _generate_bills(self, session, window=None):
+    def _generate_bills(self, session, from_datetime=None, to_datetime=None):
         self.logger.info("Generating bills.")
-        bills = defaultdict(list)
 
         delimiter = "-"
         (start_year, delimiter, end_year) = session.partition(delimiter)
-        page = 0
-        # 1000 is the current maximum returned record limit for all Open
-        # Legislature API calls that use the parameter.
-        limit = 1000
-        # Flag whether to retrieve full bill data.
-        full = True
-        while True:
-            # Updating the offset before the page matters here.
-            offset = limit * page + 1
-            page += 1
-
-            # Response should be a dict of the JSON data returned from
-            # the Open Legislation API.
-            if window:
-                to_datetime = datetime.datetime.now()
-                from_datetime = datetime.datetime.now() - self.parse_relative_time(
-                    window
-                )
 
-                # note for debugging:
-                # set detail=True to see what changed on the bill
-                response = self.api_client.get(
-                    "updated_bills",
-                    from_datetime=from_datetime.replace(microsecond=0).isoformat(),
-                    to_datetime=to_datetime.replace(microsecond=0).isoformat(),
-                    detail=False,
-                    summary=True,
-                    limit=limit,
-                    offset=offset,
-                    type="updated",
-                )
+        if not from_datetime:
+            yield from self.api_client.unpaginate(
+                "bills",
+                session_year=start_year,
+                # retrieve full bill data
+                full=True,
+            )
+            return
 
-                self.info(
-                    "{} bills updated since {}".format(
-                        response["total"],
-                        from_datetime.replace(microsecond=0).isoformat(),
-                    )
-                )
-            else:
-                response = self.api_client.get(
-                    "bills",
-                    session_year=start_year,
-                    limit=limit,
-                    offset=offset,
-                    full=full,
-                )
+        self.info(
+            "Fetching bills updated since {}".format(
+                from_datetime.replace(microsecond=0).isoformat()
+            )
+        )
+        # note for debugging:
+        # set detail=True to see what changed on the bill
+        updates = self.api_client.unpaginate(
+            "updated_bills",
+            from_datetime=from_datetime.replace(microsecond=0).isoformat(),
+            to_datetime=to_datetime.replace(microsecond=0).isoformat(),
+            detail=False,
+            summary=True,
+            type="updated",
+        )
 
-            if (
-                response["responseType"] == "empty list"
-                or response["offsetStart"] > response["offsetEnd"]
-            ):
-                break
-            else:
-                bills = response["result"]["items"]
-
-            for bill in bills:
-                if window:
-                    # https://legislation.nysenate.gov/api/3/bills/2017/S8570
-                    # unfortunately the updated bills since N api doesn't offer
-                    # the full bill info, so get them individually
-                    resp = self.api_client.get(
-                        "bill",
-                        session_year=bill["item"]["session"],
-                        bill_id=bill["item"]["printNo"],
-                        summary=False,
-                        detail=True,
-                    )
-                    bill = resp["result"]
-                yield bill
+        def updated_bills():
+            # a bill can show up on more than one page of updates, and
+            # updates are reported for every session, not just this one
+            seen = set()
+            for bill in updates:
+                key = (bill["item"]["session"], bill["item"]["printNo"])
+                if str(key[0]) == start_year and key not in seen:
+                    seen.add(key)
+                    yield key
+
+        def get_bill(key):
+            # https://legislation.nysenate.gov/api/3/bills/2017/S8570
+            # unfortunately the updated bills since N api doesn't offer
+            # the full bill info, so get them individually
+            return self.api_client.get(
+                "bill",
+                session_year=key[0],
+                bill_id=key[1],
+                summary=False,
+                detail=True,
+            )["result"]
+
+        yield from self.api_client.pager.map(get_bill, updated_bills())
 
     def _scrape_bill(self, session, bill_data):
         details = self._parse_bill_details(bill_data)
@@ -599,14 +578,41 @@ class NYBillScraper(Scraper):
     # NEW_YORK_API_KEY=key os-update ny bills --scrape bill_no=S155
     # or
     # NEW_YORK_API_KEY=key os-update ny bills --scrape window=5d1h
-    def scrape(self, session=None, bill_no=None, window=None):
+    # or, to only scrape bills updated since the last successful
+    # incremental run (the first run scrapes the whole session)
+    # NEW_YORK_API_KEY=key os-update ny bills --scrape incremental=true
+    def scrape(self, session=None, bill_no=None, window=None, incremental=False):
         self.api_client = OpenLegislationAPIClient(self)
         self.term_start_year = session.split("-")[0]
 
-        for bill in self._generate_bills(session, window):
-            if bill_no:
-                if bill["basePrintNo"] == bill_no.upper():
+        if isinstance(incremental, str):
+            incremental = incremental.lower() not in ["false", "0"]
+
+        # fixed up front so every page of updates covers the same range,
+        # and so nothing updated while the scrape runs is missed next time
+        to_datetime = datetime.datetime.now()
+        from_datetime = None
+        if window:
+            from_datetime = to_datetime - self.parse_relative_time(window)
+        elif incremental:
+            from_datetime = load_checkpoints("ny_bill_updates").get(session)
+            if from_datetime is None:
+                self.info("No previous incremental run, scraping the whole session")
+
+        try:
+            for bill in self._generate_bills(session, from_datetime, to_datetime):
+                if bill_no:
+                    if bill["basePrintNo"] == bill_no.upper():
+                        yield from self._scrape_bill(session, bill)
+                        return
+                else:
                     yield from self._scrape_bill(session, bill)
-                    return
-            else:
-                yield from self._scrape_bill(session, bill)
+        finally:
+            self.api_client.pager.log_stats()
+
+        # only reached if every bill was scraped without an exception
+        if incremental and not bill_no:
+            last_updates = load_checkpoints("ny_bill_updates")
+            last_updates[session] = to_datetime
+            save_checkpoints("ny_bill_updates", last_updates)
+            self.info(f"Saved last update time for {len(last_updates)} sessions")
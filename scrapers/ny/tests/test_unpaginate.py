@@ -0,0 +1,82 @@
+import logging
+import os
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from ny.apiclient import OpenLegislationAPIClient
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status_code = 200
+        self.headers = {}
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Serves `total` numbered bills a page at a time, by limit and offset."""
+
+    def __init__(self, total):
+        self.total = total
+        self.offsets = []
+
+    def get(self, url, **kwargs):
+        query = parse_qs(urlparse(url).query)
+        limit, offset = int(query["limit"][0]), int(query["offset"][0])
+        self.offsets.append(offset)
+        items = list(range(offset, min(offset + limit, self.total + 1)))
+        if not items:
+            return FakeResponse({"responseType": "empty list", "total": self.total})
+        return FakeResponse(
+            {
+                "responseType": "bill-info list",
+                "total": self.total,
+                "offsetStart": items[0],
+                "offsetEnd": items[-1],
+                "result": {"items": items},
+            }
+        )
+
+
+class FakeScraper:
+    headers = {"User-Agent": "openstates"}
+    logger = logging.getLogger("ny-test")
+
+    def info(self, message):
+        pass
+
+
+class TestUnpaginate(unittest.TestCase):
+    def unpaginate(self, total, limit=10):
+        with mock.patch.dict(os.environ, {"NEW_YORK_API_KEY": "key"}):
+            client = OpenLegislationAPIClient(FakeScraper(), workers=2)
+        client.session = FakeSession(total)
+        items = list(client.unpaginate("bills", limit=limit, session_year=2025))
+        return items, sorted(client.session.offsets)
+
+    def test_last_page_is_short(self):
+        items, offsets = self.unpaginate(25)
+        self.assertEqual(items, list(range(1, 26)))
+        self.assertEqual(offsets, [1, 11, 21])
+
+    def test_total_fills_the_last_page(self):
+        items, offsets = self.unpaginate(20)
+        self.assertEqual(items, list(range(1, 21)))
+        self.assertEqual(offsets, [1, 11])
+
+    def test_total_one_past_a_page(self):
+        items, offsets = self.unpaginate(11)
+        self.assertEqual(items, list(range(1, 12)))
+        self.assertEqual(offsets, [1, 11])
+
+    def test_single_page(self):
+        items, offsets = self.unpaginate(10)
+        self.assertEqual(items, list(range(1, 11)))
+        self.assertEqual(offsets, [1])
+
+    def test_empty_result(self):
+        self.assertEqual(self.unpaginate(0), ([], [1]))
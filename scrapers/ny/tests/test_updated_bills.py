@@ -0,0 +1,83 @@
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+from openstates import settings
+
+from ny.bills import NYBillScraper
+from utils.apiclient import ConcurrentPager
+
+SESSION = "2025-2026"
+
+UPDATES = [
+    {"item": {"session": 2025, "printNo": "S100"}},
+    {"item": {"session": 2023, "printNo": "S5"}},
+    {"item": {"session": 2025, "printNo": "A200"}},
+    # reported again on a later page
+    {"item": {"session": 2025, "printNo": "S100"}},
+]
+
+
+class FakeAPIClient:
+    """Serves a whole session and its updates, recording what's asked for."""
+
+    def __init__(self, scraper):
+        self.pager = ConcurrentPager(2)
+        self.listings = []
+        FakeAPIClient.last = self
+
+    def unpaginate(self, resource_name, **url_format_args):
+        self.listings.append((resource_name, url_format_args))
+        if resource_name == "bills":
+            return iter([{"basePrintNo": "S1"}, {"basePrintNo": "A1"}])
+        return iter(UPDATES)
+
+    def get(self, resource_name, session_year, bill_id, **url_format_args):
+        return {"result": {"basePrintNo": bill_id, "session": session_year}}
+
+
+class BillScraper(NYBillScraper):
+    def _scrape_bill(self, session, bill_data):
+        yield bill_data["basePrintNo"]
+
+
+@mock.patch("ny.bills.OpenLegislationAPIClient", FakeAPIClient)
+class TestUpdatedBills(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        patcher = mock.patch.object(settings, "SCRAPED_DATA_DIR", dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scrape(self, **kwargs):
+        return list(BillScraper(None, None).scrape(SESSION, **kwargs))
+
+    def test_window_fetches_each_updated_bill_once(self):
+        self.assertEqual(self.scrape(window="1d"), ["S100", "A200"])
+        ((resource_name, args),) = FakeAPIClient.last.listings
+        self.assertEqual(resource_name, "updated_bills")
+        since = datetime.datetime.fromisoformat(args["from_datetime"])
+        until = datetime.datetime.fromisoformat(args["to_datetime"])
+        self.assertEqual(until - since, datetime.timedelta(days=1))
+
+    def test_incremental_picks_up_after_the_last_run(self):
+        # the first run has nothing to pick up from
+        self.assertEqual(self.scrape(incremental="true"), ["S1", "A1"])
+        self.assertEqual(FakeAPIClient.last.listings[0][0], "bills")
+
+        self.assertEqual(self.scrape(incremental="true"), ["S100", "A200"])
+        ((resource_name, args),) = FakeAPIClient.last.listings
+        self.assertEqual(resource_name, "updated_bills")
+        first_until = args["to_datetime"]
+
+        self.scrape(incremental="true")
+        self.assertEqual(
+            FakeAPIClient.last.listings[0][1]["from_datetime"], first_until
+        )
+
+    def test_single_bill_isnt_recorded(self):
+        self.assertEqual(self.scrape(incremental="true", bill_no="a1"), ["A1"])
+        self.scrape(incremental="true")
+        self.assertEqual(FakeAPIClient.last.listings[0][0], "bills")
@@ -17,11 +17,31 @@ class OregonLegislatorODataClient(object):
         " and (SessionKey eq '{session}')&$expand=CommitteeAgendaItems,CommitteeMeetingDocuments",
         committee_members="Committees(CommitteeCode='{committee}',"
         "SessionKey='{session}')/CommitteeMembers",
+        # measures are fetched with everything the scrapers need expanded,
+        # so $select only the fields they use to keep the pages small
         measures="LegislativeSessions('{session}')/Measures"
         "?$expand=MeasureSponsors,MeasureDocuments,MeasureHistoryActions,"
-        "CommitteeAgendaItems/CommitteeProposedAmendments",
+        "CommitteeAgendaItems/CommitteeProposedAmendments"
+        "&$select=MeasurePrefix,MeasureNumber,RelatingTo,MeasureSummary,"
+        "MeasureSponsors/LegislatoreCode,MeasureSponsors/SponsorLevel,"
+        "MeasureDocuments/DocumentUrl,MeasureDocuments/VersionDescription,"
+        "MeasureHistoryActions/ActionText,MeasureHistoryActions/ActionDate,"
+        "MeasureHistoryActions/Chamber,"
+        "CommitteeAgendaItems/CommitteeProposedAmendments/Meaning,"
+        "CommitteeAgendaItems/CommitteeProposedAmendments/CommitteeCode,"
+        "CommitteeAgendaItems/CommitteeProposedAmendments/AmendmentNumber,"
+        "CommitteeAgendaItems/CommitteeProposedAmendments/ProposedAmendmentUrl,"
+        "CommitteeAgendaItems/CommitteeProposedAmendments/MeetingDate",
         votes="LegislativeSessions('{session}')/Measures"
-        "?$expand=MeasureHistoryActions/MeasureVotes,CommitteeAgendaItems/CommitteeVotes",
+        "?$expand=MeasureHistoryActions/MeasureVotes,CommitteeAgendaItems/CommitteeVotes"
+        "&$select=MeasurePrefix,MeasureNumber,"
+        "MeasureHistoryActions/ActionText,MeasureHistoryActions/ActionDate,"
+        "MeasureHistoryActions/Chamber,MeasureHistoryActions/MeasureVotes/VoteName,"
+        "MeasureHistoryActions/MeasureVotes/Vote,"
+        "CommitteeAgendaItems/Action,CommitteeAgendaItems/Comments,"
+        "CommitteeAgendaItems/MeetingDate,CommitteeAgendaItems/CommitteCode,"
+        "CommitteeAgendaItems/CommitteeVotes/VoteName,"
+        "CommitteeAgendaItems/CommitteeVotes/Meaning",
     )
 
     def _build_url(self, resource_name, **endpoint_format_args):
@@ -51,16 +71,57 @@ class OregonLegislatorODataClient(object):
         requests_kwargs=None,
         **url_format_args
     ):
-        num_bad_packets_allowed = 10
+        if page:
+            return list(
+                self.iter(
+                    resource_name,
+                    page,
+                    skip,
+                    requests_args,
+                    requests_kwargs,
+                    **url_format_args
+                )
+            )
+        return self._get_page(
+            self._build_url(resource_name, **url_format_args),
+            requests_args,
+            requests_kwargs,
+        )
+
+    def iter(
+        self,
+        resource_name,
+        page=100,
+        skip=0,
+        requests_args=None,
+        requests_kwargs=None,
+        **url_format_args
+    ):
+        """
+        Yield the results of a resource one at a time, requesting them
+        `page` at a time with $top/$skip, so only one page is held in memory
+        and the first results are available as soon as the first page is.
+        """
         url = self._build_url(resource_name, **url_format_args)
+        while True:
+            results = self._get_page(
+                "{url}&$top={page}&$skip={skip}".format(url=url, page=page, skip=skip),
+                requests_args,
+                requests_kwargs,
+            )
+            yield from results
+            # a short page is the last one
+            if len(results) < page:
+                return
+            skip += page
 
-        if page:
-            url = "{url}&$top={page}&$skip={skip}".format(url=url, page=page, skip=skip)
+    def _get_page(self, url, requests_args=None, requests_kwargs=None):
+        num_bad_packets_allowed = 10
 
         requests_args = requests_args or ()
-        requests_kwargs = requests_kwargs or {}
+        requests_kwargs = dict(requests_kwargs or {})
         requests_kwargs.update(verify=True)
-        headers = requests_kwargs.get("headers", {})
+        headers = dict(requests_kwargs.get("headers", {}))
         headers["Accept"] = "application/json"
         requests_kwargs["headers"] = headers
 
@@ -78,17 +139,4 @@ class OregonLegislatorODataClient(object):
                     print(err, string)
                     raise RuntimeError("Received too many bad packets from API.")
 
-        response = response.json()["value"]
-        if page and len(response) > 0:
-            skip += page
-            response.extend(
-                self.get(
-                    resource_name,
-                    page,
-                    skip,
-                    requests_args,
-                    requests_kwargs,
-                    **url_format_args
-                )
-            )
-        return response
+        return response.json()["value"]
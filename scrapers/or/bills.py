@@ -53,9 +53,7 @@ class ORBillScraper(Scraper):
 
     def scrape_bills(self, session):
         session_key = SESSION_KEYS[session]
-        measures_response = self.api_client.get(
-            "measures", page=500, session=session_key
-        )
+        measures_response = self.api_client.iter("measures", session=session_key)
 
         legislators = index_legislators(self, session_key)
 
@@ -0,0 +1,126 @@
+import importlib
+import json
+import os
+import re
+import unittest
+from urllib.parse import unquote
+
+apiclient = importlib.import_module("or.apiclient")
+bills = importlib.import_module("or.bills")
+votes = importlib.import_module("or.votes")
+
+here = os.path.dirname(__file__)
+
+with open(os.path.join(here, "fixtures", "measures.json")) as f:
+    MEASURES = json.load(f)
+
+LEGISLATORS = [
+    {"LegislatorCode": "Rep Fahey", "FirstName": "Julie", "LastName": "Fahey"},
+    {"LegislatorCode": "Sen Anderson", "FirstName": "Dick", "LastName": "Anderson"},
+]
+
+
+def project(record, paths):
+    """Keep only the $select paths of record, as the service does."""
+    fields = {}
+    for path in paths:
+        name, _, rest = path.partition("/")
+        fields.setdefault(name, []).append(rest)
+    projected = {}
+    for name, rests in fields.items():
+        value = record[name]
+        if all(rests):
+            value = [project(item, rests) for item in value]
+        projected[name] = value
+    return projected
+
+
+class FakeResponse:
+    def __init__(self, value):
+        self.value = value
+
+    def json(self):
+        return {"value": self.value}
+
+
+class ODataMixin:
+    """Answers measure listings like the OData service, recording each url."""
+
+    def get(self, url, *args, **kwargs):
+        self.urls.append(url)
+        url = unquote(url)
+        if url.endswith("/Legislators"):
+            return FakeResponse(LEGISLATORS)
+        select = re.search(r"\$select=([^&]+)", url).group(1).split(",")
+        top = int(re.search(r"\$top=(\d+)", url).group(1))
+        skip = int(re.search(r"\$skip=(\d+)", url).group(1))
+        return FakeResponse(
+            [project(measure, select) for measure in MEASURES[skip : skip + top]]
+        )
+
+
+class BillScraper(ODataMixin, bills.ORBillScraper):
+    def __init__(self):
+        super().__init__(None, None)
+        self.urls = []
+        self.api_client = apiclient.OregonLegislatorODataClient(self)
+
+
+class VoteScraper(ODataMixin, votes.ORVoteScraper):
+    def __init__(self):
+        super().__init__(None, None)
+        self.urls = []
+        self.api_client = apiclient.OregonLegislatorODataClient(self)
+
+
+class TestSelect(unittest.TestCase):
+    def test_bills_read_only_selected_fields(self):
+        scraped = {
+            bill.identifier: bill for bill in BillScraper().scrape_bills("2025R1")
+        }
+        self.assertEqual(list(scraped), ["HB2001", "SJR3", "SB10"])
+        bill = scraped["HB2001"]
+        self.assertEqual(
+            [(s["name"], s["primary"]) for s in bill.sponsorships],
+            [("Julie Fahey", True), ("Dick Anderson", False)],
+        )
+        self.assertEqual(
+            [v["note"] for v in bill.versions], ["Introduced", "HHC Amendment -2"]
+        )
+        self.assertEqual(
+            [d["note"] for d in bill.documents], ["2025-02-10 Proposed Amendment -1"]
+        )
+        self.assertEqual(len(bill.actions), 2)
+        self.assertEqual(
+            bill.abstracts[0]["abstract"], "Makes changes to laws about housing."
+        )
+
+    def test_votes_read_only_selected_fields(self):
+        scraped = list(VoteScraper().scrape_votes("2025R1"))
+        self.assertEqual(
+            [(v.motion_text, v.result) for v in scraped],
+            [
+                ("Third reading. Carried by Fahey. Passed.", "pass"),
+                ("Work Session", "pass"),
+            ],
+        )
+        self.assertEqual(
+            [(c["option"], c["value"]) for c in scraped[0].counts],
+            [("yes", 2), ("no", 1), ("absent", 1)],
+        )
+
+
+class TestPaging(unittest.TestCase):
+    def test_pages_until_a_short_one(self):
+        scraper = BillScraper()
+        measures = list(scraper.api_client.iter("measures", page=2, session="2025R1"))
+        self.assertEqual([m["MeasureNumber"] for m in measures], [2001, 3, 10])
+        self.assertEqual(
+            [re.search(r"\$top=\d+&\$skip=\d+", u).group(0) for u in scraper.urls],
+            ["$top=2&$skip=0", "$top=2&$skip=2"],
+        )
+
+    def test_full_page_asks_for_another(self):
+        scraper = BillScraper()
+        list(scraper.api_client.iter("votes", page=3, session="2025R1"))
+        self.assertEqual(len(scraper.urls), 2)
@@ -46,9 +46,7 @@ class ORVoteScraper(Scraper):
     def scrape_votes(self, session):
         self.session_key = SESSION_KEYS[session]
         self.legislators = index_legislators(self, self.session_key)
-        measures_response = self.api_client.get(
-            "votes", page=500, session=self.session_key
-        )
+        measures_response = self.api_client.iter("votes", session=self.session_key)
 
         for measure in measures_response:
             bid = "{} {}".format(measure["MeasurePrefix"], measure["MeasureNumber"])
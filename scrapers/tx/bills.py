@@ -1,19 +1,22 @@
 import datetime
-import ftplib
+import os
 import re
-import time
 from urllib import parse as urlparse
 import xml.etree.cElementTree as etree
+from collections import defaultdict
 
+from openstates import settings
 from openstates.scrape import Scraper, Bill
 from openstates.scrape.base import ScrapeError
 from utils import LXMLMixin
 from .actions import Categorizer
+from .ftp import FTPSession
 
 
 class TXBillScraper(Scraper, LXMLMixin):
     _FTP_ROOT = "ftp.legis.state.tx.us"
     CHAMBERS = {"H": "lower", "S": "upper"}
+    ACTORS = {"H": "lower", "S": "upper", "E": "executive"}
     NAME_SLUGS = {
         "I": "Introduced",
         "E": "Engrossed",
@@ -29,37 +32,9 @@ class TXBillScraper(Scraper, LXMLMixin):
 
     def _get_ftp_files(self, dir_):
         """Recursively traverse an FTP directory, returning all files"""
-        for i in range(3):
-            try:
-                ftp = ftplib.FTP(self._FTP_ROOT)
-                break
-            except (EOFError, ftplib.error_temp):
-                time.sleep(2**i)
-        else:
-            raise Exception
-
-        ftp.login()
-        ftp.cwd("/" + dir_)
         self.info("Searching an FTP folder for files ({})".format(dir_))
-
-        lines = []
-        ftp.retrlines("LIST", lines.append)
-        for line in lines:
-            (_date, _time, is_dir, _file_size, name) = re.search(
-                r"""(?x)
-                    ^(\d{2}-\d{2}-\d{2})\s+  # Date in mm-dd-yy
-                    (\d{2}:\d{2}[AP]M)\s+  # Time in hh:mmAM/PM
-                    (<DIR>)?\s+  # Directories will have an indicating flag
-                    (\d+)?\s+  # Files will have their size in bytes
-                    (.+?)\s*$  # Directory or file name is the remaining text
-                    """,
-                line,
-            ).groups()
-            if is_dir:
-                for item in self._get_ftp_files("/".join([dir_, name])):
-                    yield item
-            else:
-                yield "/".join(["ftp://" + self._FTP_ROOT, dir_, name])
+        for entry in self.ftp.walk(dir_):
+            yield self.ftp.url(entry.path)
 
     @staticmethod
     def _get_bill_id_from_file_path(file_path):
@@ -72,34 +47,82 @@ class TXBillScraper(Scraper, LXMLMixin):
             identifier += "R"
         return " ".join([identifier, number])
 
-    def scrape(self, session=None, chamber=None):
+    @classmethod
+    def _index_witnesses(cls, witness_files):
+        """Map bill IDs to the URLs of their witness lists."""
+        witnesses = defaultdict(list)
+        for item in witness_files:
+            witnesses[cls._get_bill_id_from_file_path(item)].append(item)
+        return witnesses
+
+    def scrape(self, session=None, chamber=None, changed_only=None):
         chambers = [chamber] if chamber else ["upper", "lower"]
+        # scraper arguments arrive as strings, e.g. changed_only=false
+        changed_only = str(changed_only).lower() in ("1", "true", "yes")
 
         session_code = self._format_session(session)
 
-        self.witnesses = []
+        # one connection for every listing and download in the scrape
+        self.ftp = FTPSession(self._FTP_ROOT, logger=self.logger)
+        try:
+            yield from self._scrape(session, session_code, chambers, changed_only)
+        finally:
+            self.ftp.close()
+            self.info("Made {} FTP connection(s)".format(self.ftp.connections))
+
+    def _scrape(self, session, session_code, chambers, changed_only):
         witness_files = self._get_ftp_files(
             "bills/{}/witlistbill/html".format(session_code)
         )
-        for item in witness_files:
-            bill_id = self._get_bill_id_from_file_path(item)
-            self.witnesses.append((bill_id, item))
+        self.witnesses = self._index_witnesses(witness_files)
+
+        # The history XML is kept in a local mirror and only files that
+        # changed on the server since the last run are downloaded again.
+        history_dir = "bills/{}/billhistory".format(session_code)
+        self.info("Mirroring FTP folder ({})".format(history_dir))
+        history_files = self.ftp.mirror(
+            history_dir,
+            os.path.join(settings.CACHE_DIR, "tx", session_code, "billhistory"),
+        )
+        self.info(
+            "{} of {} history files changed".format(
+                sum(f.changed for f in history_files), len(history_files)
+            )
+        )
 
-        history_files = self._get_ftp_files("bills/{}/billhistory".format(session_code))
-        for bill_url in history_files:
+        scraped = []
+        for history_file in history_files:
+            # set changed_only to skip bills whose history hasn't changed
+            if changed_only and not history_file.changed:
+                continue
+            bill_url = self.ftp.url(history_file.path)
             if "house" in bill_url:
                 if "lower" in chambers:
-                    yield from self.scrape_bill(session, bill_url)
+                    yield from self.scrape_bill(
+                        session, bill_url, history_file.local_path
+                    )
+                    scraped.append(history_file)
             elif "senate" in bill_url:
                 if "upper" in chambers:
-                    yield from self.scrape_bill(session, bill_url)
-
-    def scrape_bill(self, session, history_url):
-        history_xml = self.get(history_url).text
+                    yield from self.scrape_bill(
+                        session, bill_url, history_file.local_path
+                    )
+                    scraped.append(history_file)
+
+        # only now that they've been scraped do these files count as
+        # unchanged, so a failed run leaves them to be picked up next time
+        history_files.commit(scraped)
+
+    def scrape_bill(self, session, history_url, history_path=None):
+        if history_path:
+            with open(history_path, "rb") as f:
+                history_xml = f.read()
+        else:
+            history_xml = self.ftp.retrieve(urlparse.urlparse(history_url).path)
         root = etree.fromstring(history_xml)
 
         bill_title = root.findtext("caption")
-        if bill_title is None or "Bill does not exist" in history_xml:
+        if bill_title is None or b"Bill does not exist" in history_xml:
             self.warning("Bill does not appear to exist")
             return
         bill_id = " ".join(root.attrib["bill"].split(" ")[1:])
@@ -171,11 +194,10 @@ class TXBillScraper(Scraper, LXMLMixin):
                 media_type="text/html",
             )
 
-        witnesses = [x for x in self.witnesses if x[0] == bill_id]
-        for witness in witnesses:
+        for witness_url in self.witnesses.get(bill_id, ()):
             bill.add_document_link(
-                note="Witness List ({})".format(self.NAME_SLUGS[witness[1][-5]]),
-                url=witness[1],
+                note="Witness List ({})".format(self.NAME_SLUGS[witness_url[-5]]),
+                url=witness_url,
                 media_type="text/html",
             )
 
@@ -185,7 +207,7 @@ class TXBillScraper(Scraper, LXMLMixin):
             ).date()
 
             action_number = action.find("actionNumber").text
-            actor = {"H": "lower", "S": "upper", "E": "executive"}[action_number[0]]
+            actor = self.ACTORS[action_number[0]]
 
             desc = action.findtext("description").strip()
 
@@ -1,4 +1,5 @@
 from utils import LXMLMixin
+from utils.lxmlize import log_cache_stats
 import re
 import datetime as dt
 import dateutil.parser
@@ -31,6 +32,10 @@ class TXEventScraper(Scraper, LXMLMixin):
 
     chambers = {"lower": "House", "upper": "Senate"}
 
+    # an event's page is linked from its committee's page and the upcoming
+    # meetings list (and from both chambers' lists, for joint committees)
+    lxmlize_cache = True
+
     # Checks if an event is a duplicate.
     # Events are considered duplicate if they have the same
     # name, date, start time, and end time
@@ -46,6 +51,12 @@ class TXEventScraper(Scraper, LXMLMixin):
             return False
 
     def scrape(self, session=None, chamber=None):
+        try:
+            yield from self._scrape(session, chamber)
+        finally:
+            log_cache_stats()
+
+    def _scrape(self, session, chamber):
         event_count = 0
         if chamber:
             if chamber == "upper":
@@ -0,0 +1,219 @@
+import datetime
+import ftplib
+import io
+import json
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+
+FTPEntry = namedtuple("FTPEntry", ["path", "is_dir", "size", "modified"])
+MirroredFile = namedtuple("MirroredFile", ["path", "local_path", "changed", "stamp"])
+
+MANIFEST_NAME = ".manifest.json"
+
+# The Texas server is IIS and, where MLSD isn't available, answers LIST in
+# the DOS format: "01-15-23  09:41AM       <DIR>          billhistory"
+LIST_RE = re.compile(
+    r"""(?x)
+        ^(\d{2}-\d{2}-\d{2})\s+  # Date in mm-dd-yy
+        (\d{2}:\d{2}[AP]M)\s+  # Time in hh:mmAM/PM
+        (<DIR>)?\s+  # Directories will have an indicating flag
+        (\d+)?\s+  # Files will have their size in bytes
+        (.+?)\s*$  # Directory or file name is the remaining text
+        """
+)
+
+# errors after which the connection is thrown away and opened again
+RECONNECT_ERRORS = (EOFError, OSError, ftplib.error_temp, ftplib.error_reply)
+
+
+class FTPSession:
+    """
+    A single logged-in FTP connection that is reused for every listing and
+    download in a scrape, and transparently reopened if the server drops it.
+    """
+
+    def __init__(self, host, retries=3, logger=None):
+        self.host = host
+        self.retries = retries
+        self.logger = logger or logging.getLogger(__name__)
+        self._ftp = None
+        self._mlsd = None
+        self.connections = 0
+
+    def url(self, path):
+        return "ftp://{}/{}".format(self.host, path.lstrip("/"))
+
+    def _connect(self):
+        ftp = ftplib.FTP(self.host)
+        ftp.login()
+        self.connections += 1
+        return ftp
+
+    def close(self):
+        if self._ftp is not None:
+            try:
+                self._ftp.quit()
+            except RECONNECT_ERRORS:
+                pass
+            self._ftp = None
+
+    def _call(self, func):
+        """Call func(ftp), reconnecting and retrying if the connection fails."""
+        for attempt in range(self.retries):
+            try:
+                if self._ftp is None:
+                    self._ftp = self._connect()
+                return func(self._ftp)
+            except RECONNECT_ERRORS as e:
+                self.logger.warning(
+                    "FTP error on {} ({}), reconnecting".format(self.host, e)
+                )
+                self._ftp = None
+                time.sleep(2**attempt)
+        raise ftplib.Error(
+            "Gave up on {} after {} tries".format(self.host, self.retries)
+        )
+
+    def list(self, dir_):
+        """Return FTPEntries for the contents of a single directory."""
+        dir_ = "/" + dir_.strip("/")
+
+        if self._mlsd is not False:
+            try:
+                entries = self._call(lambda ftp: list(ftp.mlsd(dir_)))
+                self._mlsd = True
+                return [
+                    self._mlsd_entry(dir_, name, facts)
+                    for name, facts in entries
+                    if facts.get("type") in ("file", "dir")
+                ]
+            except ftplib.error_perm:
+                # the server doesn't speak MLSD, fall back to LIST
+                self._mlsd = False
+
+        def list_(ftp):
+            # a fresh list on every attempt, so a retry doesn't repeat lines
+            lines = []
+            ftp.retrlines("LIST " + dir_, lines.append)
+            return lines
+
+        lines = self._call(list_)
+        return [self._list_entry(dir_, line) for line in lines if line.strip()]
+
+    @staticmethod
+    def _mlsd_entry(dir_, name, facts):
+        modified = facts.get("modify")
+        if modified:
+            modified = datetime.datetime.strptime(modified[:14], "%Y%m%d%H%M%S")
+        size = facts.get("size")
+        return FTPEntry(
+            "/".join([dir_, name]),
+            facts["type"] == "dir",
+            int(size) if size is not None else None,
+            modified,
+        )
+
+    @staticmethod
+    def _list_entry(dir_, line):
+        (date, time_, is_dir, size, name) = LIST_RE.search(line).groups()
+        return FTPEntry(
+            "/".join([dir_, name]),
+            bool(is_dir),
+            int(size) if size else None,
+            datetime.datetime.strptime(date + " " + time_, "%m-%d-%y %I:%M%p"),
+        )
+
+    def walk(self, dir_):
+        """Recursively yield FTPEntries for all files below dir_."""
+        for entry in self.list(dir_):
+            if entry.is_dir:
+                yield from self.walk(entry.path)
+            else:
+                yield entry
+
+    def retrieve(self, path):
+        """Download a file over the shared connection, returning its bytes."""
+
+        def retr(ftp):
+            buf = io.BytesIO()
+            ftp.retrbinary("RETR " + path, buf.write)
+            return buf.getvalue()
+
+        return self._call(retr)
+
+    def mirror(self, dir_, local_dir):
+        """
+        Bring local_dir up to date with every file below dir_, keeping the
+        directory layout.
+
+        The size and modification time of each processed file are kept in
+        a manifest in local_dir, and only files that are new or whose size
+        or modification time has changed since are downloaded again. Files
+        that have disappeared from the server are removed.
+
+        Returns a Mirror of MirroredFiles for every file currently on the
+        server. The manifest isn't touched until Mirror.commit() is called,
+        so files stay changed until whatever uses them has succeeded.
+        """
+        dir_ = "/" + dir_.strip("/")
+        manifest_path = os.path.join(local_dir, MANIFEST_NAME)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        files = Mirror(manifest_path, manifest)
+        for entry in self.walk(dir_):
+            local_path = os.path.join(local_dir, os.path.relpath(entry.path, dir_))
+            stamp = {
+                "size": entry.size,
+                "modified": entry.modified.isoformat() if entry.modified else None,
+            }
+            changed = manifest.get(entry.path) != stamp or not os.path.exists(
+                local_path
+            )
+            if changed:
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                with open(local_path + ".part", "wb") as f:
+                    f.write(self.retrieve(entry.path))
+                os.replace(local_path + ".part", local_path)
+            files.append(MirroredFile(entry.path, local_path, changed, stamp))
+
+        current = {f.path for f in files}
+        for path in set(manifest) - current:
+            local_path = os.path.join(local_dir, os.path.relpath(path, dir_))
+            if os.path.exists(local_path):
+                os.remove(local_path)
+
+        return files
+
+
+class Mirror(list):
+    """The MirroredFiles from FTPSession.mirror, with their manifest."""
+
+    def __init__(self, manifest_path, manifest):
+        super().__init__()
+        self.manifest_path = manifest_path
+        self.manifest = manifest
+
+    def commit(self, files=None):
+        """
+        Record files (by default all of them) in the manifest as processed,
+        so they're only changed in a later mirror if the server's copy is.
+        """
+        files = self if files is None else files
+        current = {f.path for f in self}
+        manifest = {
+            path: stamp for path, stamp in self.manifest.items() if path in current
+        }
+        manifest.update((f.path, f.stamp) for f in files)
+
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path + ".part", "w") as f:
+            json.dump(manifest, f)
+        os.replace(self.manifest_path + ".part", self.manifest_path)
+        self.manifest = manifest
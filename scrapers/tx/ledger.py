@@ -0,0 +1,111 @@
+"""
+On-disk ledger of the votes the TX vote scraper found in each journal.
+
+Journals don't change once the final version is posted, but every run
+used to download and parse all of them since the start of the session.
+Entries are keyed on the journal URL and remember its ETag/Last-Modified
+(for a conditional GET) and SHA-256, along with every VoteEvent it
+produced, so an unchanged journal is replayed instead of parsed.
+
+Bump PARSER_VERSION whenever a change to votes.py would find different
+votes in the same journal, so entries written by the old code are
+ignored.
+"""
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+
+from openstates.scrape import VoteEvent
+
+PARSER_VERSION = 1
+
+# set when a scrape yields the vote, not part of what the journal says
+UNSAVED_FIELDS = ("_id", "jurisdiction", "scraped_at")
+
+
+def vote_to_dict(vote):
+    data = {k: v for k, v in vote.as_dict().items() if k not in UNSAVED_FIELDS}
+    data["start_date"] = data["start_date"].isoformat()
+    return data
+
+
+def vote_from_dict(data):
+    data = dict(data)
+    vote = VoteEvent(
+        motion_text=data.pop("motion_text"),
+        start_date=datetime.date.fromisoformat(data.pop("start_date")),
+        classification=data.pop("motion_classification"),
+        result=data.pop("result"),
+        legislative_session=data.pop("legislative_session"),
+    )
+    for key, value in data.items():
+        setattr(vote, key, value)
+    return vote
+
+
+class JournalLedger:
+    def __init__(self, path):
+        self.path = path
+        self.hits = self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS journals ("
+            "url TEXT PRIMARY KEY, parser_version INTEGER, etag TEXT, "
+            "last_modified TEXT, sha256 TEXT, votes TEXT)"
+        )
+
+    def conditional_headers(self, url):
+        """Headers for a GET that only returns the journal if it changed."""
+        row = self.db.execute(
+            "SELECT etag, last_modified FROM journals "
+            "WHERE url = ? AND parser_version = ?",
+            (url, PARSER_VERSION),
+        ).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def replay(self, url, response):
+        """
+        Return the VoteEvents recorded for the journal if the response says
+        it's unchanged (a 304, or the same content), and None otherwise.
+        """
+        row = self.db.execute(
+            "SELECT sha256, votes FROM journals WHERE url = ? AND parser_version = ?",
+            (url, PARSER_VERSION),
+        ).fetchone()
+        if row and (
+            response.status_code == 304
+            or hashlib.sha256(response.content).hexdigest() == row[0]
+        ):
+            self.hits += 1
+            return [vote_from_dict(vote) for vote in json.loads(row[1])]
+        self.misses += 1
+        return None
+
+    def record(self, url, response, votes):
+        self.db.execute(
+            "REPLACE INTO journals "
+            "(url, parser_version, etag, last_modified, sha256, votes) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                PARSER_VERSION,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                hashlib.sha256(response.content).hexdigest(),
+                json.dumps([vote_to_dict(vote) for vote in votes]),
+            ),
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
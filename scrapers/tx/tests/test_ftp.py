@@ -0,0 +1,203 @@
+import ftplib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tx.ftp import FTPSession
+
+
+class FakeFTP:
+    """
+    Serves files from a dict of path -> (bytes, "YYYYmmddHHMMSS"), answering
+    MLSD unless mlsd is False, and dropping the connection after `drop_after`
+    commands if it's given.
+    """
+
+    def __init__(self, files, mlsd=True, drop_after=None):
+        self.files = files
+        self.mlsd_ok = mlsd
+        self.drop_after = drop_after
+        self.commands = []
+
+    def _command(self, command):
+        self.commands.append(command)
+        if self.drop_after is not None and len(self.commands) > self.drop_after:
+            raise EOFError("connection dropped")
+
+    def _children(self, dir_):
+        children = {}
+        prefix = dir_.rstrip("/") + "/"
+        for path, (data, modified) in self.files.items():
+            if path.startswith(prefix):
+                name, _, rest = path[len(prefix) :].partition("/")
+                if rest:
+                    children[name] = ("dir", None, modified)
+                else:
+                    children[name] = ("file", len(data), modified)
+        return children
+
+    def mlsd(self, dir_):
+        self._command("MLSD " + dir_)
+        if not self.mlsd_ok:
+            raise ftplib.error_perm("500 MLSD not understood")
+        for name, (type, size, modified) in self._children(dir_).items():
+            facts = {"type": type, "modify": modified}
+            if size is not None:
+                facts["size"] = str(size)
+            yield name, facts
+
+    def retrlines(self, command, callback):
+        self._command(command)
+        dir_ = command.split(" ", 1)[1]
+        for name, (type, size, modified) in self._children(dir_).items():
+            stamp = "{}-{}-{}  {}:{}AM".format(
+                modified[4:6], modified[6:8], modified[2:4], modified[8:10], "00"
+            )
+            if type == "dir":
+                callback("{}       <DIR>          {}".format(stamp, name))
+            else:
+                callback("{}             {:>6} {}".format(stamp, size, name))
+
+    def retrbinary(self, command, callback):
+        self._command(command)
+        callback(self.files[command.split(" ", 1)[1]][0])
+
+    def quit(self):
+        pass
+
+
+class DroppedListFTP(FakeFTP):
+    """Drops the connection after sending the first line of a LIST."""
+
+    def retrlines(self, command, callback):
+        def first_line(line):
+            callback(line)
+            raise EOFError("connection dropped")
+
+        super().retrlines(command, first_line)
+
+
+class FakeFTPSession(FTPSession):
+    def __init__(self, *connections):
+        super().__init__("ftp.example.com")
+        self.fakes = list(connections)
+
+    def _connect(self):
+        self.connections += 1
+        return self.fakes.pop(0)
+
+
+FILES = {
+    "/bills/89R/billhistory/house_bills/HB00001_HB00099/HB 1.xml": (
+        b"<billhistory/>",
+        "20250115094100",
+    ),
+    "/bills/89R/billhistory/senate_bills/SB00001_SB00099/SB 2.xml": (
+        b"<billhistory />",
+        "20250116101500",
+    ),
+}
+
+
+class TestFTPSession(unittest.TestCase):
+    def test_one_connection_for_listing_and_downloads(self):
+        ftp = FakeFTPSession(FakeFTP(FILES))
+        paths = [entry.path for entry in ftp.walk("bills/89R/billhistory")]
+        self.assertEqual(sorted(paths), sorted(FILES))
+        for path in paths:
+            self.assertEqual(ftp.retrieve(path), FILES[path][0])
+        self.assertEqual(ftp.connections, 1)
+
+    @mock.patch("time.sleep")
+    def test_reconnects_when_dropped(self, sleep):
+        ftp = FakeFTPSession(FakeFTP(FILES, drop_after=1), FakeFTP(FILES))
+        paths = sorted(entry.path for entry in ftp.walk("bills/89R/billhistory"))
+        self.assertEqual(paths, sorted(FILES))
+        self.assertEqual(ftp.connections, 2)
+
+    def test_list_when_mlsd_is_refused(self):
+        ftp = FakeFTPSession(FakeFTP(FILES, mlsd=False))
+        entries = sorted(ftp.walk("/bills/89R/billhistory"))
+        self.assertEqual([e.path for e in entries], sorted(FILES))
+        self.assertEqual(entries[0].size, len(b"<billhistory/>"))
+        self.assertEqual(entries[0].modified.isoformat(), "2025-01-15T09:00:00")
+
+    @mock.patch("time.sleep")
+    def test_list_retried_after_a_drop_has_no_duplicates(self, sleep):
+        ftp = FakeFTPSession(
+            DroppedListFTP(FILES, mlsd=False), FakeFTP(FILES, mlsd=False)
+        )
+        paths = [e.path for e in ftp.list("/bills/89R/billhistory")]
+        self.assertEqual(
+            paths,
+            [
+                "/bills/89R/billhistory/house_bills",
+                "/bills/89R/billhistory/senate_bills",
+            ],
+        )
+        self.assertEqual(ftp.connections, 2)
+
+
+class TestMirror(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        self.local_dir = dir.name
+        self.files = dict(FILES)
+
+    def mirror(self, commit=True):
+        ftp = FakeFTPSession(FakeFTP(self.files))
+        files = ftp.mirror("bills/89R/billhistory", self.local_dir)
+        if commit:
+            files.commit()
+        return {os.path.basename(f.path): f for f in files}
+
+    def read(self, file):
+        with open(file.local_path, "rb") as f:
+            return f.read()
+
+    def test_only_changed_files_are_downloaded(self):
+        files = self.mirror()
+        self.assertTrue(all(f.changed for f in files.values()))
+        self.assertEqual(self.read(files["HB 1.xml"]), b"<billhistory/>")
+
+        path = "/bills/89R/billhistory/house_bills/HB00001_HB00099/HB 1.xml"
+        self.files[path] = (b"<billhistory>new</billhistory>", "20250117080000")
+        files = self.mirror()
+        self.assertTrue(files["HB 1.xml"].changed)
+        self.assertFalse(files["SB 2.xml"].changed)
+        self.assertEqual(
+            self.read(files["HB 1.xml"]), b"<billhistory>new</billhistory>"
+        )
+
+    def test_removed_files_are_deleted(self):
+        files = self.mirror()
+        del self.files["/bills/89R/billhistory/senate_bills/SB00001_SB00099/SB 2.xml"]
+        self.assertEqual(list(self.mirror()), ["HB 1.xml"])
+        self.assertFalse(os.path.exists(files["SB 2.xml"].local_path))
+
+    def test_missing_local_file_is_downloaded_again(self):
+        files = self.mirror()
+        os.remove(files["SB 2.xml"].local_path)
+        files = self.mirror()
+        self.assertTrue(files["SB 2.xml"].changed)
+        self.assertFalse(files["HB 1.xml"].changed)
+        self.assertEqual(self.read(files["SB 2.xml"]), b"<billhistory />")
+
+    def test_files_stay_changed_until_committed(self):
+        files = self.mirror(commit=False)
+        self.assertTrue(all(f.changed for f in files.values()))
+        files = self.mirror(commit=False)
+        self.assertTrue(all(f.changed for f in files.values()))
+
+    def test_commit_only_the_processed_files(self):
+        ftp = FakeFTPSession(FakeFTP(self.files))
+        files = ftp.mirror("bills/89R/billhistory", self.local_dir)
+        files.commit([f for f in files if f.path.endswith("HB 1.xml")])
+
+        files = self.mirror()
+        self.assertFalse(files["HB 1.xml"].changed)
+        self.assertTrue(files["SB 2.xml"].changed)
+        files = self.mirror()
+        self.assertFalse(any(f.changed for f in files.values()))
@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from openstates import settings
+from tx.bills import TXBillScraper
+from tx.tests.test_ftp import FILES, FakeFTP, FakeFTPSession
+
+
+class HistoryScraper(TXBillScraper):
+    def __init__(self, fail_on=None):
+        super().__init__(None, None)
+        self.fail_on = fail_on
+        self.scraped = []
+
+    def _get_ftp_files(self, dir_):
+        return []
+
+    def scrape_bill(self, session, history_url, history_path=None):
+        if self.fail_on and history_url.endswith(self.fail_on):
+            raise ValueError("bad history file")
+        self.scraped.append(history_url.rsplit("/", 1)[1])
+        yield from ()
+
+    def run(self):
+        self.ftp = FakeFTPSession(FakeFTP(FILES))
+        list(self._scrape("89R", "89R", ["upper", "lower"], True))
+        return self.scraped
+
+
+class TestChangedOnly(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        patcher = mock.patch.object(settings, "CACHE_DIR", dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged_bills_are_skipped(self):
+        self.assertEqual(HistoryScraper().run(), ["HB 1.xml", "SB 2.xml"])
+        self.assertEqual(HistoryScraper().run(), [])
+
+    def test_failed_scrape_is_retried(self):
+        with self.assertRaises(ValueError):
+            HistoryScraper(fail_on="SB 2.xml").run()
+        self.assertEqual(HistoryScraper().run(), ["HB 1.xml", "SB 2.xml"])
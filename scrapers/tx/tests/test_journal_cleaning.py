@@ -0,0 +1,95 @@
+import logging
+import unittest
+
+import lxml.html
+
+from tx.votes import clean_journal, votes
+
+LOGGER = logging.getLogger("test")
+
+JOURNAL = """<html><body>
+<div class="textpara">SENATE BILL 100 ON THIRD READING</div><br>
+<div class="textpara">The motion prevailed by the following
+vote:&nbsp;&nbsp;Yeas<font color="White">ii</font>29, Nays 2.</div><br>
+<div class="textpara">Yeas — Alvarado; Bettencourt; Birdwell.</div><br>
+<div class="textpara">Nays — Garcia; Rodríguez.</div><br>
+<p></p>after an empty paragraph
+<div class="textpara">SB 101 (Cook, Patterson, and Thimesch - no)
+(135 - 3 - 1)</div><br>
+<div class="textpara">1</div>
+<hr noshade size="1">
+<p>89th LEGISLATURE — REGULAR SESSION</p>
+<p>SENATE JOURNAL — 12th Day</p>
+<div class="textpara">SB 102 (Hinojosa)</div><br>
+<div class="textpara">(viva voce vote) (30-1) "Nay" Middleton</div><br>
+<div class="textpara">The resolution was adopted by a viva voce vote.</div><br>
+<div class="textpara">2</div>
+<hr noshade size="1.0">
+<p>REGULAR SESSION — continued</p>
+<p>HOUSE JOURNAL — 12th Day<font color="White">i</font></p>
+<hr size="1">
+<p><br></p>
+<div class="textpara">All Members are deemed to have voted "Yea" on the
+adoption of the resolution.</div>
+</body></html>"""
+
+
+def legacy_clean_journal(root):
+    # the separate XPath passes clean_journal replaced
+    for el in root.xpath("//hr[@noshade and @size=1]"):
+        parent = el.getparent()
+        previous = el.getprevious()
+        if previous:
+            parent.remove(previous)
+        parent.remove(el)
+
+    for el in root.xpath("//p[contains(text(), 'REGULAR SESSION')]"):
+        if el.text.endswith("REGULAR SESSION"):
+            el.getparent().remove(el)
+
+    for el in root.xpath("//p[contains(text(), 'JOURNAL')]"):
+        if (
+            "HOUSE JOURNAL" in el.text or "SENATE JOURNAL" in el.text
+        ) and "Day" in el.text:
+            el.getparent().remove(el)
+
+    for el in root.xpath("//p[not(node())]"):
+        if el.tail and el.tail != "\r\n" and el.getprevious() is not None:
+            el.getprevious().tail = el.tail
+        el.getparent().remove(el)
+
+    for el in root.xpath('//font[@color="White"]'):
+        if el.text:
+            el.text = " " * len(el.text)
+
+
+def vote_dicts(votes):
+    return [{k: v for k, v in vote.as_dict().items() if k != "_id"} for vote in votes]
+
+
+class TestCleanJournal(unittest.TestCase):
+    def test_same_as_separate_passes(self):
+        legacy = lxml.html.fromstring(JOURNAL)
+        legacy_clean_journal(legacy)
+        root = lxml.html.fromstring(JOURNAL)
+        paragraphs = clean_journal(root, LOGGER)
+
+        self.assertEqual(lxml.html.tostring(root), lxml.html.tostring(legacy))
+        self.assertEqual(
+            [(el.get("class"), text) for el, text in paragraphs],
+            [(el.get("class"), el.text_content()) for el in legacy.iter("div")],
+        )
+        found = vote_dicts(votes(root, "89R", "upper", paragraphs))
+        self.assertTrue(found)
+        self.assertEqual(found, vote_dicts(votes(legacy, "89R", "upper")))
+
+    def test_page_furniture_is_removed(self):
+        root = lxml.html.fromstring(JOURNAL)
+        clean_journal(root, LOGGER)
+        text = root.text_content()
+        self.assertNotIn("SENATE JOURNAL", text)
+        self.assertNotIn("89th LEGISLATURE", text)
+        self.assertIn("REGULAR SESSION — continued", text)
+        self.assertIn("after an empty paragraph", text)
+        self.assertEqual(len(root.xpath("//hr")), 1)
+        self.assertEqual(root.xpath("//font/text()"), ["  "])
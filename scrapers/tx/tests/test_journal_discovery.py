@@ -0,0 +1,102 @@
+import unittest
+
+import scrapelib
+
+from tx.votes import TXVoteScraper
+
+HOUSE = "https://journals.house.texas.gov/HJRNL/89R/HTML/"
+SENATE = "https://journals.senate.texas.gov/SJRNL/89R/HTML/"
+
+HOUSE_INDEX = """<html><body>
+<a href="/HJRNL/89R/HTML/89RDAY01FINAL.HTM">89RDAY01FINAL.HTM</a>
+<a href="89rday02cfinal.htm">89RDAY02CFINAL.HTM</a>
+<a href="/HJRNL/89R/PDF/89RDAY01FINAL.PDF">89RDAY01FINAL.PDF</a>
+</body></html>"""
+
+CANDIDATES = [
+    (HOUSE + "89RDAY01FINAL.HTM", "lower", "89R"),
+    (HOUSE + "89RDAY01CFINAL.HTM", "lower", "89R"),
+    (HOUSE + "89RDAY02FINAL.HTM", "lower", "89R"),
+    (HOUSE + "89RDAY02CFINAL.HTM", "lower", "89R"),
+    (SENATE + "89RSJ01-14-F.HTM", "upper", "89R"),
+    (SENATE + "89RSJ01-14-F1.HTM", "upper", "89R"),
+    (SENATE + "89RSJ01-15-F.HTM", "upper", "89R"),
+]
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, text=""):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+
+
+class JournalScraper(TXVoteScraper):
+    """Serves a house journal directory listing, and answers HEADs from a dict."""
+
+    def __init__(self, index=HOUSE_INDEX, heads=None):
+        super().__init__(None, None)
+        self.index = index
+        self.heads = heads or {}
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url))
+        if self.index is None or not url.startswith(HOUSE):
+            raise scrapelib.HTTPError(FakeResponse(url, 403))
+        return FakeResponse(url, text=self.index)
+
+    def head(self, url, **kwargs):
+        self.requests.append(("HEAD", url))
+        status_code = self.heads.get(url, 404)
+        if status_code >= 400:
+            raise scrapelib.HTTPError(FakeResponse(url, status_code))
+        return FakeResponse(url, status_code)
+
+
+class TestDiscoverJournals(unittest.TestCase):
+    def test_journals_are_found_in_the_listing(self):
+        scraper = JournalScraper()
+        self.assertEqual(
+            scraper.list_journals(HOUSE),
+            {
+                (HOUSE + "89RDAY01FINAL.HTM").upper(),
+                (HOUSE + "89RDAY02CFINAL.HTM").upper(),
+            },
+        )
+        found = scraper.discover_journals("89R", ["lower"], CANDIDATES)
+        self.assertEqual(
+            found, {HOUSE + "89RDAY01FINAL.HTM", HOUSE + "89RDAY02CFINAL.HTM"}
+        )
+        self.assertNotIn("HEAD", [method for method, _ in scraper.requests])
+
+    def test_each_journal_is_checked_without_a_listing(self):
+        scraper = JournalScraper(
+            heads={
+                SENATE + "89RSJ01-14-F.HTM": 200,
+                # the server won't answer HEAD, so the GET has to settle it
+                SENATE + "89RSJ01-15-F.HTM": 405,
+                SENATE + "89RSJ01-14-F1.HTM": 410,
+            }
+        )
+        found = scraper.discover_journals("89R", ["upper"], CANDIDATES)
+        self.assertEqual(
+            found, {SENATE + "89RSJ01-14-F.HTM", SENATE + "89RSJ01-15-F.HTM"}
+        )
+        self.assertEqual(
+            scraper.requests,
+            [("GET", SENATE)]
+            + [("HEAD", url) for url, chamber, _ in CANDIDATES if chamber == "upper"],
+        )
+
+    def test_both_chambers(self):
+        scraper = JournalScraper(heads={SENATE + "89RSJ01-15-F.HTM": 200})
+        found = scraper.discover_journals("89R", ["lower", "upper"], CANDIDATES)
+        self.assertEqual(
+            found,
+            {
+                HOUSE + "89RDAY01FINAL.HTM",
+                HOUSE + "89RDAY02CFINAL.HTM",
+                SENATE + "89RSJ01-15-F.HTM",
+            },
+        )
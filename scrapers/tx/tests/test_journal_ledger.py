@@ -0,0 +1,125 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from openstates import settings
+from openstates.scrape import VoteEvent
+
+from tx import ledger
+from tx.ledger import JournalLedger
+from tx.votes import TXVoteScraper
+
+URL = "https://journals.senate.texas.gov/SJRNL/89R/HTML/89RSJ01-14-F.HTM"
+JOURNAL = (
+    b"<html><body><p>SB 1 was passed by (Record 12): Yeas 30, Nays 1.</p></body></html>"
+)
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.text = content.decode()
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class LedgerScraper(TXVoteScraper):
+    """Serves one journal, answering conditional GETs, and counts parses."""
+
+    def __init__(self, journal=JOURNAL, etag='"1"'):
+        super().__init__(None, None)
+        self.journal = journal
+        self.etag = etag
+        self.parsed = 0
+
+    def candidate_journals(self, session, chambers):
+        return [(URL, "upper", "89R")]
+
+    def discover_journals(self, session, chambers, candidates):
+        return {URL}
+
+    def get(self, url, headers=None, **kwargs):
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            return FakeResponse(b"", 304)
+        return FakeResponse(
+            self.journal, headers={"ETag": self.etag} if self.etag else {}
+        )
+
+    def journal_votes(self, url, chamber, session, session_url_filename_part, page):
+        self.parsed += 1
+        vote = VoteEvent(
+            motion_text="passage",
+            start_date=datetime.date(2025, 1, 14),
+            classification="passage",
+            result="pass",
+            legislative_session=session,
+            bill="SB 1",
+            bill_chamber="upper",
+            chamber=chamber,
+        )
+        vote.set_count("yes", 30)
+        vote.set_count("no", 1)
+        vote.yes("Bettencourt")
+        vote.no("Hughes")
+        vote.add_source(url)
+        vote.dedupe_key = self.build_vote_dedupe_key(vote, chamber)
+        yield vote
+
+
+def scraped(votes):
+    return [
+        {k: v for k, v in vote.as_dict().items() if k not in ledger.UNSAVED_FIELDS}
+        for vote in votes
+    ]
+
+
+class TestJournalLedger(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        patcher = mock.patch.object(settings, "CACHE_DIR", dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(dir.name, "tx", "journal_ledger.sqlite3")
+
+    def scrape(self, scraper, **kwargs):
+        return list(scraper.scrape("89R", "upper", **kwargs))
+
+    def test_unchanged_journal_is_replayed(self):
+        first = LedgerScraper()
+        votes = self.scrape(first)
+        self.assertEqual(first.parsed, 1)
+
+        # not modified
+        second = LedgerScraper()
+        replayed = self.scrape(second)
+        self.assertEqual(scraped(replayed), scraped(votes))
+        self.assertEqual(replayed[0].dedupe_key, votes[0].dedupe_key)
+        self.assertEqual(second.parsed, 0)
+
+        # no ETag, but the same content
+        third = LedgerScraper(etag=None)
+        self.assertEqual(scraped(self.scrape(third)), scraped(votes))
+        self.assertEqual(third.parsed, 0)
+
+    def test_changed_journal_is_parsed(self):
+        self.scrape(LedgerScraper())
+        scraper = LedgerScraper(JOURNAL.replace(b"Nays 1", b"Nays 2"), etag='"2"')
+        self.scrape(scraper)
+        self.assertEqual(scraper.parsed, 1)
+
+    def test_ledger_can_be_turned_off(self):
+        self.scrape(LedgerScraper())
+        scraper = LedgerScraper()
+        self.scrape(scraper, ledger="false")
+        self.assertEqual(scraper.parsed, 1)
+
+    def test_entries_from_another_parser_version_are_ignored(self):
+        self.scrape(LedgerScraper())
+        with mock.patch.object(ledger, "PARSER_VERSION", ledger.PARSER_VERSION + 1):
+            journals = JournalLedger(self.path)
+            self.addCleanup(journals.close)
+            self.assertEqual(journals.conditional_headers(URL), {})
+            self.assertIsNone(journals.replay(URL, FakeResponse(JOURNAL)))
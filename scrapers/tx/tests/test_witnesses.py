@@ -0,0 +1,33 @@
+import unittest
+
+from tx.bills import TXBillScraper
+
+ROOT = "ftp://ftp.legis.state.tx.us/bills/89R/witlistbill/html"
+
+WITNESS_FILES = [
+    ROOT + "/house_bills/HB00001_HB00099/HB00001H.HTM",
+    ROOT + "/house_bills/HB00001_HB00099/HB00001S.HTM",
+    ROOT + "/house_bills/HB00001_HB00099/HB00010H.HTM",
+    ROOT + "/house_concurrent_res/HC00001_HC00099/HC00002H.HTM",
+    ROOT + "/senate_joint_res/SJ00001_SJ00099/SJ00003S.HTM",
+    ROOT + "/senate_resolutions/SR00001_SR00099/SR00004S.HTM",
+]
+
+
+class TestWitnessIndex(unittest.TestCase):
+    def test_lists_are_indexed_by_bill_id(self):
+        witnesses = TXBillScraper._index_witnesses(WITNESS_FILES)
+        self.assertEqual(
+            {
+                bill_id: [url[-12:] for url in urls]
+                for bill_id, urls in witnesses.items()
+            },
+            {
+                "HB 1": ["HB00001H.HTM", "HB00001S.HTM"],
+                "HB 10": ["HB00010H.HTM"],
+                "HCR 2": ["HC00002H.HTM"],
+                "SJR 3": ["SJ00003S.HTM"],
+                "SR 4": ["SR00004S.HTM"],
+            },
+        )
+        self.assertNotIn("HB 100", witnesses)
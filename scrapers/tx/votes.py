@@ -6,8 +6,11 @@ import scrapelib
 import collections
 
 import lxml.html
+from openstates import settings
 from openstates.scrape import Scraper, VoteEvent
 
+from .ledger import JournalLedger
+
 
 SPELLED_OUT_BILL_REGEX = re.compile(
     # Section headings spell the bill type out, e.g.
@@ -38,6 +41,9 @@ LOCAL_CALENDAR_BILL_REGEX = re.compile(
     r"^\s*((?:CS)?[HS][JC]?[BR][\s\xa0]+\d+)\s*\("
 )
 
+# like XPath's translate(., "YEAS", "yeas"), which lowercases only those letters
+YEAS_LOWER = str.maketrans("YEAS", "yeas")
+
 NAY_NAMES_REGEX = re.compile(r"[\"“]Nay[\"”]\s+([^()\"“]+)")
 
 
@@ -51,33 +57,99 @@ def next_tag(el):
     return el
 
 
+def is_attached(el, root):
+    while el is not None:
+        if el is root:
+            return True
+        el = el.getparent()
+    return False
+
+
+def attribute_equals_number(value, number):
+    # how XPath compares an attribute to a number, e.g. @size=1
+    try:
+        return float(value) == number
+    except (TypeError, ValueError):
+        return False
+
+
 def clean_journal(root, logger):
+    """
+    Strip page furniture out of a journal, in a single walk of the tree,
+    and return (div, text) for every remaining <div> in document order:
+    the paragraphs votes are looked for in.
+
+    The cleanups are applied in the order the original separate passes ran
+    in, and to the elements those passes would have found.
+    """
+    page_breaks = []
+    session_headers = []
+    journal_headers = []
+    empty_paras = []
+    white_fonts = []
+    divs = []
+    # document order of every <p>, so paragraphs emptied by the cleanups
+    # are removed in the same order as ones that started out empty
+    para_order = {}
+
+    for i, el in enumerate(root.iter()):
+        tag = el.tag
+        if tag == "div":
+            divs.append(el)
+        elif tag == "p":
+            para_order[el] = i
+            text = el.text
+            if not text:
+                if len(el) == 0:
+                    empty_paras.append(el)
+            elif "REGULAR SESSION" in text and text.endswith("REGULAR SESSION"):
+                session_headers.append(el)
+            elif (
+                "HOUSE JOURNAL" in text or "SENATE JOURNAL" in text
+            ) and "Day" in text:
+                journal_headers.append(el)
+        elif tag == "hr":
+            if el.get("noshade") is not None and attribute_equals_number(
+                el.get("size"), 1
+            ):
+                page_breaks.append(el)
+        elif tag == "font":
+            if el.get("color") == "White":
+                white_fonts.append(el)
+
+    emptied = set()
+
     # Remove page breaks
-    for el in root.xpath("//hr[@noshade and @size=1]"):
+    for el in page_breaks:
         parent = el.getparent()
         previous = el.getprevious()
         if previous:
             parent.remove(previous)
         logger.debug(f"Killed hr: {el.text_content()}")
         parent.remove(el)
+        emptied.add(parent)
 
-    # Does lxml not support xpath ends-with?
-    for el in root.xpath("//p[contains(text(), 'REGULAR SESSION')]"):
-        if el.text.endswith("REGULAR SESSION"):
+    for el in session_headers:
+        if is_attached(el, root):
             parent = el.getparent()
             logger.debug(f"Killed REGULAR SESSION: {el.text_content()}")
             parent.remove(el)
+            emptied.add(parent)
 
-    for el in root.xpath("//p[contains(text(), 'JOURNAL')]"):
-        if (
-            "HOUSE JOURNAL" in el.text or "SENATE JOURNAL" in el.text
-        ) and "Day" in el.text:
+    for el in journal_headers:
+        if is_attached(el, root):
             parent = el.getparent()
             logger.debug(f"Killed HOUSE/SENATE/JOURNAL: {el.text_content()}")
             parent.remove(el)
+            emptied.add(parent)
 
-    # Remove empty paragraphs
-    for el in root.xpath("//p[not(node())]"):
+    # Remove empty paragraphs, including any the removals above emptied
+    empty_paras.extend(
+        el for el in emptied if el.tag == "p" and len(el) == 0 and not el.text
+    )
+    for el in sorted(set(empty_paras), key=para_order.get):
+        if not is_attached(el, root):
+            continue
         if el.tail and el.tail != "\r\n" and el.getprevious() is not None:
             el.getprevious().tail = el.tail
         logger.debug(f"Killed empty para: {el.text_content()}")
@@ -85,11 +157,13 @@ def clean_journal(root, logger):
 
     # Journal pages sometimes replace spaces with <font color="White">i</font>
     # (or multiple i's for bigger spaces)
-    for el in root.xpath('//font[@color="White"]'):
+    for el in white_fonts:
         if el.text:
             logger.debug("Replaced white text")
             el.text = " " * len(el.text)
 
+    return [(el, el.text_content()) for el in divs if is_attached(el, root)]
+
 
 def names(el):
     text = (el.text or "") + (el.tail or "")
@@ -142,14 +216,25 @@ def clean_starting_name(name):
     return re.split(r"[\u2014:]", name)[-1]
 
 
-def votes(root, session, chamber):
-    for vote in record_votes_with_yeas(root, session, chamber):
+def journal_paragraphs(root):
+    """(div, text) for every <div> in the journal, in document order."""
+    return [(el, el.text_content()) for el in root.iter("div")]
+
+
+def votes(root, session, chamber, paragraphs=None):
+    # paragraphs, as returned by clean_journal, saves each vote finder
+    # searching the whole journal again
+    if paragraphs is None:
+        paragraphs = journal_paragraphs(root)
+    for vote in record_votes_with_yeas(root, session, chamber, paragraphs):
         yield vote
-    for vote in viva_voce_votes(root, session, chamber):
+    for vote in viva_voce_votes(root, session, chamber, paragraphs):
         yield vote
-    for vote in record_votes_with_short_count_notation(root, session, chamber):
+    for vote in record_votes_with_short_count_notation(
+        root, session, chamber, paragraphs
+    ):
         yield vote
-    for vote in local_calendar_votes(root, session, chamber):
+    for vote in local_calendar_votes(root, session, chamber, paragraphs):
         yield vote
 
 
@@ -473,7 +558,7 @@ short_count_notation_regex = re.compile(
 )
 
 
-def record_votes_with_short_count_notation(root, session, chamber):
+def record_votes_with_short_count_notation(root, session, chamber, paragraphs=None):
     # votes with short vote count notation may look like:
     # SB 422 (Cook, Patterson, and Thimesch - no) (135 - 3 - 1)
     # or
@@ -483,10 +568,11 @@ def record_votes_with_short_count_notation(root, session, chamber):
     # voting no after the deadline established by Rule 5, Section 52, of the House Rules.)
 
     # so we catch them by finding the (135 - 3 - 1) notation
-    paragraphs = root.xpath('//div[@class = "textpara"]')
+    if paragraphs is None:
+        paragraphs = journal_paragraphs(root)
     vote_elements = []
-    for p in paragraphs:
-        if short_count_notation_regex.search(p.text_content()):
+    for p, text in paragraphs:
+        if p.get("class") == "textpara" and short_count_notation_regex.search(text):
             vote_elements.append(p)
 
     maybe_votes = [MaybeShortCount(el) for el in vote_elements]
@@ -523,7 +609,7 @@ def record_votes_with_short_count_notation(root, session, chamber):
         yield v
 
 
-def local_calendar_votes(root, session, chamber):
+def local_calendar_votes(root, session, chamber, paragraphs=None):
     # The senate's Local & Uncontested Calendar lists each bill with a
     # terse per-bill vote entry in the journal, e.g.:
     #   SB 2474 (Hinojosa)
@@ -531,8 +617,12 @@ def local_calendar_votes(root, session, chamber):
     #   (viva voce vote) (30-1) "Nay" Middleton (30-1) "Nay" Middleton
     # Two count groups are the second-reading and final-passage votes,
     # which the bill history lists as two record votes on the same day.
-    for el in root.xpath('//div[@class = "textpara"]'):
-        text = " ".join(el.text_content().split())
+    if paragraphs is None:
+        paragraphs = journal_paragraphs(root)
+    for el, text in paragraphs:
+        if el.get("class") != "textpara":
+            continue
+        text = " ".join(text.split())
         if not LOCAL_CALENDAR_VOTE_REGEX.match(text):
             continue
 
@@ -589,7 +679,7 @@ def local_calendar_votes(root, session, chamber):
             yield v
 
 
-def record_votes_with_yeas(root, session, chamber):
+def record_votes_with_yeas(root, session, chamber, paragraphs=None):
     # votes with "yeas" may look like:
     # SB 186 was passed by (Record 2040): 122 Yeas, 17 Nays, 1 Present, not voting.
     # or
@@ -597,11 +687,13 @@ def record_votes_with_yeas(root, session, chamber):
     # Present, not voting.
     # or
     # Amendment No. 1 failed of adoption by (Record 2044): 48 Yeas, 78 Nays, 1 Present, not voting
-    vote_selectors = [
-        '[@class = "textpara"]',
-        '[contains(translate(., "YEAS", "yeas"), "yeas")]',
+    if paragraphs is None:
+        paragraphs = journal_paragraphs(root)
+    vote_elements = [
+        el
+        for el, text in paragraphs
+        if el.get("class") == "textpara" and "yeas" in text.translate(YEAS_LOWER)
     ]
-    vote_elements = root.xpath("//div{}".format("".join(vote_selectors)))
     maybe_votes = [MaybeVote(el) for el in vote_elements]
 
     for mv in maybe_votes:
@@ -653,8 +745,12 @@ def clean_vote_name(name):
     return name
 
 
-def viva_voce_votes(root, session, chamber):
-    vote_elements = root.xpath('//div[starts-with(., "All Members are deemed")]')
+def viva_voce_votes(root, session, chamber, paragraphs=None):
+    if paragraphs is None:
+        paragraphs = journal_paragraphs(root)
+    vote_elements = [
+        el for el, text in paragraphs if text.startswith("All Members are deemed")
+    ]
     maybe_votes = [MaybeViva(el) for el in vote_elements]
 
     for mv in maybe_votes:
@@ -701,7 +797,7 @@ def get_journal_session_url_file_part(session, chamber):
 
 
 class TXVoteScraper(Scraper):
-    def scrape(self, session=None, chamber=None, url_match=None):
+    def scrape(self, session=None, chamber=None, url_match=None, ledger=True):
         self._seen_vote_keys = set()
 
         if session == "821":
@@ -713,6 +809,85 @@ class TXVoteScraper(Scraper):
 
         chambers = [chamber] if chamber else ["upper", "lower"]
 
+        # votes found in each journal are kept on disk, and replayed when
+        # the journal hasn't changed since; set ledger=false to reparse all
+        if isinstance(ledger, str):
+            ledger = ledger.lower() not in ["false", "0"]
+        self.ledger = None
+        if ledger:
+            self.ledger = JournalLedger(
+                os.path.join(settings.CACHE_DIR, "tx", "journal_ledger.sqlite3")
+            )
+
+        try:
+            yield from self._scrape(session, chambers, url_match)
+        finally:
+            if self.ledger:
+                self.info(
+                    f"{self.ledger.hits} journals replayed from the ledger, "
+                    f"{self.ledger.misses} parsed"
+                )
+                self.ledger.close()
+
+    def _scrape(self, session, chambers, url_match):
+        candidates = [
+            candidate
+            for candidate in self.candidate_journals(session, chambers)
+            if url_match is None or url_match.lower() in candidate[0].lower()
+        ]
+        found = self.discover_journals(session, chambers, candidates)
+
+        urls_scraped = []
+        urls_failed_on_exception = []
+        for journal_url, journal_chamber, session_url_part in candidates:
+            if journal_url not in found:
+                urls_failed_on_exception.append(journal_url)
+                continue
+            headers = {}
+            if self.ledger:
+                headers = self.ledger.conditional_headers(journal_url)
+            try:
+                response = self.get(journal_url, headers=headers)
+            except scrapelib.HTTPError:
+                urls_failed_on_exception.append(journal_url)
+                continue
+            urls_scraped.append(journal_url)
+
+            journal_votes = None
+            if self.ledger:
+                journal_votes = self.ledger.replay(journal_url, response)
+            if journal_votes is None:
+                journal_votes = list(
+                    self.journal_votes(
+                        journal_url,
+                        journal_chamber,
+                        session,
+                        session_url_part,
+                        response.text,
+                    )
+                )
+                if self.ledger:
+                    self.ledger.record(journal_url, response, journal_votes)
+            yield from self.dedupe_votes(journal_votes)
+
+        urls_tried = "\n".join(urls_scraped)
+        urls_failed_on_exception = "\n".join(urls_failed_on_exception)
+        # log out URLs that were either scraped or failed out (ignored)
+        # useful if you want to ensure a certain URL is getting tried
+        self.logger.debug(f"Scraped urls: {urls_tried}")
+        self.logger.debug(f"Failed urls: {urls_failed_on_exception}")
+
+    @staticmethod
+    def journal_root(session, chamber):
+        if chamber == "lower":
+            return "https://journals.house.texas.gov/HJRNL/%s/HTML/" % session
+        return "https://journals.senate.texas.gov/SJRNL/%s/HTML/" % session
+
+    def candidate_journals(self, session, chambers):
+        """
+        Return (url, chamber, session_url_part) for every journal that could
+        have been posted so far, in the order they should be scraped.
+        """
         # go through every day this year before today
         # (or end of the year of the session, if prior year)
         # and see if there were any journals that day
@@ -728,103 +903,99 @@ class TXVoteScraper(Scraper):
         else:
             journal_day = datetime.datetime(today.year, 1, 1)
         day_num = 1
-        urls_scraped = []
-        urls_failed_on_exception = []
+        candidates = []
         while journal_day <= today:
             if "lower" in chambers:
-                journal_root = (
-                    "https://journals.house.texas.gov/HJRNL/%s/HTML/" % session
-                )
                 session_url_part = get_journal_session_url_file_part(session, "lower")
                 journal_url = (
-                    journal_root
+                    self.journal_root(session, "lower")
                     + session_url_part
                     + "DAY"
                     + str(day_num).zfill(2)
                     + "FINAL.HTM"
                 )
-                if url_match is None or url_match.lower() in journal_url.lower():
-                    try:
-                        self.get(journal_url)
-                    except scrapelib.HTTPError:
-                        urls_failed_on_exception.append(journal_url)
-                        pass
-                    else:
-                        urls_scraped.append(journal_url)
-                        yield from self.scrape_journal(
-                            journal_url, "lower", session, session_url_part
-                        )
-
+                candidates.append((journal_url, "lower", session_url_part))
                 # Check if this "legislative day" has a Continuing journal entry
                 # a "Cont" entry can occur the next actual calendar day
                 continuing_url = journal_url.replace("FINAL", "CFINAL")
-                if url_match is None or url_match.lower() in continuing_url.lower():
-                    try:
-                        self.get(continuing_url)
-                    except scrapelib.HTTPError:
-                        urls_failed_on_exception.append(continuing_url)
-                        pass
-                    else:
-                        urls_scraped.append(continuing_url)
-                        yield from self.scrape_journal(
-                            continuing_url, "lower", session, session_url_part
-                        )
+                candidates.append((continuing_url, "lower", session_url_part))
 
             if "upper" in chambers:
-                journal_root = (
-                    "https://journals.senate.texas.gov/SJRNL/%s/HTML/" % session
-                )
                 session_url_part = get_journal_session_url_file_part(session, "upper")
-                journal_url = journal_root + "%sSJ%s-%s-F.HTM" % (
+                journal_url = self.journal_root(
+                    session, "upper"
+                ) + "%sSJ%s-%s-F.HTM" % (
                     session_url_part,
                     str(journal_day.month).zfill(2),
                     str(journal_day.day).zfill(2),
                 )
-                if url_match is None or url_match.lower() in journal_url.lower():
-                    try:
-                        self.get(journal_url)
-                    except scrapelib.HTTPError:
-                        urls_failed_on_exception.append(journal_url)
-                        pass
-                    else:
-                        urls_scraped.append(journal_url)
-                        yield from self.scrape_journal(
-                            journal_url, "upper", session, session_url_part
-                        )
-
+                candidates.append((journal_url, "upper", session_url_part))
                 # Check if this "legislative day" has a Continuing journal entry
                 # a "Cont" entry can occur the next actual calendar day
                 continuing_url = journal_url.replace("F.", "F1.")
-                if url_match is None or url_match.lower() in continuing_url.lower():
-                    try:
-                        self.get(continuing_url)
-                    except scrapelib.HTTPError:
-                        urls_failed_on_exception.append(continuing_url)
-                        pass
-                    else:
-                        urls_scraped.append(continuing_url)
-                        yield from self.scrape_journal(
-                            continuing_url, "upper", session, session_url_part
-                        )
+                candidates.append((continuing_url, "upper", session_url_part))
 
             journal_day += datetime.timedelta(days=1)
             day_num += 1
+        return candidates
+
+    def discover_journals(self, session, chambers, candidates):
+        """
+        Return the set of candidate journal URLs that exist.
+
+        Each chamber's journal directory is read for the list of posted
+        journals; if it can't be, each of the chamber's candidates is checked
+        with a HEAD request instead.
+        """
+        found = set()
+        for chamber in chambers:
+            urls = [url for url, c, _ in candidates if c == chamber]
+            listed = self.list_journals(self.journal_root(session, chamber))
+            if listed:
+                found.update(url for url in urls if url.upper() in listed)
+            else:
+                self.info(f"Checking {len(urls)} possible {chamber} journals")
+                found.update(url for url in urls if self.journal_exists(url))
+        return found
+
+    def list_journals(self, index_url):
+        """Return the upper-cased URLs linked from a journal directory listing."""
+        try:
+            doc = lxml.html.fromstring(self.get(index_url).text)
+        except (scrapelib.HTTPError, lxml.etree.ParserError):
+            return set()
+        doc.make_links_absolute(index_url)
+        return {
+            href.upper()
+            for href in doc.xpath("//a/@href")
+            if href.upper().endswith(".HTM")
+        }
+
+    def journal_exists(self, url):
+        try:
+            self.head(url, allow_redirects=True)
+        except scrapelib.HTTPError as e:
+            # anything but "not there" (say the server won't answer HEAD)
+            # is left for the GET to settle
+            return e.response.status_code not in (404, 410)
+        return True
+
+    def scrape_journal(
+        self, url, chamber, session, session_url_filename_part, page=None
+    ):
+        if page is None:
+            page = self.get(url).text
+        yield from self.dedupe_votes(
+            self.journal_votes(url, chamber, session, session_url_filename_part, page)
+        )
 
-        urls_tried = "\n".join(urls_scraped)
-        urls_failed_on_exception = "\n".join(urls_failed_on_exception)
-        # log out URLs that were either scraped or failed out (ignored)
-        # useful if you want to ensure a certain URL is getting tried
-        self.logger.debug(f"Scraped urls: {urls_tried}")
-        self.logger.debug(f"Failed urls: {urls_failed_on_exception}")
-
-    def scrape_journal(self, url, chamber, session, session_url_filename_part):
-        page = self.get(url).text
-
+    def journal_votes(self, url, chamber, session, session_url_filename_part, page):
+        """Yield every vote in a journal, with its dedupe_key set."""
         root = lxml.html.fromstring(page)
-        clean_journal(root, self.logger)
+        paragraphs = clean_journal(root, self.logger)
 
         if chamber == "lower":
-            div = root.xpath("//div[@class = 'textpara']")[0]
+            div = [el for el, _ in paragraphs if el.get("class") == "textpara"][0]
             date_str = " ".join(div.text.split()[-4:]).strip()
             date = datetime.datetime.strptime(date_str, "%A, %B %d, %Y").date()
         else:
@@ -841,7 +1012,7 @@ class TXVoteScraper(Scraper):
             )
             date = datetime.datetime.strptime(date_str, "%m-%d %Y").date()
 
-        for vote in votes(root, session, chamber):
+        for vote in votes(root, session, chamber, paragraphs):
             vote.start_date = date
             vote.add_source(url)
 
@@ -851,6 +1022,10 @@ class TXVoteScraper(Scraper):
             # same counts on the same bill and day are kept when their
             # motions differ (e.g. rule suspension then final passage).
             vote.dedupe_key = self.build_vote_dedupe_key(vote, chamber)
+            yield vote
+
+    def dedupe_votes(self, votes):
+        for vote in votes:
             if vote.dedupe_key in self._seen_vote_keys:
                 self.logger.debug(f"Skipping duplicate vote: {vote.dedupe_key}")
                 continue
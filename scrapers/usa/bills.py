@@ -1,5 +1,8 @@
 import datetime
+import email.utils
 import os
+import tempfile
+import zipfile
 
 import lxml
 import pytz
@@ -7,7 +10,26 @@ import re
 import requests
 import xml.etree.ElementTree as ET
 
+from openstates import settings
 from openstates.scrape import Bill, Scraper, VoteEvent, Event
+from utils.checkpoints import load_checkpoints, save_checkpoints
+from .rollcalls import RollCallFetcher
+
+
+def flatten(el, prefix="", into=None):
+    """
+    Return a dict mapping the relative path of each descendant of el (e.g.
+    "sourceSystem/name") to its text. As with find(), the first element in
+    document order wins when a path repeats.
+    """
+    if into is None:
+        into = {}
+    for child in el:
+        path = prefix + child.tag
+        if path not in into:
+            into[path] = child.text
+        flatten(child, path + "/", into)
+    return into
 
 
 # NOTE: This is a US federal bill scraper designed to output bills in the
@@ -96,13 +118,59 @@ class USBillScraper(Scraper):
         "SCONRES": "resolution",
     }
 
+    # govinfo also publishes each congress/bill type's BILLSTATUS files as one zip
+    bundle_url = "https://www.govinfo.gov/bulkdata/BILLSTATUS/{congress}/{bill_type}/BILLSTATUS-{congress}-{bill_type}.zip"
+
     # to scrape everything UPDATED after a given date/time, start="2020-01-01 22:01:01"
-    def scrape(self, chamber=None, session=None, start=None, hearings=True):
+    # without a start, each sitemap picks up after the newest lastmod seen in it on
+    # the last successful run, unless watermark=false
+    def scrape(
+        self,
+        chamber=None,
+        session=None,
+        start=None,
+        hearings=True,
+        bulk=False,
+        watermark=True,
+        vote_workers=4,
+        vote_cache=False,
+    ):
         if start:
             start = datetime.datetime.strptime(start, "%Y-%m-%d %H:%I:%S")
+            watermark = False
         else:
             start = datetime.datetime(1980, 1, 1, 0, 0, 1)
 
+        if isinstance(watermark, str):
+            watermark = watermark.lower() not in ["false", "0"]
+
+        # USA roll call requests sometimes fail for a long time, and the wait on retries
+        # piles up very quickly, causing the whole scrape to be over 24 hours
+        # so, roll calls are fetched with requests directly to avoid long retries cycle
+        # "vote_cache" keeps fetched roll calls on disk for later runs
+        if isinstance(vote_cache, str):
+            vote_cache = vote_cache.lower() not in ["false", "0"]
+        # Nov 2025 update: roll call endpoint seems to deny a lot of cloud traffic
+        # Adding support for proxy for this request specifically
+        proxies = None
+        if os.environ.get("HTTPS_PROXY_SELECTIVE"):
+            proxies = {
+                "https": os.environ.get("HTTPS_PROXY_SELECTIVE"),
+                "http": os.environ.get("HTTP_PROXY_SELECTIVE"),
+            }
+        self.roll_calls = RollCallFetcher(
+            max_workers=int(vote_workers),
+            cache_dir=(
+                os.path.join(settings.CACHE_DIR, "usa", "rollcalls")
+                if vote_cache
+                else None
+            ),
+            proxies=proxies,
+            verify=not proxies,
+        )
+        watermarks = load_checkpoints("usa_bill_watermarks") if watermark else {}
+        self.newest_lastmods = {}
+
         # "hearings" flag determines whether we scrape hearing data found amongst bill data
         # this is problematic in Plural Open usage because the import pipeline wants one
         # set of events at a time as a snapshot of truth
@@ -114,6 +182,11 @@ class USBillScraper(Scraper):
         elif isinstance(hearings, str):
             hearings = True
 
+        # "bulk" reads each congress/bill type from its zip bundle rather than
+        # fetching every bill's XML separately
+        if isinstance(bulk, str):
+            bulk = bulk.lower() not in ["false", "0"]
+
         sitemap_url = (
             "https://www.govinfo.gov/sitemap/bulkdata/BILLSTATUS/sitemapindex.xml"
         )
@@ -123,20 +196,38 @@ class USBillScraper(Scraper):
         # if you want to test a bill:
         # yield from self.parse_bill('https://www.govinfo.gov/bulkdata/BILLSTATUS/119/hr/BILLSTATUS-119hr1968.xml')
 
-        for link in root.findall("us:sitemap/us:loc", self.ns):
-            # split by /, then check that "116s" matches the chamber
-            if chamber:
-                link_parts = link.text.split("/")
-                chamber_code = link_parts[-2][3]
-                if chamber_code != self.chamber_map[chamber]:
-                    continue
+        try:
+            for link in root.findall("us:sitemap/us:loc", self.ns):
+                # split by /, then check that "116s" matches the chamber
+                if chamber:
+                    link_parts = link.text.split("/")
+                    chamber_code = link_parts[-2][3]
+                    if chamber_code != self.chamber_map[chamber]:
+                        continue
+
+                if session in link.text:
+                    sitemap_start = max(start, watermarks.get(link.text, start))
+                    yield from self.parse_bill_list(
+                        link.text, sitemap_start, hearings, bulk
+                    )
+        finally:
+            self.roll_calls.close()
 
-            if session in link.text:
-                yield from self.parse_bill_list(link.text, start, hearings)
+        self.info(
+            f"Fetched {self.roll_calls.fetches} roll calls, "
+            f"{self.roll_calls.hits} reused within the run"
+        )
+
+        # only reached if every sitemap was scraped without an exception
+        if watermark:
+            watermarks.update(self.newest_lastmods)
+            save_checkpoints("usa_bill_watermarks", watermarks)
+            self.info(f"Saved lastmod watermarks for {len(watermarks)} sitemaps")
 
-    def parse_bill_list(self, url, start, scrape_hearings=True):
+    def parse_bill_list(self, url, start, scrape_hearings=True, bulk=False):
         sitemap = self.get(url).content
         root = ET.fromstring(sitemap)
+        updated = []
         for row in root.findall("us:url", self.ns):
             date = datetime.datetime.fromisoformat(
                 self.get_xpath(row, "us:lastmod")[:-1]
@@ -147,10 +238,110 @@ class USBillScraper(Scraper):
                 self.debug(
                     f"{datetime.datetime.strftime(date, '%c')} > {datetime.datetime.strftime(start, '%c')}, scraping {bill_url}"
                 )
+                updated.append((date, bill_url))
+
+        if bulk and updated:
+            # sitemap urls look like .../BILLSTATUS/118hr/sitemap.xml
+            congress, bill_type = re.match(r"(\d+)(\w+)", url.split("/")[-2]).groups()
+            yield from self.parse_bill_bundle(
+                congress, bill_type, updated, scrape_hearings
+            )
+        else:
+            for date, bill_url in updated:
                 yield from self.parse_bill(bill_url, scrape_hearings)
 
+        if updated:
+            self.newest_lastmods[url] = max(date for date, bill_url in updated)
+
+    def parse_bill_bundle(self, congress, bill_type, updated, scrape_hearings=True):
+        """
+        Parse the bills in `updated` (a list of (lastmod, url) pairs) out of
+        the congress/bill type's zip bundle, downloading it once.
+
+        Bills whose lastmod is newer than the bundle, or that aren't in it,
+        are fetched individually.
+        """
+        wanted = {
+            bill_url.split("/")[-1]: (date, bill_url) for date, bill_url in updated
+        }
+        bundle_url = self.bundle_url.format(congress=congress, bill_type=bill_type)
+
+        with tempfile.TemporaryFile() as bundle:
+            try:
+                last_modified = self.download_bundle(bundle_url, bundle)
+                fetched = True
+            except requests.exceptions.RequestException as e:
+                self.warning(
+                    f"Unable to fetch {bundle_url} ({e}), fetching bills individually"
+                )
+                fetched = False
+
+            if fetched and zipfile.is_zipfile(bundle):
+                with zipfile.ZipFile(bundle) as zf:
+                    bundle_date = self.bundle_date(bundle_url, zf, last_modified)
+                    self.info(f"Reading {len(wanted)} bills from {bundle_url}")
+                    for member in zf.infolist():
+                        filename = member.filename.split("/")[-1]
+                        if filename not in wanted or wanted[filename][0] > bundle_date:
+                            continue
+                        del wanted[filename]
+                        yield from self.parse_bill_xml(zf.read(member), scrape_hearings)
+            elif fetched:
+                self.warning(f"{bundle_url} is not a zip, fetching bills individually")
+
+        if wanted:
+            self.info(
+                f"Fetching {len(wanted)} bills newer than or missing from {bundle_url}"
+            )
+        for date, bill_url in wanted.values():
+            yield from self.parse_bill(bill_url, scrape_hearings)
+
+    def download_bundle(self, bundle_url, out):
+        """
+        Stream the bundle into the file `out`, returning its Last-Modified.
+
+        This deliberately doesn't go through scrapelib: its cache reads the
+        whole response (hundreds of MB for the larger bill types) into
+        memory, and writes a copy to the cache dir, before returning it.
+        """
+        with requests.get(
+            bundle_url,
+            stream=True,
+            headers={"User-Agent": self.headers.get("User-Agent")},
+            verify=self.verify,
+            timeout=60,
+        ) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(chunk_size=1024 * 1024):
+                out.write(chunk)
+            return resp.headers.get("Last-Modified")
+
+    def bundle_date(self, bundle_url, zf, last_modified):
+        """
+        When the bundle was built, in naive UTC like the sitemap lastmods:
+        from its Last-Modified header, or else the newest file in it.
+        """
+        if last_modified:
+            bundle_date = email.utils.parsedate_to_datetime(last_modified)
+            return bundle_date.astimezone(pytz.utc).replace(tzinfo=None)
+        if not zf.infolist():
+            return datetime.datetime.min
+        # zip times are local to wherever the zip was built, which for
+        # govinfo is US/Eastern
+        newest = max(datetime.datetime(*member.date_time) for member in zf.infolist())
+        bundle_date = (
+            self._TZ.localize(newest).astimezone(pytz.utc).replace(tzinfo=None)
+        )
+        self.info(
+            f"{bundle_url} has no Last-Modified, dating it by its newest file: "
+            f"{bundle_date}"
+        )
+        return bundle_date
+
     def parse_bill(self, url, scrape_hearings=True):
-        xml = self.get(url).content
+        yield from self.parse_bill_xml(self.get(url).content, scrape_hearings)
+
+    def parse_bill_xml(self, xml, scrape_hearings=True):
         xml = ET.fromstring(xml)
 
         bill_num = self.get_xpath(xml, "bill/billNumber")
@@ -181,14 +372,21 @@ class USBillScraper(Scraper):
         )
 
         try:
-            self.scrape_actions(bill, xml)
-            self.scrape_amendments(bill, xml, session, chamber, bill_id)
+            actions = self.get_rows(xml, "bill/actions/item")
+            self.scrape_actions(bill, actions)
+            self.scrape_amendments(
+                bill,
+                self.get_rows(xml, "bill/amendments/amendment"),
+                session,
+                chamber,
+                bill_id,
+            )
             self.scrape_cbo(bill, xml)
             self.scrape_committee_reports(bill, xml)
-            self.scrape_cosponsors(bill, xml)
+            self.scrape_cosponsors(bill, self.get_rows(xml, "bill/cosponsors/item"))
             self.scrape_laws(bill, xml)
             self.scrape_related_bills(bill, xml)
-            self.scrape_sponsors(bill, xml)
+            self.scrape_sponsors(bill, self.get_rows(xml, "bill/sponsors/item"))
             self.scrape_subjects(bill, xml)
             self.scrape_summaries(bill, xml)
             self.scrape_titles(bill, xml)
@@ -221,15 +419,15 @@ class USBillScraper(Scraper):
         # disabled 9/2021 - congress.gov was giving 503s
         # self.scrape_public_law_version(bill, cg_url)
         if scrape_hearings:
-            for event in self.scrape_hearing_by(bill, xml, xml_url):
+            for event in self.scrape_hearing_by(bill, actions, xml_url):
                 yield event
 
         yield bill
 
     def build_sponsor_name(self, row):
-        first_name = self.get_xpath(row, "firstName")
-        middle_name = self.get_xpath(row, "middleName")
-        last_name = self.get_xpath(row, "lastName")
+        first_name = row.get("firstName")
+        middle_name = row.get("middleName")
+        last_name = row.get("lastName")
         return " ".join(filter(None, [first_name, middle_name, last_name]))
 
     # LOC actions don't make the chamber clear, but you can deduce it from the codes
@@ -313,25 +511,34 @@ class USBillScraper(Scraper):
         return None
 
     def get_xpath(self, xml, xpath):
-        if not xml.findall(xpath, self.ns):
+        el = xml.find(xpath, self.ns)
+        if el is None:
             return
-        return xml.findall(xpath, self.ns)[0].text
+        return el.text
 
-    def scrape_actions(self, bill, xml):
+    def get_rows(self, xml, xpath):
+        """
+        Flatten each element matching xpath into a dict of the text of its
+        descendants, keyed by relative path, so that a row's fields are
+        walked once instead of once per lookup.
+        """
+        return [flatten(row) for row in xml.findall(xpath, self.ns)]
+
+    def scrape_actions(self, bill, rows):
         # TODO: Skip all LOC actions? just some LOC actions?
 
         # list for deduping
         actions = []
-        for row in xml.findall("bill/actions/item"):
-            action_text = self.get_xpath(row, "text")
+        for row in rows:
+            action_text = row.get("text")
             if action_text not in actions:
-                source = self.get_xpath(row, "sourceSystem/name")
+                source = row.get("sourceSystem/name")
 
                 if source is None:
                     self.warning(f"Skipping action with no source: {action_text}")
                     continue
 
-                action_type = self.get_xpath(row, "type")
+                action_type = row.get("type")
                 actor = "lower"
                 if "Senate" in source:
                     actor = "upper"
@@ -343,20 +550,18 @@ class USBillScraper(Scraper):
                     continue
 
                 # house actions give a time, senate just a date
-                if row.findall("actionTime"):
-                    action_date = f"{self.get_xpath(row, 'actionDate')} {self.get_xpath(row, 'actionTime')}"
+                if "actionTime" in row:
+                    action_date = f"{row.get('actionDate')} {row.get('actionTime')}"
                     action_date = datetime.datetime.strptime(
                         action_date, "%Y-%m-%d %H:%M:%S"
                     )
                 else:
                     action_date = datetime.datetime.strptime(
-                        self.get_xpath(row, "actionDate"), "%Y-%m-%d"
+                        row.get("actionDate"), "%Y-%m-%d"
                     )
                 action_date = self._TZ.localize(action_date)
 
-                classification = self.classify_action_by_code(
-                    self.get_xpath(row, "actionCode")
-                )
+                classification = self.classify_action_by_code(row.get("actionCode"))
 
                 # senate actions dont have a code
                 if classification is None:
@@ -365,9 +570,7 @@ class USBillScraper(Scraper):
                 # LOC doesn't make the actor clear, but you can back into it
                 # from the actions
                 if source == "Library of Congress":
-                    possible_actor = self.classify_actor_by_code(
-                        self.get_xpath(row, "actionCode")
-                    )
+                    possible_actor = self.classify_actor_by_code(row.get("actionCode"))
                     if possible_actor is not None:
                         actor = possible_actor
 
@@ -383,27 +586,25 @@ class USBillScraper(Scraper):
                 actions.append(action_text)
 
     # Hearing By
-    def scrape_hearing_by(self, bill, xml, url):
+    def scrape_hearing_by(self, bill, rows, url):
         actions = []
 
-        for row in xml.findall("bill/actions/item"):
-            action_text = (
-                self.get_xpath(row, "text") if self.get_xpath(row, "text") else ""
-            )
+        for row in rows:
+            action_text = row.get("text") or ""
             if "hearings held" not in action_text.lower():
                 continue
-            committee_name = self.get_xpath(row, "committees/item/name")
+            committee_name = row.get("committees/item/name")
             if action_text in actions:
                 continue
             # house actions give a time, senate just a date
-            if row.findall("actionTime"):
-                action_date = f"{self.get_xpath(row, 'actionDate')} {self.get_xpath(row, 'actionTime')}"
+            if "actionTime" in row:
+                action_date = f"{row.get('actionDate')} {row.get('actionTime')}"
                 action_date = datetime.datetime.strptime(
                     action_date, "%Y-%m-%d %H:%M:%S"
                 )
             else:
                 action_date = datetime.datetime.strptime(
-                    self.get_xpath(row, "actionDate"), "%Y-%m-%d"
+                    row.get("actionDate"), "%Y-%m-%d"
                 )
             action_date = self._TZ.localize(action_date)
             location = "Washington, DC 20004"
@@ -425,15 +626,15 @@ class USBillScraper(Scraper):
 
             yield event
 
-    def scrape_amendments(self, bill, xml, session, chamber, bill_id):
+    def scrape_amendments(self, bill, rows, session, chamber, bill_id):
         slugs = {
             "HAMDT": "house-amendment",
             "SAMDT": "senate-amendment",
         }
 
-        for row in xml.findall("bill/amendments/amendment"):
-            session = self.get_xpath(row, "congress")
-            num = self.get_xpath(row, "number")
+        for row in rows:
+            session = row.get("congress")
+            num = row.get("number")
 
             # 201st not 200th. If congress.gov's url scheme survivess 10 years,
             # I apologize, future maintainer.
@@ -441,8 +642,8 @@ class USBillScraper(Scraper):
                 self.warning("Check amendment url ordinals")
 
             bill.add_document_link(
-                note=f"{self.get_xpath(row, 'type')} {num}",
-                url=f"https://www.congress.gov/amendment/{session}th-congress/{slugs[self.get_xpath(row, 'type')]}/{num}",
+                note=f"{row.get('type')} {num}",
+                url=f"https://www.congress.gov/amendment/{session}th-congress/{slugs[row.get('type')]}/{num}",
                 media_type="text/html",
             )
 
@@ -502,17 +703,17 @@ class USBillScraper(Scraper):
 
             bill.add_document_link(note=report, url=url, media_type="application/pdf")
 
-    def scrape_cosponsors(self, bill, xml):
+    def scrape_cosponsors(self, bill, rows):
         all_sponsors = []
-        for row in xml.findall("bill/cosponsors/item"):
-            if not self.get_xpath(row, "sponsorshipWithdrawnDate"):
+        for row in rows:
+            if not row.get("sponsorshipWithdrawnDate"):
                 bill.add_sponsorship(
                     self.build_sponsor_name(row),
                     classification="cosponsor",
                     primary=False,
                     entity_type="person",
                 )
-                all_sponsors.append(self.get_xpath(row, "bioguideId"))
+                all_sponsors.append(row.get("bioguideId"))
         bill.extras["cosponsor_bioguides"] = all_sponsors
 
     def scrape_laws(self, bill, xml):
@@ -544,17 +745,17 @@ class USBillScraper(Scraper):
                 relation_type="companion",
             )
 
-    def scrape_sponsors(self, bill, xml):
+    def scrape_sponsors(self, bill, rows):
         all_sponsors = []
-        for row in xml.findall("bill/sponsors/item"):
-            if not row.findall("sponsorshipWithdrawnDate"):
+        for row in rows:
+            if "sponsorshipWithdrawnDate" not in row:
                 bill.add_sponsorship(
                     self.build_sponsor_name(row),
                     classification="primary",
                     primary=True,
                     entity_type="person",
                 )
-                all_sponsors.append(self.get_xpath(row, "bioguideId"))
+                all_sponsors.append(row.get("bioguideId"))
         bill.extras["sponsor_bioguides"] = all_sponsors
 
     def scrape_subjects(self, bill, xml):
@@ -645,22 +846,14 @@ class USBillScraper(Scraper):
             if (url, chamber) not in vote_urls:
                 vote_urls.append((url, chamber))
 
+        contents = self.roll_calls.fetch_all([url for url, chamber in vote_urls])
+
         for url, chamber in vote_urls:
-            # USA roll call requests sometimes fail for a long time, and the wait on retries
-            # piles up very quickly, causing the whole scrape to be over 24 hours
-            # so, we use requests library directly to avoid long retries cycle
             vote_xml = None
             try:
-                # Nov 2025 update: roll call endpoint seems to deny a lot of cloud traffic
-                # Adding support for proxy for this request specifically
-                if os.environ.get("HTTPS_PROXY_SELECTIVE"):
-                    proxies = {
-                        "https": os.environ.get("HTTPS_PROXY_SELECTIVE"),
-                        "http": os.environ.get("HTTP_PROXY_SELECTIVE"),
-                    }
-                    content = requests.get(url, proxies=proxies, verify=False).content
-                else:
-                    content = requests.get(url).content
+                content = contents[url]
+                if isinstance(content, Exception):
+                    raise content
 
                 if "You don't have permission to access" in content.decode():
                     # sometimes clerk.house.gov serves an error page, but doesn't send a 403 header
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HostRateLimiter:
+    """Space out requests to each host by at least `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RollCallFetcher:
+    """
+    Fetches clerk.house.gov/senate.gov roll call XML for the federal bill
+    scraper.
+
+    Roll calls are fetched concurrently over one keep-alive session, on a
+    pool of threads kept until close(), with requests to each host rate
+    limited. Roll calls are kept for the rest of
+    the run (and in `cache_dir`, if given, across runs) since the same roll
+    call is referenced from several bills and a posted roll call doesn't
+    change; error responses are fetched again when next referenced.
+
+    Like the scraper's original roll call requests, these deliberately don't
+    go through scrapelib: the roll call hosts are often slow or failing for
+    long stretches and its retries pile up into a day-long scrape.
+    """
+
+    def __init__(
+        self, max_workers=4, interval=0.5, cache_dir=None, proxies=None, verify=True
+    ):
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.limiter = HostRateLimiter(interval)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max_workers))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=max_workers))
+        self.session.proxies = proxies or {}
+        self.session.verify = verify
+        self._memory = {}
+        self._pool = None
+        self._lock = threading.Lock()
+        self.hits = self.fetches = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, url):
+        return os.path.join(
+            self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()
+        )
+
+    def _fetch(self, url):
+        """
+        Return the content of url, and whether it's a roll call that can be
+        kept rather than an error to try again next time it's referenced.
+        """
+        if self.cache_dir and os.path.exists(self._cache_path(url)):
+            with open(self._cache_path(url), "rb") as f:
+                return f.read(), True
+
+        self.limiter.wait(urlparse(url).netloc)
+        resp = self.session.get(url, timeout=60)
+        with self._lock:
+            self.fetches += 1
+        content = resp.content
+        # sometimes clerk.house.gov serves an error page, but doesn't send a 403
+        cacheable = resp.ok and b"You don't have permission to access" not in content
+        if self.cache_dir and cacheable:
+            with open(self._cache_path(url) + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(self._cache_path(url) + ".tmp", self._cache_path(url))
+        return content, cacheable
+
+    def fetch_all(self, urls):
+        """
+        Return a dict mapping each url to its content, or to the exception
+        raised while fetching it.
+        """
+        results = {}
+        to_fetch = []
+        for url in urls:
+            if url in self._memory:
+                self.hits += 1
+                results[url] = self._memory[url]
+            elif url not in to_fetch:
+                to_fetch.append(url)
+
+        def fetch(url):
+            try:
+                return (url, *self._fetch(url))
+            except requests.exceptions.RequestException as e:
+                return url, e, False
+
+        if to_fetch:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            for url, content, cacheable in self._pool.map(fetch, to_fetch):
+                results[url] = content
+                if cacheable:
+                    self._memory[url] = content
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
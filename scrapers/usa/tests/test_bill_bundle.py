@@ -0,0 +1,120 @@
+import datetime
+import io
+import unittest
+import zipfile
+from unittest import mock
+
+import requests
+
+from usa.bills import USBillScraper
+
+BILL_URL = "https://www.govinfo.gov/bulkdata/BILLSTATUS/118/hr/BILLSTATUS-118hr{}.xml"
+
+
+def make_bundle(bills, date_time=(2024, 3, 1, 12, 0, 0)):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for n in bills:
+            info = zipfile.ZipInfo("BILLSTATUS-118hr{}.xml".format(n), date_time)
+            zf.writestr(info, "<bill>{}</bill>".format(n))
+    return buf.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, content, headers=None, status_code=200):
+        self.content = content
+        self.headers = headers or {}
+        self.status_code = status_code
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=self)
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+
+class BundleScraper(USBillScraper):
+    """Serves one bundle, and records where each bill was parsed from."""
+
+    def __init__(self, bundle, headers=None):
+        # nothing is saved, so there's no need for a jurisdiction or datadir
+        super().__init__(None, None)
+        self.bundle = bundle
+        self.bundle_headers = headers
+        self.from_bundle = []
+        self.fetched = []
+        self.streamed = []
+
+    def get(self, url, **kwargs):
+        raise AssertionError("bundle requested through scrapelib's cache")
+
+    def download(self, url, **kwargs):
+        self.streamed.append(kwargs["stream"])
+        if self.bundle is None:
+            return FakeResponse(b"", status_code=404)
+        return FakeResponse(self.bundle, self.bundle_headers)
+
+    def parse_bill_xml(self, xml, scrape_hearings=True):
+        self.from_bundle.append(xml.decode())
+        yield from ()
+
+    def parse_bill(self, url, scrape_hearings=True):
+        self.fetched.append(url)
+        yield from ()
+
+    def parse(self, updated):
+        with mock.patch("usa.bills.requests.get", self.download):
+            list(self.parse_bill_bundle("118", "hr", updated))
+        return self.from_bundle, sorted(self.fetched)
+
+
+UPDATED = [
+    (datetime.datetime(2024, 2, 1), BILL_URL.format(1)),
+    # updated since the bundle was built
+    (datetime.datetime(2024, 3, 2), BILL_URL.format(2)),
+    # not in the bundle at all
+    (datetime.datetime(2024, 2, 1), BILL_URL.format(3)),
+]
+
+
+class TestBillBundle(unittest.TestCase):
+    def test_newer_and_missing_bills_are_fetched(self):
+        scraper = BundleScraper(
+            make_bundle([1, 2, 4]),
+            {"Last-Modified": "Fri, 01 Mar 2024 12:00:00 GMT"},
+        )
+        self.assertEqual(
+            scraper.parse(UPDATED),
+            (["<bill>1</bill>"], [BILL_URL.format(2), BILL_URL.format(3)]),
+        )
+        self.assertEqual(scraper.streamed, [True])
+
+    def test_bundle_without_last_modified_is_dated_by_its_files(self):
+        scraper = BundleScraper(make_bundle([1, 2], date_time=(2024, 3, 3, 0, 0, 0)))
+        self.assertEqual(
+            scraper.parse(UPDATED),
+            (["<bill>1</bill>", "<bill>2</bill>"], [BILL_URL.format(3)]),
+        )
+
+    def test_file_times_are_eastern(self):
+        scraper = BundleScraper(None)
+        bundle = make_bundle([1, 2], date_time=(2024, 3, 1, 20, 30, 0))
+        with zipfile.ZipFile(io.BytesIO(bundle)) as zf:
+            self.assertEqual(
+                scraper.bundle_date("", zf, None), datetime.datetime(2024, 3, 2, 1, 30)
+            )
+
+    def test_bills_are_fetched_if_the_bundle_isnt(self):
+        for bundle in (None, b"<html>not a zip</html>"):
+            scraper = BundleScraper(bundle)
+            self.assertEqual(
+                scraper.parse(UPDATED), ([], sorted(url for _, url in UPDATED))
+            )
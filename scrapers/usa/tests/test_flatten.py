@@ -0,0 +1,50 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from usa.bills import USBillScraper, flatten
+
+ACTIONS = """
+<billStatus><bill><actions>
+  <item>
+    <actionDate>2024-03-01</actionDate>
+    <text>Referred to the House Committee on Ways and Means.</text>
+    <type>IntroReferral</type>
+    <sourceSystem><code>2</code><name>House floor actions</name></sourceSystem>
+    <committees>
+      <item><systemCode>hswm00</systemCode><name>Ways and Means</name></item>
+      <item><systemCode>hsbu00</systemCode><name>Budget</name></item>
+    </committees>
+  </item>
+  <item>
+    <actionDate>2024-03-02</actionDate>
+    <text>Introduced in House</text>
+  </item>
+</actions></bill></billStatus>
+"""
+
+PATHS = [
+    "actionDate",
+    "text",
+    "type",
+    "sourceSystem/code",
+    "sourceSystem/name",
+    "committees/item/systemCode",
+    "committees/item/name",
+    "recordedVotes/recordedVote/url",
+]
+
+
+class TestFlatten(unittest.TestCase):
+    def test_rows_match_find(self):
+        root = ET.fromstring(ACTIONS)
+        rows = USBillScraper(None, None).get_rows(root, "bill/actions/item")
+        items = root.findall("bill/actions/item")
+        self.assertEqual(len(rows), 2)
+        for row, item in zip(rows, items):
+            for path in PATHS:
+                el = item.find(path)
+                self.assertEqual(row.get(path), None if el is None else el.text)
+
+    def test_first_repeated_path_wins(self):
+        row = flatten(ET.fromstring(ACTIONS).find("bill/actions/item"))
+        self.assertEqual(row["committees/item/name"], "Ways and Means")
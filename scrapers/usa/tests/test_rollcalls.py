@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+
+from usa.rollcalls import RollCallFetcher
+
+ROLL_CALL = b"<rollcall-vote>...</rollcall-vote>"
+FORBIDDEN = b"<html>You don't have permission to access this resource.</html>"
+
+
+class FakeResponse:
+    def __init__(self, content, ok=True):
+        self.content = content
+        self.ok = ok
+
+
+class FakeSession:
+    """Answers each url with its responses in turn, the last one repeating."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        response = self.responses[url]
+        if len(response) > 1:
+            response = response.pop(0)
+        else:
+            response = response[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class TestRollCallFetcher(unittest.TestCase):
+    def fetcher(self, responses, **kwargs):
+        fetcher = RollCallFetcher(max_workers=2, interval=0, **kwargs)
+        fetcher.session = FakeSession(responses)
+        self.addCleanup(fetcher.close)
+        return fetcher
+
+    def test_roll_calls_are_fetched_once(self):
+        fetcher = self.fetcher({"a": [FakeResponse(ROLL_CALL)]})
+        self.assertEqual(fetcher.fetch_all(["a", "a"]), {"a": ROLL_CALL})
+        self.assertEqual(fetcher.fetch_all(["a"]), {"a": ROLL_CALL})
+        self.assertEqual(fetcher.session.requested, ["a"])
+        self.assertEqual((fetcher.fetches, fetcher.hits), (1, 1))
+
+    def test_errors_are_fetched_again(self):
+        timeout = requests.exceptions.Timeout()
+        fetcher = self.fetcher(
+            {
+                "a": [FakeResponse(b"", ok=False), FakeResponse(ROLL_CALL)],
+                "b": [FakeResponse(FORBIDDEN), FakeResponse(ROLL_CALL)],
+                "c": [timeout, FakeResponse(ROLL_CALL)],
+            }
+        )
+        first = fetcher.fetch_all(["a", "b", "c"])
+        self.assertEqual(first["b"], FORBIDDEN)
+        self.assertIs(first["c"], timeout)
+        self.assertEqual(
+            fetcher.fetch_all(["a", "b", "c"]),
+            {"a": ROLL_CALL, "b": ROLL_CALL, "c": ROLL_CALL},
+        )
+        self.assertEqual(fetcher.hits, 0)
+
+    def test_roll_calls_are_kept_on_disk(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fetcher = self.fetcher(
+                {"a": [FakeResponse(ROLL_CALL)], "b": [FakeResponse(FORBIDDEN)]},
+                cache_dir=cache_dir,
+            )
+            fetcher.fetch_all(["a", "b"])
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            fetcher = self.fetcher({}, cache_dir=cache_dir)
+            self.assertEqual(fetcher.fetch_all(["a"]), {"a": ROLL_CALL})
+            self.assertEqual(fetcher.fetches, 0)
+
+    def test_one_pool_for_the_scrape(self):
+        fetcher = self.fetcher(
+            {"a": [FakeResponse(ROLL_CALL)], "b": [FakeResponse(ROLL_CALL)]}
+        )
+        with mock.patch(
+            "usa.rollcalls.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+        ) as executor:
+            fetcher.fetch_all(["a"])
+            fetcher.fetch_all(["b"])
+        executor.assert_called_once_with(max_workers=2)
+        fetcher.close()
+        self.assertIsNone(fetcher._pool)
+
+    def test_fetches_are_counted_across_threads(self):
+        urls = [str(n) for n in range(200)]
+        fetcher = self.fetcher({url: [FakeResponse(ROLL_CALL)] for url in urls})
+        fetcher.max_workers = 8
+        fetcher.fetch_all(urls)
+        self.assertEqual(fetcher.fetches, len(urls))
@@ -0,0 +1,52 @@
+import datetime
+import unittest
+
+from usa.bills import USBillScraper
+
+SITEMAP_URL = "https://www.govinfo.gov/sitemap/bulkdata/BILLSTATUS/118hr/sitemap.xml"
+BILL_URL = "https://www.govinfo.gov/bulkdata/BILLSTATUS/118/hr/BILLSTATUS-118hr{}.xml"
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{0}</loc><lastmod>2024-02-01T10:00:00.000Z</lastmod></url>
+  <url><loc>{1}</loc><lastmod>2024-03-05T08:30:00.000Z</lastmod></url>
+  <url><loc>{2}</loc><lastmod>2024-03-04T00:00:00.000Z</lastmod></url>
+</urlset>
+""".format(
+    *(BILL_URL.format(n) for n in (1, 2, 3))
+)
+
+
+class FakeResponse:
+    content = SITEMAP.encode("utf-8")
+
+
+class SitemapScraper(USBillScraper):
+    def __init__(self):
+        super().__init__(None, None)
+        self.newest_lastmods = {}
+        self.parsed = []
+
+    def get(self, url, **kwargs):
+        return FakeResponse()
+
+    def parse_bill(self, url, scrape_hearings=True):
+        self.parsed.append(url)
+        yield from ()
+
+
+class TestWatermarks(unittest.TestCase):
+    def test_only_bills_after_the_watermark_are_scraped(self):
+        scraper = SitemapScraper()
+        list(scraper.parse_bill_list(SITEMAP_URL, datetime.datetime(2024, 3, 1)))
+        self.assertEqual(scraper.parsed, [BILL_URL.format(2), BILL_URL.format(3)])
+        self.assertEqual(
+            scraper.newest_lastmods,
+            {SITEMAP_URL: datetime.datetime(2024, 3, 5, 8, 30)},
+        )
+
+    def test_watermark_is_kept_when_nothing_changed(self):
+        scraper = SitemapScraper()
+        list(scraper.parse_bill_list(SITEMAP_URL, datetime.datetime(2024, 3, 5, 8, 30)))
+        self.assertEqual(scraper.parsed, [])
+        self.assertEqual(scraper.newest_lastmods, {})
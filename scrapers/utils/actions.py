@@ -2,6 +2,11 @@ import re
 from collections import namedtuple, defaultdict
 from collections.abc import Iterable
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # python < 3.11
+    import sre_parse
+
 
 class Rule(namedtuple("Rule", "regexes types stop attrs")):
     """If any of ``regexes`` matches the action text, the resulting
@@ -69,19 +74,120 @@ class Rule(namedtuple("Rule", "regexes types stop attrs")):
             return None
 
 
+_REPEATS = tuple(
+    getattr(sre_parse, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_parse, name)
+)
+
+
+def _required_literals(items):
+    """Given a parsed regex (or part of one), return a set of lowercase
+    strings, at least one of which appears in any text the regex matches,
+    or None if there's no such set to be had.
+    """
+    best = None
+
+    def better(a, b):
+        if b is None:
+            return a
+        if a is None:
+            return b
+        # the longer the shortest string, the fewer texts it lets through
+        if min(map(len, b)) > min(map(len, a)):
+            return b
+        return a
+
+    run = []
+    for op, av in list(items) + [(None, None)]:
+        if op == sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            best = better(best, {"".join(run)})
+            run = []
+
+        if op == sre_parse.SUBPATTERN:
+            best = better(best, _required_literals(av[-1]))
+        elif op == sre_parse.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            if all(branches):
+                best = better(best, set().union(*branches))
+        elif op in _REPEATS and av[0] >= 1:
+            best = better(best, _required_literals(av[2]))
+    return best
+
+
+class RulePrefilter(object):
+    """Indexes rules by strings that must appear in any text they match,
+    so that for a given text only the rules that could match it need to
+    have their regexes run.
+
+    Regexes nothing can be worked out for (all optional parts, character
+    classes, etc.) just leave their rules always run.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.always = set()
+        self.by_literal = defaultdict(set)
+
+        for i, rule in enumerate(rules):
+            literals = set()
+            for regex in rule.regexes:
+                found = _required_literals(sre_parse.parse(regex.pattern, regex.flags))
+                if not found:
+                    literals = None
+                    break
+                literals |= found
+            if literals is None:
+                self.always.add(i)
+            else:
+                for literal in literals:
+                    self.by_literal[literal].add(i)
+
+    def candidates(self, text):
+        """Return the rules that could match text, in their original order."""
+        # the strings are ASCII, which lowercasing compares exactly as
+        # re.IGNORECASE would; outside of ASCII it doesn't (e.g. "ſ" and
+        # "s"), so text like that is tested against every rule
+        if not isinstance(text, str) or not text.isascii():
+            return self.rules
+        lowered = text.lower()
+        hits = set(self.always)
+        for literal, indexes in self.by_literal.items():
+            if literal in lowered:
+                hits |= indexes
+        return [self.rules[i] for i in sorted(hits)]
+
+
 class BaseCategorizer(object):
     """A class that exposes a main categorizer function
     and before and after hooks, in case categorization requires specific
     steps that make use of action or category info. The return
     value is a 2-tuple of category types and a dictionary of
     attributes to overwrite on the target action object.
+
+    Unless prefilter is set to False, each text is only tested against
+    the rules a RulePrefilter says could match it, which gives the same
+    result as testing it against all of them.
     """
 
     rules = []
+    prefilter = True
 
     def __init__(self):
         pass
 
+    def candidate_rules(self, text):
+        if not self.prefilter:
+            return self.rules
+        # built on first use, and again if the rules are swapped out
+        index = getattr(self, "_prefilter", None)
+        if index is None or index.rules is not self.rules:
+            index = self._prefilter = RulePrefilter(self.rules)
+        return index.candidates(text)
+
     def categorize(self, text):
         # run pre-categorization hook on text
         text = self.pre_categorize(text)
@@ -89,7 +195,7 @@ class BaseCategorizer(object):
         types = set()
         return_val = defaultdict(set)
 
-        for rule in self.rules:
+        for rule in self.candidate_rules(text):
 
             attrs = rule.match(text)
 
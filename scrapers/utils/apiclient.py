@@ -0,0 +1,210 @@
+"""
+Shared machinery for the JSON API clients (ny, in).
+
+Those APIs page their results, and a scrape makes one detail request for
+every item in a listing, so most of the time is spent waiting on requests
+that don't depend on each other.
+"""
+import datetime
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+# statuses worth trying again: rate limited, or the server is having trouble
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class RetryPolicy:
+    """
+    How many times, and how patiently, to try a request.
+
+    Each attempt gets `timeout` seconds. Between attempts we wait a jittered
+    delay that doubles each time, starting from `backoff` and capped at
+    `max_backoff`, unless the response says how long to wait in a
+    Retry-After header (which is honored up to `max_retry_after`).
+    """
+
+    def __init__(
+        self, attempts=4, timeout=60, backoff=2, max_backoff=60, max_retry_after=300
+    ):
+        self.attempts = max(1, int(attempts))
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    def backoff_delay(self, attempt):
+        """Seconds to wait after failed attempt number `attempt` (from 1)."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def retry_after_delay(self, response):
+        """Seconds the response's Retry-After asks for, or None."""
+        value = response.headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            # or an HTTP date
+            try:
+                when = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=datetime.timezone.utc)
+            seconds = (
+                when - datetime.datetime.now(datetime.timezone.utc)
+            ).total_seconds()
+        return min(max(seconds, 0), self.max_retry_after)
+
+
+class HostBackoff:
+    """
+    Tracks hosts that have asked us to back off (a 429 with Retry-After),
+    so that only requests to that host wait out the pause.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = {}
+
+    def defer(self, host, seconds):
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._until[host] = max(until, self._until.get(host, until))
+
+    def wait(self, host):
+        while True:
+            with self._lock:
+                delay = self._until.get(host, 0) - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+
+class ConcurrentPager:
+    """
+    Runs API requests for a client on a small pool of threads.
+
+    `request` makes a single timed request, honoring any pause a host asked
+    for, and `get` retries one according to a RetryPolicy; `map` runs many
+    of them at once, at most `max_workers` in flight, yielding results in
+    order. Request counts and latencies are kept so a scrape can report
+    them when it's done.
+    """
+
+    def __init__(self, max_workers=4, logger=None, retry=None):
+        self.max_workers = max(1, int(max_workers))
+        self.logger = logger or logging.getLogger(__name__)
+        self.retry = retry or RetryPolicy()
+        self.backoff = HostBackoff()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def request(self, url, func):
+        """Call func() to request url, once the url's host isn't paused."""
+        self.backoff.wait(urlparse(url).netloc)
+        start = time.monotonic()
+        try:
+            return func()
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self.requests += 1
+                self.total_latency += elapsed
+                self.max_latency = max(self.max_latency, elapsed)
+
+    def get(self, session, url, *args, **kwargs):
+        """
+        GET url with a requests session, retrying timeouts, connection
+        errors and RETRY_STATUSES responses as self.retry allows.
+
+        Returns the last response received, whatever its status, or raises
+        the last error if the final attempt didn't get a response at all.
+        """
+        kwargs.setdefault("timeout", self.retry.timeout)
+        for attempt in range(1, self.retry.attempts + 1):
+            final = attempt == self.retry.attempts
+            try:
+                response = self.request(url, lambda: session.get(url, *args, **kwargs))
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if final:
+                    raise
+                delay = self.retry.backoff_delay(attempt)
+                self.logger.warning(f"{e!r} on {url}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if final or response.status_code not in RETRY_STATUSES:
+                return response
+
+            delay = self.retry.retry_after_delay(response)
+            if delay is not None:
+                # requests to the same host, in any thread, wait it out
+                self.retry_after(url, delay, response.status_code)
+            else:
+                delay = self.retry.backoff_delay(attempt)
+                self.logger.warning(
+                    f"Got a {response.status_code} from {url}, "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def retry_after(self, url, seconds, status=429):
+        """Pause requests to url's host for the given number of seconds."""
+        with self._lock:
+            self.throttled += 1
+        self.logger.info(
+            f"Got a {status}: pausing requests to {urlparse(url).netloc} "
+            f"for {seconds:.0f}s"
+        )
+        self.backoff.defer(urlparse(url).netloc, seconds)
+
+    def map(self, func, items):
+        """
+        Like map(func, items), but with up to max_workers calls running at
+        once. items may be a generator; it is consumed only as fast as
+        results are used.
+        """
+        items = iter(items)
+        if self.max_workers == 1:
+            yield from map(func, items)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            try:
+                for item in items:
+                    pending.append(pool.submit(func, item))
+                    # keep a few requests queued behind those in flight
+                    if len(pending) >= self.max_workers * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def log_stats(self):
+        if not self.requests:
+            return
+        self.logger.info(
+            f"{self.requests} API requests, "
+            f"{self.total_latency / self.requests:.2f}s mean latency, "
+            f"{self.max_latency:.2f}s max, "
+            f"{self.throttled} rate limited"
+        )
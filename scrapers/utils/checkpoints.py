@@ -0,0 +1,43 @@
+import datetime
+import json
+import os
+
+from openstates import settings
+
+
+# kept beside the per-jurisdiction output dirs, which are emptied of .json
+# files before every scrape
+def checkpoint_path(name):
+    return os.path.join(settings.SCRAPED_DATA_DIR, f"{name}.json")
+
+
+def load_checkpoints(name):
+    """
+    Return the datetimes saved under name by save_checkpoints, by key,
+    or {} if nothing has been saved yet.
+    """
+    try:
+        with open(checkpoint_path(name)) as f:
+            return {
+                key: datetime.datetime.fromisoformat(value)
+                for key, value in json.load(f).items()
+            }
+    except FileNotFoundError:
+        return {}
+
+
+def save_checkpoints(name, checkpoints):
+    """
+    Save a dict of datetimes under name, replacing what was there in one
+    step so an interrupted save leaves the previous checkpoints intact.
+    """
+    path = checkpoint_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(
+            {key: value.isoformat() for key, value in checkpoints.items()},
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+    os.replace(path + ".tmp", path)
@@ -1,7 +1,95 @@
+import copy
 import requests
 import lxml.html
 import logging
 import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return a requests session shared by everything in the process, so
+    repeated requests to a host reuse its keep-alive connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=20, pool_maxsize=20
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+class DocumentCache(object):
+    """
+    LRU cache of parsed lxml documents, keyed by URL, request headers and
+    cookies (pages that depend on session state aren't mixed up).
+
+    Documents are copied going in and coming out, so callers are free to
+    modify the documents they're given.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._docs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, headers=None, cookies=None):
+        return (
+            url,
+            tuple(sorted((headers or {}).items())),
+            tuple(sorted((cookies or {}).items())),
+        )
+
+    def get(self, key):
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._docs.move_to_end(key)
+        return copy.deepcopy(doc)
+
+    def put(self, key, doc):
+        if self.maxsize <= 0:
+            return
+        doc = copy.deepcopy(doc)
+        with self._lock:
+            self._docs[key] = doc
+            self._docs.move_to_end(key)
+            while len(self._docs) > self.maxsize:
+                self._docs.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+
+    def log_stats(self):
+        if self.hits or self.misses:
+            logger.info(f"lxmlize cache: {self.hits} hits, {self.misses} fetched")
+
+
+# shared by every scraper in a run that opts in with lxmlize_cache, so a page
+# several of them use is only fetched and parsed once; LXMLIZE_CACHE_SIZE=0
+# turns it off
+document_cache = DocumentCache(int(os.getenv("LXMLIZE_CACHE_SIZE", 128)))
+
+
+def log_cache_stats():
+    """Log how document_cache has done, for the end of a scrape using it."""
+    document_cache.log_stats()
 
 
 def url_xpath(url, path, verify=None, user_agent=None):
@@ -10,7 +98,7 @@ def url_xpath(url, path, verify=None, user_agent=None):
     if verify is None:
         verify = os.getenv("VERIFY_CERTS", "True").lower() == "true"
 
-    res = requests.get(url, verify=verify, headers=headers)
+    res = get_session().get(url, verify=verify, headers=headers)
     try:
         doc = lxml.html.fromstring(res.text)
     except Exception:
@@ -26,14 +114,33 @@ def url_xpath(url, path, verify=None, user_agent=None):
 class LXMLMixin(object):
     """Mixin for adding LXML helper functions to Open States code."""
 
-    def lxmlize(self, url, raise_exceptions=False, verify=None, headers=None):
+    # scrapers that request the same unchanging pages over and over can set
+    # this to keep them in document_cache
+    lxmlize_cache = False
+
+    def lxmlize(
+        self, url, raise_exceptions=False, verify=None, headers=None, cache=None
+    ):
         """Parses document into an LXML object and makes links absolute.
 
+        If cache is True (by default, if the scraper sets lxmlize_cache),
+        pages that were fetched successfully are kept in `document_cache`
+        for the rest of the run, so asking for the same URL with the same
+        headers again doesn't fetch it again.
+
         Args:
             url (str): URL of the document to parse.
         Returns:
             Element: Document node representing the page.
         """
+        if cache is None:
+            cache = self.lxmlize_cache
+        key = document_cache.key(url, headers, self.cookies.get_dict())
+        if cache:
+            page = document_cache.get(key)
+            if page is not None:
+                return page
+
         if verify is None:
             verify = os.getenv("VERIFY_CERTS", "True").lower() == "true"
 
@@ -54,6 +161,9 @@ class LXMLMixin(object):
         page = lxml.html.fromstring(response.text)
         page.make_links_absolute(url)
 
+        if cache and response.status_code < 400:
+            document_cache.put(key, page)
+
         return page
 
     def get_node(self, base_node, xpath_query):
@@ -0,0 +1,472 @@
+"""
+PDF text extraction from the bytes of a response.
+
+Text comes from one of two extractors, picked per call (scrapers pass
+their own choice along):
+
+- "pdftotext", the default, as with openstates.utils.convert_pdf, in the
+  two text modes scrapers use (pdftotext's default and -layout). The PDF
+  is piped to it, rather than written to a temporary file.
+- "pymupdf", in process and much faster, but -layout's spacing is only
+  approximated; a scraper switches once its parsing has been checked
+  against sample PDFs (see the states' tests).
+
+PDF_EXTRACTOR, if set, overrides every scraper's choice, for comparing the
+two. PDFTextPool spreads the work for many documents over a pool of
+processes.
+
+PDFTextCache keeps extracted text across runs, since vote and journal PDFs
+don't change once they're posted.
+"""
+import functools
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import fitz
+import requests
+import scrapelib
+from openstates import settings
+from openstates.utils import convert_pdf as pdftotext_convert_pdf
+
+logger = logging.getLogger(__name__)
+
+TEXT_TYPES = {"text": True, "text-nolayout": False}
+
+EXTRACTORS = ("pdftotext", "pymupdf")
+
+# bump when a change here extracts different text from the same PDF, so
+# text cached by the old code isn't used (a new PyMuPDF or poppler is
+# noticed anyway)
+EXTRACTOR_VERSION = 2
+
+
+def get_extractor(extractor=None):
+    """The extractor to use, given the caller's choice (if any)."""
+    extractor = (os.environ.get("PDF_EXTRACTOR") or extractor or "pdftotext").lower()
+    if extractor not in EXTRACTORS:
+        raise ValueError(f"unknown PDF extractor: {extractor}")
+    return extractor
+
+
+@functools.lru_cache(maxsize=None)
+def poppler_version():
+    """The version pdftotext reports, e.g. "22.02.0"."""
+    try:
+        process = subprocess.run(
+            ["pdftotext", "-v"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+    except OSError:
+        return "unknown"
+    match = re.search(rb"version (\S+)", process.stdout)
+    return match.group(1).decode() if match else "unknown"
+
+
+def extraction_mode(layout, extractor=None):
+    """What, besides the PDF itself, decides the text pdf_text returns."""
+    extractor = get_extractor(extractor)
+    if extractor == "pymupdf":
+        extractor += "-" + fitz.VersionBind
+    else:
+        extractor += "-" + poppler_version()
+    return "{}-{}-{}".format(
+        extractor, EXTRACTOR_VERSION, "layout" if layout else "nolayout"
+    )
+
+
+def layout_lines(page):
+    """
+    Lines of a page laid out like `pdftotext -layout`: words sharing a
+    baseline make a line, each placed at the column its distance from the
+    page's leftmost text works out to, so that table columns stay lined up.
+    """
+    words = [w for w in page.get_text("words") if w[4]]
+    if not words:
+        return []
+    char_width = statistics.median((w[2] - w[0]) / len(w[4]) for w in words) or 1
+    # the leftmost text starts a line, rather than the page's margin
+    left = min(w[0] for w in words)
+
+    # group words into rows by vertical midpoint
+    rows = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        middle = (word[1] + word[3]) / 2
+        if rows and abs(middle - rows[-1]["middle"]) <= rows[-1]["height"] / 2:
+            rows[-1]["words"].append(word)
+        else:
+            rows.append(
+                {"middle": middle, "height": word[3] - word[1], "words": [word]}
+            )
+
+    lines = []
+    previous = None
+    for row in rows:
+        if previous is not None and row["height"] > 0:
+            # a blank line for every line's worth of empty space
+            gap = row["middle"] - previous["middle"]
+            lines.extend([""] * max(0, round(gap / row["height"]) - 1))
+        line = ""
+        end = None
+        for x0, _, x1, _, text, *_ in sorted(row["words"], key=lambda w: w[0]):
+            if end is not None and x0 - end < char_width * 1.5:
+                # words a single space apart (say, in a name) stay that way,
+                # however their letters' widths round to columns
+                line += " " + text
+            else:
+                # anything wider is at least two spaces, as it is for
+                # pdftotext, so columns can be told apart
+                column = round((x0 - left) / char_width)
+                line += " " * max(column - len(line), 2 if line else 0) + text
+            end = x1
+        lines.append(line)
+        previous = row
+    return lines
+
+
+def pdf_text(data, layout=True, extractor=None):
+    """
+    Text of a PDF (as bytes), like pdftotext's: the lines of each page,
+    each page ended by a form feed. An unreadable PDF has no text.
+    """
+    if get_extractor(extractor) == "pdftotext":
+        return pdftotext(data, layout)
+
+    try:
+        doc = fitz.open(stream=data, filetype="pdf")
+    except (RuntimeError, ValueError) as e:
+        logger.warning(f"couldn't read PDF: {e}")
+        return ""
+    pages = []
+    with doc:
+        for page in doc:
+            if layout:
+                text = "".join(line + "\n" for line in layout_lines(page))
+            else:
+                text = page.get_text("text", sort=True)
+            pages.append(text + "\f")
+    return "".join(pages)
+
+
+def pdftotext(data, layout=True):
+    """pdf_text with pdftotext, which reads the PDF from stdin."""
+    command = ["pdftotext", "-layout", "-", "-"] if layout else ["pdftotext", "-", "-"]
+    try:
+        process = subprocess.run(command, input=data, stdout=subprocess.PIPE)
+    except OSError as e:
+        raise EnvironmentError(
+            "error running %s, missing executable? [%s]" % (" ".join(command), e)
+        )
+    # like convert_pdf, whatever it managed to extract (nothing, for an
+    # unreadable PDF) regardless of its exit status
+    return process.stdout.decode("utf-8", "replace")
+
+
+def pdf_lines(data, layout=True, extractor=None):
+    """The lines of pdf_text(data), without the page breaks."""
+    return [
+        line
+        for page in pdf_text(data, layout, extractor).split("\f")
+        for line in page.splitlines()
+    ]
+
+
+def convert_pdf(filename, type="xml", extractor=None):
+    """
+    Drop-in for openstates.utils.convert_pdf: text comes from pdf_text,
+    while pdftohtml's xml and html still come from pdftohtml.
+    """
+    if type not in TEXT_TYPES:
+        return pdftotext_convert_pdf(filename, type)
+    with open(filename, "rb") as f:
+        return pdf_text(f.read(), TEXT_TYPES[type], extractor).encode("utf-8")
+
+
+class PDFTextPool:
+    """
+    Extracts text from many PDFs at once on a pool of processes (PyMuPDF
+    holds the GIL, so threads wouldn't help it). The pool is started the first
+    time it's needed; with one worker, text is extracted in process.
+    """
+
+    def __init__(self, workers=None, extractor=None):
+        if workers is None:
+            workers = os.environ.get("PDF_WORKERS", min(4, os.cpu_count() or 1))
+        self.workers = max(1, int(workers))
+        self.extractor = extractor
+        self._pool = None
+
+    def submit(self, data, layout=True, extractor=None):
+        """Return a Future for pdf_text(data, layout, extractor)."""
+        extractor = get_extractor(extractor or self.extractor)
+        if self.workers == 1:
+            future = Future()
+            future.set_result(pdf_text(data, layout, extractor))
+            return future
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(pdf_text, data, layout, extractor)
+
+    def map(self, datas, layout=True, extractor=None):
+        """
+        Like map(pdf_text, datas), yielding results in order. datas may be a
+        generator (say, one downloading the PDFs), which is consumed while
+        earlier documents are extracted; a None in it gives a None.
+        """
+        pending = deque()
+        for data in datas:
+            pending.append(
+                None if data is None else self.submit(data, layout, extractor)
+            )
+            # keep a few documents queued behind those being extracted
+            if len(pending) >= self.workers * 2:
+                future = pending.popleft()
+                yield None if future is None else future.result()
+        while pending:
+            future = pending.popleft()
+            yield None if future is None else future.result()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class PDFTextCache:
+    """
+    Text extracted from PDFs, kept on disk across runs.
+
+    Text is stored under the SHA-256 of the PDF it came from (and how it
+    was extracted), so the same document at two URLs is extracted once.
+    Each URL remembers the ETag/Last-Modified and hash of its last
+    response: requests for it are conditional, and a 304 (or the same
+    bytes again) gets the stored text without extracting anything.
+
+    Once the stored text passes `max_bytes`, the least recently used is
+    dropped.
+    """
+
+    def __init__(self, path, max_bytes=256 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # shared by scrapers running at the same time
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS texts (sha256 TEXT, mode TEXT, "
+            "text TEXT, size INTEGER, last_used REAL, PRIMARY KEY (sha256, mode));"
+            "CREATE INDEX IF NOT EXISTS texts_last_used ON texts (last_used);"
+            "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, etag TEXT, "
+            "last_modified TEXT, sha256 TEXT);"
+        )
+
+    def _cached(self, url, mode):
+        return self.db.execute(
+            "SELECT urls.etag, urls.last_modified, texts.sha256, texts.text "
+            "FROM urls JOIN texts ON texts.sha256 = urls.sha256 "
+            "WHERE urls.url = ? AND texts.mode = ?",
+            (url, mode),
+        ).fetchone()
+
+    def _hit(self, url, response, sha256, mode, text):
+        with self._lock:
+            self.hits += 1
+            self.db.execute(
+                "UPDATE texts SET last_used = ? WHERE sha256 = ? AND mode = ?",
+                (time.time(), sha256, mode),
+            )
+            self._remember_url(url, response, sha256)
+            self.db.commit()
+        return text
+
+    def _remember_url(self, url, response, sha256):
+        if response.status_code == 304:
+            # keeps the validators it was requested with
+            return
+        self.db.execute(
+            "REPLACE INTO urls (url, etag, last_modified, sha256) VALUES (?, ?, ?, ?)",
+            (
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                sha256,
+            ),
+        )
+
+    def revalidate(self, scraper, url, layout=True, extractor=None, **kwargs):
+        """
+        GET url with the scraper's headers, conditionally if we have its
+        text. The request skips scrapelib's cache, which would answer it from
+        disk without asking the server whether the PDF has changed.
+
+        Returns (text, response): the text if it's cached for the PDF the
+        response says is current, and otherwise None, along with the
+        response to extract text from and store().
+        """
+        mode = extraction_mode(layout, extractor)
+        with self._lock:
+            cached = self._cached(url, mode)
+
+        headers = dict(scraper.headers)
+        headers.update(kwargs.pop("headers", None) or {})
+        if cached and cached[0]:
+            headers["If-None-Match"] = cached[0]
+        if cached and cached[1]:
+            headers["If-Modified-Since"] = cached[1]
+        kwargs.setdefault("verify", scraper.verify)
+        kwargs.setdefault("timeout", scraper.timeout)
+        response = requests.get(url, headers=headers, **kwargs)
+        if not scraper.accept_response(response):
+            raise scrapelib.HTTPError(response)
+
+        if cached and response.status_code == 304:
+            return self._hit(url, response, cached[2], mode, cached[3]), response
+
+        sha256 = hashlib.sha256(response.content).hexdigest()
+        with self._lock:
+            row = self.db.execute(
+                "SELECT text FROM texts WHERE sha256 = ? AND mode = ?",
+                (sha256, mode),
+            ).fetchone()
+        if row:
+            return self._hit(url, response, sha256, mode, row[0]), response
+        with self._lock:
+            self.misses += 1
+        return None, response
+
+    def store(self, url, response, text, layout=True, extractor=None):
+        """Keep text extracted from response, the PDF at url."""
+        sha256 = hashlib.sha256(response.content).hexdigest()
+        with self._lock:
+            self.db.execute(
+                "REPLACE INTO texts (sha256, mode, text, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    sha256,
+                    extraction_mode(layout, extractor),
+                    text,
+                    len(text.encode("utf-8")),
+                    time.time(),
+                ),
+            )
+            self._remember_url(url, response, sha256)
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[
+            0
+        ]
+        if total <= self.max_bytes:
+            return
+        for sha256, mode, size in self.db.execute(
+            "SELECT sha256, mode, size FROM texts ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute(
+                "DELETE FROM texts WHERE sha256 = ? AND mode = ?", (sha256, mode)
+            )
+            total -= size
+        self.db.execute(
+            "DELETE FROM urls WHERE sha256 NOT IN (SELECT sha256 FROM texts)"
+        )
+
+    def text(self, scraper, url, layout=True, extractor=None, **kwargs):
+        """pdf_text for the PDF at url, from the cache if it hasn't changed."""
+        text, response = self.revalidate(scraper, url, layout, extractor, **kwargs)
+        if text is None:
+            text = pdf_text(response.content, layout, extractor)
+            self.store(url, response, text, layout, extractor)
+        return text
+
+    def fetch_all(
+        self, scraper, urls, pool=None, layout=True, extractor=None, **kwargs
+    ):
+        """
+        Yield (url, text) for each of urls in order, with the text from the
+        cache if the PDF hasn't changed, and otherwise extracted on pool
+        while later PDFs download. If a download fails, its scrapelib
+        HTTPError is yielded in place of the text. The extractor defaults to
+        the pool's.
+        """
+        window = pool.workers * 2 if pool else 1
+        if extractor is None and pool:
+            extractor = pool.extractor
+        pending = deque()
+        for url in urls:
+            try:
+                text, response = self.revalidate(
+                    scraper, url, layout, extractor, **kwargs
+                )
+            except scrapelib.HTTPError as e:
+                pending.append((url, e, None, None))
+            else:
+                future = None
+                if text is None:
+                    if pool:
+                        future = pool.submit(response.content, layout, extractor)
+                    else:
+                        text = pdf_text(response.content, layout, extractor)
+                        self.store(url, response, text, layout, extractor)
+                pending.append((url, text, response, future))
+            while len(pending) >= window:
+                yield self._finish(*pending.popleft(), layout, extractor)
+        while pending:
+            yield self._finish(*pending.popleft(), layout, extractor)
+
+    def _finish(self, url, text, response, future, layout, extractor):
+        if future is not None:
+            text = future.result()
+            self.store(url, response, text, layout, extractor)
+        return url, text
+
+    def log_stats(self):
+        if self.hits or self.misses:
+            logger.info(f"PDF text cache: {self.hits} hits, {self.misses} extracted")
+
+    def close(self):
+        self.db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Return the PDFTextCache shared by everything in the process, in the
+    scrape cache directory. PDF_TEXT_CACHE_MB sets how big it may get.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PDFTextCache(
+                os.path.join(settings.CACHE_DIR, "pdf_text.sqlite3"),
+                max_bytes=int(os.getenv("PDF_TEXT_CACHE_MB", 256)) * 2**20,
+            )
+        return _cache
+
+
+def close_cache():
+    """
+    Log how the shared PDFTextCache did and close it, for the end of a
+    scrape; get_cache() opens it again if it's needed after.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.log_stats()
+            _cache.close()
+            _cache = None
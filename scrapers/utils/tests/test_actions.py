@@ -0,0 +1,105 @@
+import unittest
+
+from tx.actions import Categorizer as TXCategorizer
+from utils.actions import BaseCategorizer, Rule, RulePrefilter
+
+ACTIONS = [
+    "Read first time",
+    "Referred to Committee on Judiciary",
+    "REFERRED TO Ways & Means",
+    "Reported favorably w/o amendment(s)",
+    "Reported favorably as substituted",
+    "Passed as amended",
+    "Senate passage as amended reported",
+    "Amendment No. 1 adopted",
+    "Amendment fails of adoption",
+    "Signed by the Governor",
+    "Filed without the Governor's signature",
+    "Laid on the table subject to call",
+    "Withdrawn from schedule",
+    "Effective on 9/1/25",
+    "Received from the House",
+    "Sent to the Governor",
+    "Committee action pending",
+    "",
+]
+
+
+class Categorizer(BaseCategorizer):
+    rules = [
+        Rule(r"(Signed|Approved) by (the )?Governor", "executive-signature", stop=True),
+        Rule(r"Referred to (the )?(?P<committees>.+)", "referral-committee"),
+        Rule(r"third reading|read 3rd time", "reading-3"),
+        # nothing is required, so this rule always runs
+        Rule(r"^\w*$", "filing"),
+        Rule(r"passed", "passage", actor="legislature"),
+        Rule(r"Governor", "executive-receipt"),
+    ]
+
+
+class TestRulePrefilter(unittest.TestCase):
+    def test_required_strings(self):
+        prefilter = RulePrefilter(Categorizer.rules)
+        self.assertEqual(prefilter.always, {3})
+        self.assertEqual(
+            {literal: sorted(rules) for literal, rules in prefilter.by_literal.items()},
+            # spaces can stretch, so words are required rather than phrases
+            {
+                "governor": [0, 5],
+                "referred": [1],
+                "reading": [2],
+                "read": [2],
+                "passed": [4],
+            },
+        )
+
+    def test_candidates_keep_their_order(self):
+        prefilter = RulePrefilter(Categorizer.rules)
+        rules = Categorizer.rules
+        self.assertEqual(
+            prefilter.candidates("Signed by the Governor"),
+            [rules[0], rules[3], rules[5]],
+        )
+        self.assertEqual(prefilter.candidates("READ 3RD TIME"), [rules[2], rules[3]])
+
+    def test_non_ascii_text_gets_every_rule(self):
+        prefilter = RulePrefilter(Categorizer.rules)
+        self.assertEqual(prefilter.candidates("Paſſed"), Categorizer.rules)
+
+
+class TestPrefilteredCategorizer(unittest.TestCase):
+    def assertSameResults(self, categorizer, actions):
+        unfiltered = type(categorizer)()
+        unfiltered.prefilter = False
+        for action in actions:
+            with self.subTest(action=action):
+                self.assertEqual(
+                    sort_values(categorizer.categorize(action)),
+                    sort_values(unfiltered.categorize(action)),
+                )
+
+    def test_same_results_as_every_rule(self):
+        self.assertSameResults(
+            Categorizer(),
+            ACTIONS
+            + [
+                "Approved by Governor; passed",
+                "Referred to the Committee on Rules",
+                "Passed third reading",
+                "Prefiled",
+            ],
+        )
+
+    def test_stop_and_attrs(self):
+        attrs = Categorizer().categorize("Signed by the Governor; passed")
+        self.assertEqual(attrs["classification"], ["executive-signature"])
+        attrs = Categorizer().categorize("Referred to Rules; passed")
+        self.assertEqual(attrs["committees"], ["Rules; passed"])
+        self.assertEqual(attrs["actor"], "legislature")
+
+    def test_state_categorizer(self):
+        self.assertSameResults(TXCategorizer(), ACTIONS)
+
+
+def sort_values(attrs):
+    return {k: sorted(v) if isinstance(v, list) else v for k, v in attrs.items()}
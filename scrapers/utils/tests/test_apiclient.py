@@ -0,0 +1,140 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from utils.apiclient import ConcurrentPager, RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Returns (or raises) the given outcomes in order."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+URL = "https://api.example.com/bills"
+
+
+@mock.patch("utils.apiclient.time.sleep")
+class TestRetries(unittest.TestCase):
+    def pager(self, **kwargs):
+        return ConcurrentPager(1, retry=RetryPolicy(**kwargs))
+
+    def test_success_is_not_retried(self, sleep):
+        session = FakeSession(FakeResponse(200))
+        self.assertEqual(self.pager().get(session, URL).status_code, 200)
+        self.assertEqual(len(session.calls), 1)
+        sleep.assert_not_called()
+
+    def test_each_attempt_gets_the_timeout(self, sleep):
+        session = FakeSession(FakeResponse(200))
+        self.pager(timeout=7).get(session, URL)
+        self.assertEqual(session.calls[0][1]["timeout"], 7)
+
+    def test_server_errors_are_retried(self, sleep):
+        session = FakeSession(FakeResponse(503), FakeResponse(500), FakeResponse(200))
+        self.assertEqual(self.pager().get(session, URL).status_code, 200)
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_client_errors_are_not_retried(self, sleep):
+        session = FakeSession(FakeResponse(404), FakeResponse(200))
+        self.assertEqual(self.pager().get(session, URL).status_code, 404)
+        self.assertEqual(len(session.calls), 1)
+
+    def test_attempts_are_bounded(self, sleep):
+        session = FakeSession(*[FakeResponse(503)] * 5)
+        self.assertEqual(self.pager(attempts=3).get(session, URL).status_code, 503)
+        self.assertEqual(len(session.calls), 3)
+
+    def test_final_connection_error_is_raised(self, sleep):
+        session = FakeSession(
+            requests.exceptions.ConnectionError(), requests.exceptions.Timeout()
+        )
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.pager(attempts=2).get(session, URL)
+        self.assertEqual(len(session.calls), 2)
+
+    def test_retry_after_pauses_the_host(self, sleep):
+        session = FakeSession(
+            FakeResponse(429, {"retry-after": "30"}), FakeResponse(200)
+        )
+        pager = self.pager()
+        with mock.patch.object(pager.backoff, "defer") as defer:
+            self.assertEqual(pager.get(session, URL).status_code, 200)
+        defer.assert_called_once_with("api.example.com", 30)
+        self.assertEqual(pager.throttled, 1)
+        self.assertEqual(pager.requests, 2)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_doubles_with_jitter(self):
+        policy = RetryPolicy(backoff=2, max_backoff=10)
+        for attempt, ceiling in [(1, 2), (2, 4), (3, 8), (4, 10), (5, 10)]:
+            delay = policy.backoff_delay(attempt)
+            self.assertTrue(ceiling / 2 <= delay <= ceiling)
+
+    def test_retry_after(self):
+        policy = RetryPolicy(max_retry_after=60)
+        delay = policy.retry_after_delay
+        self.assertIsNone(delay(FakeResponse(429)))
+        self.assertEqual(delay(FakeResponse(429, {"retry-after": "5"})), 5)
+        self.assertEqual(delay(FakeResponse(429, {"retry-after": "3600"})), 60)
+        self.assertIsNone(delay(FakeResponse(429, {"retry-after": "soon"})))
+        past = "Wed, 21 Oct 2015 07:28:00 GMT"
+        self.assertEqual(delay(FakeResponse(429, {"retry-after": past})), 0)
+
+
+class TestMap(unittest.TestCase):
+    def test_results_in_order_with_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = []
+        most = [0]
+
+        def work(n):
+            with lock:
+                running.append(n)
+                most[0] = max(most[0], len(running))
+            # later items finish first
+            time.sleep(0.01 * (5 - n % 5))
+            with lock:
+                running.remove(n)
+            return n * 10
+
+        pager = ConcurrentPager(3)
+        self.assertEqual(list(pager.map(work, range(12))), list(range(0, 120, 10)))
+        self.assertEqual(most[0], 3)
+
+    def test_items_are_consumed_as_results_are_used(self):
+        consumed = []
+
+        def items():
+            for n in range(100):
+                consumed.append(n)
+                yield n
+
+        results = ConcurrentPager(2).map(lambda n: n, items())
+        self.assertEqual(next(results), 0)
+        self.assertLess(len(consumed), 10)
+        results.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from openstates import settings
+
+from utils.checkpoints import load_checkpoints, save_checkpoints
+
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        dir = tempfile.TemporaryDirectory()
+        self.addCleanup(dir.cleanup)
+        self.dir = os.path.join(dir.name, "_data")
+        patcher = mock.patch.object(settings, "SCRAPED_DATA_DIR", self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_nothing_saved(self):
+        self.assertEqual(load_checkpoints("usa_bill_watermarks"), {})
+
+    def test_round_trip(self):
+        checkpoints = {
+            "a": datetime.datetime(2024, 3, 1, 12, 30, 15),
+            "b": datetime.datetime(2024, 3, 2),
+        }
+        save_checkpoints("usa_bill_watermarks", checkpoints)
+        self.assertEqual(load_checkpoints("usa_bill_watermarks"), checkpoints)
+        self.assertEqual(load_checkpoints("ny_bill_updates"), {})
+        self.assertEqual(os.listdir(self.dir), ["usa_bill_watermarks.json"])
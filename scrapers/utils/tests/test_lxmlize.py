@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+import scrapelib
+
+from utils import lxmlize
+from utils.lxmlize import DocumentCache, LXMLMixin
+
+PAGE = "<html><body><a href='/bills/1'>HB 1</a></body></html>"
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class PageScraper(LXMLMixin, scrapelib.Scraper):
+    """Counts requests instead of making them."""
+
+    def __init__(self, status_code=200):
+        super().__init__()
+        self.status_code = status_code
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(url)
+        return FakeResponse(PAGE, self.status_code)
+
+
+class CachedPageScraper(PageScraper):
+    lxmlize_cache = True
+
+
+class TestLxmlizeCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(lxmlize, "document_cache", DocumentCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_off_by_default(self):
+        scraper = PageScraper()
+        scraper.lxmlize("https://example.com/")
+        scraper.lxmlize("https://example.com/")
+        self.assertEqual(len(scraper.requests), 2)
+
+    def test_cached_page_is_fetched_once(self):
+        scraper = CachedPageScraper()
+        page = scraper.lxmlize("https://example.com/")
+        self.assertEqual(page.xpath("//a/@href"), ["https://example.com/bills/1"])
+
+        # other scrapers in the run share the cache
+        other = PageScraper()
+        page = other.lxmlize("https://example.com/", cache=True)
+        self.assertEqual(page.xpath("//a/@href"), ["https://example.com/bills/1"])
+        self.assertEqual((len(scraper.requests), len(other.requests)), (1, 0))
+
+    def test_changes_to_a_page_are_not_cached(self):
+        scraper = CachedPageScraper()
+        page = scraper.lxmlize("https://example.com/")
+        page.xpath("//a")[0].drop_tree()
+        page = scraper.lxmlize("https://example.com/")
+        page.xpath("//a")[0].text = "SB 1"
+        page = scraper.lxmlize("https://example.com/")
+        self.assertEqual([a.text for a in page.xpath("//a")], ["HB 1"])
+
+    def test_headers_are_part_of_the_key(self):
+        scraper = CachedPageScraper()
+        scraper.lxmlize("https://example.com/")
+        scraper.lxmlize("https://example.com/", headers={"Accept": "text/html"})
+        scraper.lxmlize("https://example.com/", headers={"Accept": "text/html"})
+        self.assertEqual(len(scraper.requests), 2)
+
+    def test_errors_are_not_cached(self):
+        scraper = CachedPageScraper(status_code=500)
+        scraper.lxmlize("https://example.com/")
+        scraper.lxmlize("https://example.com/")
+        self.assertEqual(len(scraper.requests), 2)
+
+    def test_hits_and_misses_are_counted(self):
+        scraper = CachedPageScraper()
+        scraper.lxmlize("https://example.com/")
+        scraper.lxmlize("https://example.com/")
+        scraper.lxmlize("https://example.com/")
+        scraper.lxmlize("https://example.com/other")
+        self.assertEqual(
+            (lxmlize.document_cache.hits, lxmlize.document_cache.misses), (2, 2)
+        )
+
+        with self.assertLogs("utils.lxmlize", "INFO") as logs:
+            lxmlize.log_cache_stats()
+        self.assertEqual(
+            logs.output, ["INFO:utils.lxmlize:lxmlize cache: 2 hits, 2 fetched"]
+        )
+
+    def test_unused_cache_logs_nothing(self):
+        PageScraper().lxmlize("https://example.com/")
+        with mock.patch.object(lxmlize.logger, "info") as info:
+            lxmlize.log_cache_stats()
+        info.assert_not_called()
@@ -0,0 +1,251 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+import fitz
+import scrapelib
+
+from utils.pdf import (
+    EXTRACTOR_VERSION,
+    PDFTextCache,
+    PDFTextPool,
+    extraction_mode,
+    get_extractor,
+    pdf_lines,
+    pdf_text,
+    poppler_version,
+)
+
+
+def make_pdf(pages):
+    """A PDF with a page for each list of (x, y, text)."""
+    doc = fitz.open()
+    for words in pages:
+        page = doc.new_page()
+        for x, y, text in words:
+            page.insert_text((x, y), text, fontsize=10, fontname="cour")
+    return doc.tobytes()
+
+
+ROLL_CALL = [
+    (72, 72, "SENATE ROLL CALL"),
+    (72, 100, "Y Anderson"),
+    (300, 100, "N Bennett"),
+    (72, 114, "Y Castro"),
+    (300, 114, "E Dawson"),
+]
+
+
+class TestPDFText(unittest.TestCase):
+    def test_layout_keeps_columns(self):
+        lines = pdf_lines(make_pdf([ROLL_CALL]), extractor="pymupdf")
+        self.assertEqual(lines[0].strip(), "SENATE ROLL CALL")
+        rows = [line for line in lines if "Y " in line]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0].index("N Bennett"), rows[1].index("E Dawson"))
+        self.assertRegex(rows[0], r"Y Anderson\s{2,}N Bennett")
+
+    def test_no_layout(self):
+        text = pdf_text(make_pdf([ROLL_CALL]), layout=False, extractor="pymupdf")
+        for word in ("Anderson", "Bennett", "Castro", "Dawson"):
+            self.assertIn(word, text)
+
+    def test_pages_end_with_form_feeds(self):
+        data = make_pdf([[(72, 72, "one")], [(72, 72, "two")]])
+        self.assertEqual(pdf_text(data, extractor="pymupdf").count("\f"), 2)
+        self.assertEqual(
+            [line.strip() for line in pdf_lines(data, extractor="pymupdf")],
+            ["one", "two"],
+        )
+
+    def test_unreadable_pdf_has_no_text(self):
+        self.assertEqual(pdf_text(b"not a pdf", extractor="pymupdf"), "")
+
+
+class TestExtractor(unittest.TestCase):
+    def test_pdftotext_by_default(self):
+        with mock.patch.dict(os.environ, {"PDF_EXTRACTOR": ""}):
+            self.assertEqual(get_extractor(), "pdftotext")
+            self.assertEqual(get_extractor("pymupdf"), "pymupdf")
+            self.assertRaises(ValueError, get_extractor, "pdfminer")
+
+    def test_environment_overrides_scrapers(self):
+        with mock.patch.dict(os.environ, {"PDF_EXTRACTOR": "pdftotext"}):
+            self.assertEqual(get_extractor("pymupdf"), "pdftotext")
+
+    def test_modes_differ_by_extractor(self):
+        with mock.patch.dict(os.environ, {"PDF_EXTRACTOR": ""}):
+            self.assertNotEqual(
+                extraction_mode(True, "pdftotext"), extraction_mode(True, "pymupdf")
+            )
+            self.assertIn(fitz.VersionBind, extraction_mode(True, "pymupdf"))
+
+    def test_poppler_version_is_part_of_the_mode(self):
+        poppler_version.cache_clear()
+        self.addCleanup(poppler_version.cache_clear)
+        done = subprocess.CompletedProcess(
+            [], 0, stdout=b"pdftotext version 22.02.0\nCopyright 2005-2022 ...\n"
+        )
+        with mock.patch.dict(os.environ, {"PDF_EXTRACTOR": ""}), mock.patch(
+            "subprocess.run", return_value=done
+        ):
+            self.assertEqual(
+                extraction_mode(True, "pdftotext"),
+                "pdftotext-22.02.0-{}-layout".format(EXTRACTOR_VERSION),
+            )
+
+
+class TestPdftotext(unittest.TestCase):
+    def test_pdf_is_piped(self):
+        data = make_pdf([ROLL_CALL])
+        done = subprocess.CompletedProcess([], 0, stdout="SENATE ROLL CALL\f".encode())
+        with mock.patch.dict(os.environ, {"PDF_EXTRACTOR": ""}), mock.patch(
+            "subprocess.run", return_value=done
+        ) as run:
+            self.assertEqual(pdf_text(data), "SENATE ROLL CALL\f")
+            pdf_text(data, layout=False)
+        self.assertEqual(
+            [call.args[0] for call in run.call_args_list],
+            [["pdftotext", "-layout", "-", "-"], ["pdftotext", "-", "-"]],
+        )
+        self.assertEqual(run.call_args.kwargs["input"], data)
+
+    @unittest.skipUnless(shutil.which("pdftotext"), "pdftotext isn't installed")
+    def test_same_words_as_pymupdf(self):
+        data = make_pdf([ROLL_CALL, [(72, 72, "page two")]])
+        self.assertEqual(
+            [line.split() for line in pdf_lines(data, extractor="pdftotext") if line],
+            [line.split() for line in pdf_lines(data, extractor="pymupdf") if line],
+        )
+
+
+class TestPDFTextPool(unittest.TestCase):
+    def test_map_keeps_order(self):
+        docs = [make_pdf([[(72, 72, "doc {}".format(i))]]) for i in range(5)]
+        docs.insert(2, None)
+        for workers in (1, 2):
+            pool = PDFTextPool(workers, extractor="pymupdf")
+            try:
+                texts = list(pool.map(docs))
+            finally:
+                pool.close()
+            self.assertIsNone(texts[2])
+            self.assertEqual(
+                [t.strip() for t in texts if t is not None],
+                ["doc {}".format(i) for i in range(5)],
+            )
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = ""
+        self.text = ""
+
+
+class FakeScraper(scrapelib.Scraper):
+    """
+    Serves PDFs by URL, honoring If-None-Match, to requests.get: the cache
+    mustn't go through scrapelib, whose own cache would answer from disk.
+    """
+
+    def __init__(self, pdfs):
+        super().__init__()
+        self.pdfs = pdfs
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        raise AssertionError("went through scrapelib")
+
+    def serve(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        if url not in self.pdfs:
+            return FakeResponse(404)
+        etag, content = self.pdfs[url]
+        if etag and headers.get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, content, {"ETag": etag} if etag else {})
+
+
+class TestPDFTextCache(unittest.TestCase):
+    def setUp(self):
+        # pdftotext isn't needed to test the cache
+        patcher = mock.patch.dict(os.environ, {"PDF_EXTRACTOR": "pymupdf"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "pdf_text.sqlite3")
+        self.one = make_pdf([[(72, 72, "one")]])
+        self.two = make_pdf([[(72, 72, "two")]])
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def cache(self, **kwargs):
+        cache = PDFTextCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def scraper(self, pdfs):
+        scraper = FakeScraper(pdfs)
+        patcher = mock.patch("utils.pdf.requests.get", scraper.serve)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return scraper
+
+    def test_unchanged_pdf_is_revalidated(self):
+        scraper = self.scraper({"a.pdf": ('"v1"', self.one)})
+        self.assertEqual(self.cache().text(scraper, "a.pdf").strip(), "one")
+        self.assertNotIn("If-None-Match", scraper.requests[-1][1])
+
+        cache = self.cache()
+        self.assertEqual(cache.text(scraper, "a.pdf").strip(), "one")
+        headers = scraper.requests[-1][1]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["User-Agent"], scraper.user_agent)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_same_bytes_at_another_url_are_not_extracted_again(self):
+        scraper = self.scraper({"a.pdf": (None, self.one), "b.pdf": (None, self.one)})
+        cache = self.cache()
+        cache.text(scraper, "a.pdf")
+        self.assertEqual(cache.text(scraper, "b.pdf").strip(), "one")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_changed_pdf_is_extracted(self):
+        scraper = self.scraper({"a.pdf": ('"v1"', self.one)})
+        cache = self.cache()
+        cache.text(scraper, "a.pdf")
+        scraper.pdfs["a.pdf"] = ('"v2"', self.two)
+        self.assertEqual(cache.text(scraper, "a.pdf").strip(), "two")
+        self.assertEqual(cache.misses, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        size = len(pdf_text(self.one, extractor="pymupdf").encode("utf-8"))
+        scraper = self.scraper({"a.pdf": (None, self.one), "b.pdf": (None, self.two)})
+        cache = self.cache(max_bytes=size)
+        cache.text(scraper, "a.pdf")
+        cache.text(scraper, "b.pdf")
+        cache.text(scraper, "a.pdf")
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+    def test_fetch_all(self):
+        scraper = self.scraper({"a.pdf": (None, self.one), "b.pdf": (None, self.two)})
+        pool = PDFTextPool(2, extractor="pymupdf")
+        self.addCleanup(pool.close)
+        results = list(
+            self.cache().fetch_all(scraper, ["a.pdf", "missing.pdf", "b.pdf"], pool)
+        )
+        self.assertEqual([url for url, _ in results], ["a.pdf", "missing.pdf", "b.pdf"])
+        self.assertEqual(results[0][1].strip(), "one")
+        self.assertIsInstance(results[1][1], scrapelib.HTTPError)
+        self.assertEqual(results[2][1].strip(), "two")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Time every state's action Categorizer with and without its rule
+prefilter, and check both give the same result for every action.
+
+Actions are read from scraped bills, if a scrape output directory is
+given (e.g. _data, holding <state>/bill_*.json), and otherwise made up
+from common action wording.
+
+    PYTHONPATH=scrapers python scripts/benchmarks/categorizers.py [--data-dir _data]
+"""
+import argparse
+import glob
+import importlib
+import json
+import os
+import random
+import sys
+import time
+
+from utils.actions import BaseCategorizer, RulePrefilter
+
+SCRAPERS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "scrapers")
+
+COMMON_ACTIONS = [
+    "Introduced and read first time",
+    "Read first time",
+    "Read second time",
+    "Read third time and passed",
+    "Referred to Committee on Judiciary",
+    "Referred to the Committee on Ways and Means",
+    "Reported favorably",
+    "Reported favorably with amendment",
+    "Do pass as amended",
+    "Committee report: do pass",
+    "Hearing scheduled",
+    "Public hearing held",
+    "Passed House",
+    "Passed Senate",
+    "Failed to pass",
+    "Amendment adopted",
+    "Amendment failed",
+    "Signed by Governor",
+    "Vetoed by Governor",
+    "Approved by the Governor",
+    "Chaptered by Secretary of State",
+    "Became law without signature",
+    "Sent to the Governor",
+    "Enrolled",
+    "Withdrawn by author",
+    "Laid on the table",
+    "Placed on calendar",
+    "Returned to committee",
+    "Concurred in House amendments",
+    "Conference committee appointed",
+    "Filed",
+    "Prefiled",
+]
+
+
+def categorizers():
+    """Yield (state, Categorizer instance) for every state that has one."""
+    for path in sorted(glob.glob(os.path.join(SCRAPERS_DIR, "*", "actions.py"))):
+        state = os.path.basename(os.path.dirname(path))
+        if state == "utils":
+            continue
+        try:
+            module = importlib.import_module("{}.actions".format(state))
+        except Exception as e:
+            print("skipping {}: {}".format(state, e), file=sys.stderr)
+            continue
+        for name, obj in sorted(vars(module).items()):
+            if (
+                isinstance(obj, type)
+                and issubclass(obj, BaseCategorizer)
+                and obj is not BaseCategorizer
+                and obj.__module__ == module.__name__
+                and obj.rules
+            ):
+                yield "{}.{}".format(state, name), obj()
+
+
+def recorded_actions(data_dir, state):
+    actions = []
+    for path in glob.glob(os.path.join(data_dir, state, "bill_*.json")):
+        with open(path) as f:
+            actions.extend(a["description"] for a in json.load(f)["actions"])
+    return actions
+
+
+def synthetic_actions(categorizer, count, rng):
+    """Common wording, plus text built around the rules' own keywords."""
+    keywords = sorted(RulePrefilter(categorizer.rules).by_literal)
+    actions = []
+    for _ in range(count):
+        if keywords and rng.random() < 0.5:
+            actions.append(
+                "{} {} {}".format(
+                    rng.choice(COMMON_ACTIONS), rng.choice(keywords), rng.randint(1, 99)
+                )
+            )
+        else:
+            actions.append(rng.choice(COMMON_ACTIONS))
+    return actions
+
+
+def timed(categorizer, actions):
+    start = time.perf_counter()
+    results = [categorizer.categorize(text) for text in actions]
+    return time.perf_counter() - start, results
+
+
+def normalize(result):
+    return {k: sorted(v) if isinstance(v, list) else v for k, v in result.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data-dir", help="scrape output dir with recorded actions")
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    total_full = total_prefiltered = 0
+    mismatches = 0
+    print(
+        "{:<22} {:>6} {:>8} {:>10} {:>12} {:>8}".format(
+            "categorizer", "rules", "actions", "full (s)", "prefilter (s)", "speedup"
+        )
+    )
+    for name, categorizer in categorizers():
+        actions = []
+        if args.data_dir:
+            actions = recorded_actions(args.data_dir, name.split(".")[0])
+        if not actions:
+            actions = synthetic_actions(categorizer, args.count, rng)
+
+        categorizer.prefilter = False
+        full, expected = timed(categorizer, actions)
+        categorizer.prefilter = True
+        timed(categorizer, actions[:1])  # build the index outside the timing
+        prefiltered, results = timed(categorizer, actions)
+
+        for text, a, b in zip(actions, expected, results):
+            if normalize(a) != normalize(b):
+                mismatches += 1
+                print("MISMATCH {}: {!r} {} {}".format(name, text, a, b))
+
+        total_full += full
+        total_prefiltered += prefiltered
+        print(
+            "{:<22} {:>6} {:>8} {:>10.3f} {:>12.3f} {:>7.1f}x".format(
+                name,
+                len(categorizer.rules),
+                len(actions),
+                full,
+                prefiltered,
+                full / prefiltered,
+            )
+        )
+
+    print(
+        "{:<22} {:>6} {:>8} {:>10.3f} {:>12.3f} {:>7.1f}x".format(
+            "total",
+            "",
+            "",
+            total_full,
+            total_prefiltered,
+            total_full / total_prefiltered,
+        )
+    )
+    if mismatches:
+        sys.exit("{} actions categorized differently".format(mismatches))
+
+
+if __name__ == "__main__":
+    main()
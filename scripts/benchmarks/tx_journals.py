@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Time parsing TX journals for votes with the single-walk clean_journal
+against the separate XPath passes it replaced, and check both leave the
+same tree and find the same votes.
+
+Journals are read from the given .HTM files (or directories of them, e.g.
+saved from journals.house.texas.gov), and otherwise made up from typical
+journal markup. Peak memory is measured in a forked process per journal,
+as most of it is libxml2's and invisible to tracemalloc.
+
+    PYTHONPATH=scrapers python scripts/benchmarks/tx_journals.py [journal.HTM ...]
+"""
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import lxml.html
+
+from tx.votes import clean_journal, votes
+
+LOGGER = logging.getLogger("tx_journals")
+
+YEAS = "; ".join("Senator{}".format(i) for i in range(29))
+
+JOURNAL_PAGE = """
+<div class="textpara">SENATE BILL {n} ON THIRD READING</div><br>
+<div class="textpara">Senator Hughes moved that SB {n} be placed on its third
+reading and final passage.</div><br>
+<div class="textpara">The motion prevailed by the following
+vote:&nbsp;&nbsp;Yeas<font color="White">ii</font>29, Nays 2.</div><br>
+<div class="textpara">Yeas — {yeas}.</div><br>
+<div class="textpara">Nays — Garcia; Rodríguez.</div><br>
+<div class="textpara">SB {n} (Cook, Patterson, and Thimesch - no)
+(135 - 3 - 1)</div><br>
+<div class="textpara">The resolution was adopted by a viva voce vote.</div><br>
+<div class="textpara">All Members are deemed to have voted "Yea" on the
+adoption of the resolution.</div><br>
+<p></p>
+<div class="textpara">SB {m} (Hinojosa)</div><br>
+<div class="textpara">Relating to civil and administrative penalties.</div><br>
+<div class="textpara">(viva voce vote) (30-1) "Nay" Middleton (30-1) "Nay"
+Middleton</div><br>
+<div class="textpara">{page}</div>
+<hr noshade size="1">
+<p>89th LEGISLATURE — REGULAR SESSION</p>
+<p>SENATE JOURNAL — {day}th Day</p>
+"""
+
+
+def synthetic_journal(pages):
+    body = "".join(
+        JOURNAL_PAGE.format(n=100 + i, m=2000 + i, yeas=YEAS, page=i, day=i % 90)
+        for i in range(pages)
+    )
+    return "<html><body>{}</body></html>".format(body).encode("utf-8")
+
+
+def legacy_clean_journal(root, logger):
+    # clean_journal before it was a single walk
+    for el in root.xpath("//hr[@noshade and @size=1]"):
+        parent = el.getparent()
+        previous = el.getprevious()
+        if previous:
+            parent.remove(previous)
+        logger.debug(f"Killed hr: {el.text_content()}")
+        parent.remove(el)
+
+    for el in root.xpath("//p[contains(text(), 'REGULAR SESSION')]"):
+        if el.text.endswith("REGULAR SESSION"):
+            parent = el.getparent()
+            logger.debug(f"Killed REGULAR SESSION: {el.text_content()}")
+            parent.remove(el)
+
+    for el in root.xpath("//p[contains(text(), 'JOURNAL')]"):
+        if (
+            "HOUSE JOURNAL" in el.text or "SENATE JOURNAL" in el.text
+        ) and "Day" in el.text:
+            parent = el.getparent()
+            logger.debug(f"Killed HOUSE/SENATE/JOURNAL: {el.text_content()}")
+            parent.remove(el)
+
+    for el in root.xpath("//p[not(node())]"):
+        if el.tail and el.tail != "\r\n" and el.getprevious() is not None:
+            el.getprevious().tail = el.tail
+        logger.debug(f"Killed empty para: {el.text_content()}")
+        el.getparent().remove(el)
+
+    for el in root.xpath('//font[@color="White"]'):
+        if el.text:
+            logger.debug("Replaced white text")
+            el.text = " " * len(el.text)
+
+
+def legacy_clean(page):
+    """Parse and clean page, and find vote paragraphs the way votes() did."""
+    root = lxml.html.fromstring(page)
+    legacy_clean_journal(root, LOGGER)
+    root.xpath(
+        '//div[@class = "textpara"][contains(translate(., "YEAS", "yeas"), "yeas")]'
+    )
+    root.xpath('//div[starts-with(., "All Members are deemed")]')
+    root.xpath('//div[@class = "textpara"]')
+    root.xpath('//div[@class = "textpara"]')
+    return root
+
+
+def single_walk_clean(page):
+    root = lxml.html.fromstring(page)
+    clean_journal(root, LOGGER)
+    return root
+
+
+def legacy_parse(page):
+    root = lxml.html.fromstring(page)
+    legacy_clean_journal(root, LOGGER)
+    return root, list(votes(root, "89R", "upper"))
+
+
+def single_walk_parse(page):
+    root = lxml.html.fromstring(page)
+    paragraphs = clean_journal(root, LOGGER)
+    return root, list(votes(root, "89R", "upper", paragraphs))
+
+
+def summarize(root, found):
+    return lxml.html.tostring(root), [
+        (v.bill, v.motion_text, v.result, v.counts, v.votes) for v in found
+    ]
+
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def _peak_memory(parser, page, conn):
+    start = rss()
+    parser(page)
+    # ru_maxrss is in KiB on Linux
+    conn.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - start)
+
+
+def peak_memory(parser, page):
+    """Bytes the process grew by while parsing page, in a fresh fork."""
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_peak_memory, args=(parser, page, child))
+    proc.start()
+    peak = parent.recv()
+    proc.join()
+    return peak
+
+
+def timed(parser, page, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def journals(paths, pages):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, "*.[Hh][Tt][Mm]*"))))
+        else:
+            found.append(path)
+    if not found:
+        for n in pages:
+            yield "synthetic ({} pages)".format(n), synthetic_journal(n)
+    for path in found:
+        with open(path, "rb") as f:
+            yield os.path.basename(path), f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("journals", nargs="*", help="journal files or directories")
+    parser.add_argument(
+        "--pages",
+        type=int,
+        nargs="+",
+        default=[50, 200, 800],
+        help="sizes of the synthetic journals, if none are given",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = 0
+    row = "{:<24} {:>6} {:>6} {:>11} {:>11} {:>11} {:>11} {:>9} {:>9}"
+    print(
+        row.format(
+            "journal",
+            "KiB",
+            "votes",
+            "xpath clean",
+            "walk clean",
+            "xpath total",
+            "walk total",
+            "xpath MiB",
+            "walk MiB",
+        )
+    )
+    for name, page in journals(args.journals, args.pages):
+        expected = summarize(*legacy_parse(page))
+        result = summarize(*single_walk_parse(page))
+        if expected != result:
+            mismatches += 1
+            print("MISMATCH {}".format(name))
+
+        # seconds to clean and find the paragraphs to look for votes in, then
+        # for the whole parse including building the VoteEvents
+        cleaned = [
+            timed(f, page, args.repeat) for f in (legacy_clean, single_walk_clean)
+        ]
+        parsed = [
+            timed(f, page, args.repeat) for f in (legacy_parse, single_walk_parse)
+        ]
+        memory = [
+            peak_memory(f, page) / 2**20 for f in (legacy_parse, single_walk_parse)
+        ]
+        print(
+            row.format(
+                name[:24],
+                round(len(page) / 1024),
+                len(result[1]),
+                "{:.3f}".format(cleaned[0]),
+                "{:.3f}".format(cleaned[1]),
+                "{:.3f}".format(parsed[0]),
+                "{:.3f}".format(parsed[1]),
+                "{:.1f}".format(memory[0]),
+                "{:.1f}".format(memory[1]),
+            )
+        )
+
+    if mismatches:
+        sys.exit("{} journals parsed differently".format(mismatches))
+
+
+if __name__ == "__main__":
+    main()
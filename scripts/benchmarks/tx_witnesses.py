@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compare the per-bill witness list lookup in TXBillScraper.scrape_bill
+against the linear scan it replaced, over synthetic sessions of
+increasing size.
+
+    PYTHONPATH=scrapers python scripts/benchmarks/tx_witnesses.py
+"""
+import random
+import timeit
+
+from tx.bills import TXBillScraper
+
+WITLIST_URL = "ftp://ftp.legis.state.tx.us/bills/88R/witlistbill/html/{}/{}{:05d}{}.htm"
+
+
+def synthetic_session(num_bills):
+    """Return (bill_ids, witness file URLs) for a fake session."""
+    rng = random.Random(num_bills)
+    bill_ids, files = [], []
+    for num in range(1, num_bills + 1):
+        prefix = rng.choice(["HB", "SB"])
+        bill_ids.append("{} {}".format(prefix, num))
+        # most bills never get a hearing, some get one per committee report
+        for slug in rng.sample("IEHS", rng.choice([0, 0, 1, 1, 2])):
+            chamber = "house_bills" if prefix == "HB" else "senate_bills"
+            files.append(WITLIST_URL.format(chamber, prefix, num, slug))
+    return bill_ids, files
+
+
+def linear_scan(bill_ids, files):
+    witnesses = [(TXBillScraper._get_bill_id_from_file_path(f), f) for f in files]
+    for bill_id in bill_ids:
+        [x for x in witnesses if x[0] == bill_id]
+
+
+def indexed(bill_ids, files):
+    witnesses = TXBillScraper._index_witnesses(files)
+    for bill_id in bill_ids:
+        witnesses.get(bill_id, ())
+
+
+def main():
+    print(
+        "{:>8} {:>10} {:>12} {:>12}".format(
+            "bills", "witnesses", "scan (s)", "index (s)"
+        )
+    )
+    for num_bills in (1000, 2500, 5000, 10000):
+        bill_ids, files = synthetic_session(num_bills)
+        scan = min(
+            timeit.repeat(lambda: linear_scan(bill_ids, files), number=1, repeat=3)
+        )
+        index = min(timeit.repeat(lambda: indexed(bill_ids, files), number=1, repeat=3))
+        print(
+            "{:>8} {:>10} {:>12.3f} {:>12.4f}".format(
+                num_bills, len(files), scan, index
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
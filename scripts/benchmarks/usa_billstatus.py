@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Time the per-row field extraction that USBillScraper does for actions,
+cosponsors and amendments, before and after switching to flattened rows,
+over a folder of BILLSTATUS XML files (e.g. an unzipped govinfo bundle).
+
+    PYTHONPATH=scrapers python scripts/benchmarks/usa_billstatus.py ~/BILLSTATUS-118-hr
+"""
+import argparse
+import glob
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from usa.bills import USBillScraper, flatten
+
+ACTION_FIELDS = [
+    "text",
+    "sourceSystem/name",
+    "type",
+    "actionDate",
+    "actionTime",
+    "actionCode",
+    "committees/item/name",
+]
+SPONSOR_FIELDS = [
+    "firstName",
+    "middleName",
+    "lastName",
+    "bioguideId",
+    "sponsorshipWithdrawnDate",
+]
+AMENDMENT_FIELDS = ["congress", "number", "type"]
+
+ROWS = [
+    ("bill/actions/item", ACTION_FIELDS),
+    ("bill/cosponsors/item", SPONSOR_FIELDS),
+    ("bill/sponsors/item", SPONSOR_FIELDS),
+    ("bill/amendments/amendment", AMENDMENT_FIELDS),
+]
+
+
+def legacy_get_xpath(xml, xpath):
+    # USBillScraper.get_xpath before flattened rows
+    if not xml.findall(xpath, USBillScraper.ns):
+        return
+    return xml.findall(xpath, USBillScraper.ns)[0].text
+
+
+def legacy(xml):
+    # scrape_actions and scrape_hearing_by both looked up every action's fields
+    for path, fields in ROWS + ROWS[:1]:
+        for row in xml.findall(path):
+            [legacy_get_xpath(row, field) for field in fields]
+
+
+def flattened(xml):
+    for path, fields in ROWS:
+        for row in [flatten(row) for row in xml.findall(path)]:
+            [row.get(field) for field in fields]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("folder", help="folder of BILLSTATUS-*.xml files")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    docs = [
+        ET.parse(path).getroot()
+        for path in sorted(glob.glob(os.path.join(args.folder, "*.xml")))
+    ]
+    if not docs:
+        parser.error("no xml files found in {}".format(args.folder))
+
+    for name, func in [("before", legacy), ("after", flattened)]:
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for xml in docs:
+                func(xml)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print("{:>7}: {:10.0f} bills/second".format(name, len(docs) / best))
+
+
+if __name__ == "__main__":
+    main()